@@ -5,6 +5,13 @@ BASE_URL = "https://localhost:8000"
 
 # Authentication token (replace with actual JWT token)
 AUTH_TOKEN = "YOUR_JWT_TOKEN_HERE"
+FORECAST_AUTH_TOKEN = "token"
+
+# Overridden per profile (tests/profiles/*.json) or environment; see harness/settings.py
+# In-flight request limit for the async engines and load workers
+CONCURRENCY = 8
+# Byte budget for the --api-cache LRU
+CACHE_BYTES = 256 * 1024 * 1024
 
 # Test data for site IDs
 VALID_SITE_IDS = [
@@ -102,3 +109,52 @@ MEASUREMENT_TYPES = [
 # Pagination settings
 DEFAULT_LIMIT = 10
 MAX_LIMIT = 100
+
+# Performance budgets per endpoint template, checked by --perf-gate
+# p95_ms: p95 latency over repeated samples; max_bytes: largest response body
+LATENCY_BUDGETS = {
+    "/twin/datacenter/v1/model": {"p95_ms": 200, "max_bytes": 1_000_000},
+    "/twin/datacenter/v1/details/{site_id}": {"p95_ms": 500, "max_bytes": 50_000_000},
+    "/twin/datacenter/v1/ontology": {"p95_ms": 200, "max_bytes": 1_000_000},
+    "/v1/forecast": {"p95_ms": 300, "max_bytes": 5_000_000},
+}
+
+# Request timeouts in milliseconds per endpoint template; others use DEFAULT_TIMEOUT_MS
+DEFAULT_TIMEOUT_MS = 30000
+REQUEST_TIMEOUTS_MS = {
+    "/twin/datacenter/v1/model": 10000,
+    "/twin/datacenter/v1/details/{site_id}": 60000,
+    "/twin/datacenter/v1/ontology": 10000,
+    "/v1/forecast": 15000,
+}
+
+# Retries for 5xx responses and connection errors (never 4xx), with jittered
+# exponential backoff and a cap on retries per session
+RETRY_POLICY = {
+    "retries": 2,
+    "backoff_ms": 100,
+    "max_backoff_ms": 2000,
+    "budget": 20,
+}
+
+# Datacenter locations (latitude, longitude) for the forecast sweep
+FORECAST_LOCATIONS = {
+    "Ashburn": (39.0438, -77.4874),
+    "Dallas": (32.7767, -96.797),
+    "Santa Clara": (37.3541, -121.9552),
+    "Chicago": (41.8781, -87.6298),
+    "Phoenix": (33.4484, -112.074),
+    "Sao Paulo": (-23.5505, -46.6333),
+    "London": (51.5072, -0.1276),
+    "Dublin": (53.3498, -6.2603),
+    "Amsterdam": (52.3676, 4.9041),
+    "Frankfurt": (50.1109, 8.6821),
+    "Johannesburg": (-26.2041, 28.0473),
+    "Mumbai": (19.076, 72.8777),
+    "Singapore": (1.3521, 103.8198),
+    "Tokyo": (35.6762, 139.6503),
+    "Sydney": (-33.8688, 151.2093),
+}
+
+# Metrics every forecast response must include
+REQUIRED_FORECAST_METRICS = ["dryBulbTemperature", "wetBulbTemperature", "relativeHumidity"]
@@ -0,0 +1,751 @@
+import os
+import warnings
+
+import pytest
+
+from harness.async_client import AsyncEngine
+from harness.bench import BenchReport
+from harness.budgets import GatedRequestContext, PerfGate, PerfRegressionWarning
+from harness.cassette import REPLAY, Cassette, CassetteRequestContext, StaleCassetteWarning
+from harness.cache import CachingRequestContext, ResponseCache
+from harness.conformance import ModelCatalog
+from harness.load import CallRecorder, LoadReport, LoadRunner, RecordingRequestContext, load_baseline
+from harness.matrix import SiteViews
+from harness.metadata import MetadataCache
+from harness.pagination import DetailsPaginator
+from harness.pool import AUTH_VARIANTS, WARMUP_PATH, RequestContextFactory, RequestContextPool
+from harness.retry import RetryingRequestContext, RetryPolicy
+from harness.scheduling import DurationStore
+from harness.schema import compile_validators, fingerprint
+from harness.settings import DEFAULT_PROFILE, PROFILE_ENV_VAR, STANDIN, Settings, SettingsError, load_settings
+from harness.snapshot import SnapshotStore
+from harness.standin import StandInServer
+from harness.sweep import ForecastSweep
+from harness.timing import CallTrace, InstrumentedRequestContext
+from harness.workers import is_controller, per_worker_path
+
+
+response_cache_key = pytest.StashKey[ResponseCache]()
+call_recorder_key = pytest.StashKey[CallRecorder]()
+load_report_key = pytest.StashKey[LoadReport]()
+call_trace_key = pytest.StashKey[CallTrace]()
+perf_gate_key = pytest.StashKey[PerfGate]()
+context_factory_key = pytest.StashKey[RequestContextFactory]()
+cassette_key = pytest.StashKey[Cassette]()
+snapshot_store_key = pytest.StashKey[SnapshotStore]()
+settings_key = pytest.StashKey[Settings]()
+bench_report_key = pytest.StashKey[BenchReport]()
+retry_policy_key = pytest.StashKey[RetryPolicy]()
+metadata_cache_key = pytest.StashKey[MetadataCache]()
+forecast_sweep_key = pytest.StashKey[ForecastSweep]()
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("datacenter-api")
+    group.addoption(
+        "--api-profile",
+        default=None,
+        help="Settings profile: a name in tests/profiles or a JSON file path "
+             f"(default: ${PROFILE_ENV_VAR}, else {DEFAULT_PROFILE!r})",
+    )
+    group.addoption(
+        "--api-cache",
+        action="store_true",
+        default=False,
+        help="Serve repeated successful GETs on datacenter_api_context from a session cache",
+    )
+    group.addoption(
+        "--api-cache-bytes",
+        type=int,
+        default=None,
+        help="Byte budget for the --api-cache LRU (default: the profile's cache_bytes, 256 MiB locally)",
+    )
+    group.addoption(
+        "--load",
+        action="store_true",
+        default=False,
+        help="After the selected tests pass, replay their API calls as a load test",
+    )
+    group.addoption(
+        "--load-workers",
+        type=int,
+        default=None,
+        help="Concurrent workers for --load (default: the profile's concurrency)",
+    )
+    group.addoption(
+        "--load-duration",
+        type=float,
+        default=10.0,
+        help="Seconds to run --load for (default: 10)",
+    )
+    group.addoption(
+        "--load-requests",
+        type=int,
+        default=None,
+        help="Stop --load after this many requests instead of after --load-duration",
+    )
+    group.addoption(
+        "--load-output",
+        default="load-report.json",
+        help="Where to write the --load JSON report (default: load-report.json)",
+    )
+    group.addoption(
+        "--load-baseline",
+        default=None,
+        help="Previous --load JSON report to compare p95 latency and throughput against",
+    )
+    group.addoption(
+        "--api-trace",
+        default=None,
+        help="Write a JSONL record of every API call's timing and size to this path",
+    )
+    group.addoption(
+        "--api-slowest",
+        type=int,
+        default=0,
+        help="Show the N slowest API calls (N=0 disables unless --api-trace is set, then 10)",
+    )
+    group.addoption(
+        "--perf-gate",
+        choices=("fail", "warn"),
+        default=None,
+        help="Check latency/payload budgets and baseline regressions, failing or warning",
+    )
+    group.addoption(
+        "--perf-samples",
+        type=int,
+        default=5,
+        help="Times each distinct call is re-issued for --perf-gate (default: 5)",
+    )
+    group.addoption(
+        "--perf-regression",
+        type=float,
+        default=25.0,
+        help="Allowed median slowdown against the baseline, in percent (default: 25)",
+    )
+    group.addoption(
+        "--perf-min-delta-ms",
+        type=float,
+        default=5.0,
+        help="Ignore slowdowns smaller than this many milliseconds (default: 5)",
+    )
+    group.addoption(
+        "--perf-baseline",
+        default=".perf-baseline.json",
+        help="Rolling baseline file for --perf-gate (default: .perf-baseline.json)",
+    )
+    group.addoption(
+        "--perf-window",
+        type=int,
+        default=10,
+        help="Number of previous runs kept in the rolling baseline (default: 10)",
+    )
+    group.addoption(
+        "--async-concurrency",
+        type=int,
+        default=None,
+        help="In-flight request limit for the async_* engine fixtures (default: the profile's concurrency)",
+    )
+    group.addoption(
+        "--cassette",
+        choices=("record", "replay"),
+        default=None,
+        help="Record the API fixtures' responses (request contexts, auth_contexts, async engines), or replay them offline",
+    )
+    group.addoption(
+        "--cassette-dir",
+        default=".cassettes",
+        help="Directory of the recorded responses for --cassette (default: .cassettes)",
+    )
+    group.addoption(
+        "--cassette-max-age",
+        type=float,
+        default=168.0,
+        help="Hours after which replayed recordings are flagged as stale (default: 168)",
+    )
+    group.addoption(
+        "--snapshot-file",
+        default=None,
+        help="Per-site content hashes from the last successful run (default: .site-snapshots.json in the rootdir)",
+    )
+    group.addoption(
+        "--full-validation",
+        action="store_true",
+        default=False,
+        help="Validate every entity and relationship, not only those changed since the last snapshot",
+    )
+    group.addoption(
+        "--metadata-cache-dir",
+        default=".metadata-cache",
+        help="Where /ontology and /model are kept between sessions for conditional revalidation "
+             "(default: .metadata-cache)",
+    )
+    group.addoption(
+        "--refresh-metadata",
+        action="store_true",
+        default=False,
+        help="Ignore the stored /ontology and /model and fetch them again",
+    )
+    group.addoption(
+        "--retries",
+        type=int,
+        default=None,
+        help="Retries per GET on 5xx responses and connection errors, never 4xx; 0 disables "
+             "(default: the profile's retry settings)",
+    )
+    group.addoption(
+        "--retry-backoff-ms",
+        type=float,
+        default=None,
+        help="Base of the jittered exponential backoff between retries, in ms",
+    )
+    group.addoption(
+        "--retry-max-backoff-ms",
+        type=float,
+        default=None,
+        help="Cap on a single backoff, in ms",
+    )
+    group.addoption(
+        "--retry-budget",
+        type=int,
+        default=None,
+        help="Most retries in one session (per xdist worker)",
+    )
+    group.addoption(
+        "--benchmarks",
+        action="store_true",
+        default=False,
+        help="Also run tests marked benchmark (large synthetic payloads, slow)",
+    )
+    group.addoption(
+        "--bench-baseline",
+        default=".bench-baseline.json",
+        help="Harness benchmark medians to compare against (default: .bench-baseline.json)",
+    )
+    group.addoption(
+        "--bench-save",
+        action="store_true",
+        default=False,
+        help="Store this run's harness benchmark results as the new baseline",
+    )
+    group.addoption(
+        "--bench-api",
+        action="store_true",
+        default=False,
+        help="Benchmark the harness against the profile's API URLs instead of a private plain-HTTP stand-in",
+    )
+    group.addoption(
+        "--longest-first",
+        action="store_true",
+        default=False,
+        help="Run tests in order of previous duration, longest first (implied by xdist -n)",
+    )
+    group.addoption(
+        "--durations-file",
+        default=".test-durations.json",
+        help="Where per-test durations are kept for --longest-first (default: .test-durations.json)",
+    )
+
+
+def _option(config, name, default):
+    """A command-line value if given, else the resolved setting"""
+    value = config.getoption(name)
+    return default if value is None else value
+
+
+def pytest_configure(config):
+    try:
+        settings = load_settings(config.getoption("api_profile"))
+    except SettingsError as error:
+        raise pytest.UsageError(str(error)) from None
+    config.stash[settings_key] = settings
+    config.addinivalue_line(
+        "markers", "no_cache: bypass the --api-cache response cache for this test"
+    )
+    if config.getoption("api_cache"):
+        config.stash[response_cache_key] = ResponseCache(_option(config, "api_cache_bytes", settings.cache_bytes))
+    if config.getoption("load"):
+        config.stash[call_recorder_key] = CallRecorder()
+    config.addinivalue_line(
+        "markers", "matrix: data-driven case over the config.py vocabularies"
+    )
+    config.addinivalue_line(
+        "markers", "benchmark: large or slow measurement, skipped unless --benchmarks is given"
+    )
+    config.addinivalue_line(
+        "markers", "live_api: talks to the API outside the fixture layers, skipped with --cassette=replay"
+    )
+    config.addinivalue_line(
+        "markers",
+        "latency_budget(p95_ms=None, max_bytes=None, endpoint=None): "
+        "override the profile's latency_budgets for this test under --perf-gate",
+    )
+    if config.getoption("cassette"):
+        cassette = Cassette(config.getoption("cassette_dir"), config.getoption("cassette"),
+                            max_age=config.getoption("cassette_max_age") * 3600)
+        config.stash[cassette_key] = cassette
+        stale = cassette.stale_entries() if cassette.mode == REPLAY else []
+        if stale and is_controller(config):
+            config.issue_config_time_warning(StaleCassetteWarning(
+                f"{len(stale)} of {len(cassette)} recordings in {cassette.directory} are older than "
+                f"{config.getoption('cassette_max_age'):g}h; re-record with --cassette=record"
+            ), stacklevel=2)
+    config.stash[retry_policy_key] = RetryPolicy(
+        retries=_option(config, "retries", settings.retry["retries"]),
+        backoff_ms=_option(config, "retry_backoff_ms", settings.retry["backoff_ms"]),
+        max_backoff_ms=_option(config, "retry_max_backoff_ms", settings.retry["max_backoff_ms"]),
+        budget=_option(config, "retry_budget", settings.retry["budget"]),
+        timeouts_ms=settings.timeouts_ms,
+        default_timeout_ms=settings.default_timeout_ms,
+    )
+    if config.getoption("benchmarks"):
+        config.stash[bench_report_key] = BenchReport()
+    if config.getoption("api_trace") or config.getoption("api_slowest"):
+        config.stash[call_trace_key] = CallTrace()
+    if config.getoption("longest_first") or config.getoption("numprocesses", None):
+        config.pluginmanager.register(
+            DurationStore(config.getoption("durations_file"), save=is_controller(config)),
+            "datacenter-api-durations",
+        )
+    if config.getoption("perf_gate"):
+        config.stash[perf_gate_key] = PerfGate(
+            budgets=settings.latency_budgets,
+            baseline_path=config.getoption("perf_baseline"),
+            samples=config.getoption("perf_samples"),
+            regression_pct=config.getoption("perf_regression"),
+            min_delta_ms=config.getoption("perf_min_delta_ms"),
+            window=config.getoption("perf_window"),
+        )
+
+
+def pytest_report_header(config):
+    settings = config.stash.get(settings_key, None)
+    return settings.describe() if settings is not None else None
+
+
+def pytest_collection_modifyitems(config, items):
+    skips = {}
+    if not config.getoption("benchmarks"):
+        skips["benchmark"] = pytest.mark.skip(reason="benchmark; run with --benchmarks")
+    if config.getoption("cassette") == REPLAY:
+        skips["live_api"] = pytest.mark.skip(reason="needs a live API; cannot be replayed from a cassette")
+    for item in items:
+        for marker, skip in skips.items():
+            if item.get_closest_marker(marker) is not None:
+                item.add_marker(skip)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    gate = item.config.stash.get(perf_gate_key, None)
+    if gate is not None and call.when == "call":
+        _check_perf_gate(item, outcome.get_result(), gate)
+
+
+def _check_perf_gate(item, report, gate):
+    """Sample a passed test's calls; --perf-gate=fail turns its call report into a failure"""
+    if not report.passed:
+        gate.discard(item.nodeid)
+        return
+    marker_budgets = [marker.kwargs for marker in item.iter_markers("latency_budget")]
+    problems = gate.check(item.nodeid, marker_budgets)
+    if not problems:
+        return
+    message = "performance gate:\n  " + "\n  ".join(problems)
+    if item.config.getoption("perf_gate") == "fail":
+        report.outcome = "failed"
+        report.longrepr = message
+    else:
+        warnings.warn(PerfRegressionWarning(message))
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    gate = config.stash.get(perf_gate_key, None)
+    if gate is not None:
+        gate.save()
+    trace = config.stash.get(call_trace_key, None)
+    path = config.getoption("api_trace")
+    if trace is not None and path:
+        trace.write_jsonl(per_worker_path(config, path))
+    cassette = config.stash.get(cassette_key, None)
+    if cassette is not None:
+        cassette.save()
+        cassette.close()
+    snapshots = config.stash.get(snapshot_store_key, None)
+    if snapshots is not None:
+        snapshots.save()
+    bench = config.stash.get(bench_report_key, None)
+    if bench is not None and (bench.results or bench.merged):
+        if not is_controller(config):
+            config.workeroutput["bench_report"] = bench.to_dict()
+        elif config.getoption("bench_save"):
+            bench.save(config.getoption("bench_baseline"))
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    """Collect an xdist worker's harness benchmark results on the controller"""
+    bench = node.config.stash.get(bench_report_key, None)
+    rows = getattr(node, "workeroutput", {}).get("bench_report")
+    if bench is not None and rows:
+        bench.merge(rows)
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    trace = config.stash.get(call_trace_key, None)
+    if trace is not None:
+        slowest = config.getoption("api_slowest") or 10
+        terminalreporter.write_sep("-", f"slowest {slowest} API calls")
+        for line in trace.table(slowest):
+            terminalreporter.write_line(line)
+        if config.getoption("api_trace"):
+            terminalreporter.write_line(f"{len(trace.records)} calls traced to {config.getoption('api_trace')}")
+        if trace.retried():
+            terminalreporter.write_sep("-", "retried API calls (not in the slowest list)")
+            for line in trace.retried_table():
+                terminalreporter.write_line(line)
+
+    retry_policy = config.stash.get(retry_policy_key, None)
+    if retry_policy is not None and (retry_policy.used or retry_policy.exhausted):
+        terminalreporter.write_sep("-", "retries")
+        terminalreporter.write_line(retry_policy.summary())
+
+    factory = config.stash.get(context_factory_key, None)
+    if factory is not None and factory.reused:
+        terminalreporter.write_sep("-", "request contexts")
+        terminalreporter.write_line(factory.summary())
+
+    gate = config.stash.get(perf_gate_key, None)
+    if gate is not None:
+        terminalreporter.write_sep("-", "performance gate")
+        terminalreporter.write_line(f"{gate.measured} endpoint checks, {gate.problems} test(s) over budget "
+                                    f"or regressed; baseline in {gate.baseline_path}")
+
+    snapshots = config.stash.get(snapshot_store_key, None)
+    if snapshots is not None and snapshots.diffs:
+        terminalreporter.write_sep("-", "site changes since last snapshot")
+        for line in snapshots.lines():
+            terminalreporter.write_line(line)
+
+    metadata = config.stash.get(metadata_cache_key, None)
+    if metadata is not None and (metadata.fetched or metadata.not_modified):
+        terminalreporter.write_sep("-", "metadata cache")
+        terminalreporter.write_line(metadata.summary())
+
+    cassette = config.stash.get(cassette_key, None)
+    if cassette is not None and (cassette.recorded or cassette.replayed or cassette.misses):
+        terminalreporter.write_sep("-", "cassette")
+        terminalreporter.write_line(cassette.summary())
+
+    bench = config.stash.get(bench_report_key, None)
+    if bench is not None and (bench.results or bench.merged):
+        baseline_path = config.getoption("bench_baseline")
+        baseline = load_baseline(baseline_path) if os.path.exists(baseline_path) else None
+        terminalreporter.write_sep("-", "harness benchmark")
+        for line in bench.lines(baseline):
+            terminalreporter.write_line(line)
+        if baseline is not None:
+            regressed = bench.regressions(baseline)
+            terminalreporter.write_line(f"{len(regressed)} stage(s) slower than {baseline_path} "
+                                        f"by more than {bench.threshold_pct:g}%")
+        if config.getoption("bench_save"):
+            terminalreporter.write_line(f"baseline written to {baseline_path}")
+
+    sweep = config.stash.get(forecast_sweep_key, None)
+    if sweep is not None and sweep.results:
+        terminalreporter.write_sep("-", "forecast sweeps")
+        for result in sweep.results:
+            for line in result.lines(slowest=3):
+                terminalreporter.write_line(line)
+
+    cache = config.stash.get(response_cache_key, None)
+    if cache is not None:
+        terminalreporter.write_sep("-", "datacenter API response cache")
+        terminalreporter.write_line(cache.summary())
+
+    report = config.stash.get(load_report_key, None)
+    if report is not None:
+        baseline_path = config.getoption("load_baseline")
+        baseline = load_baseline(baseline_path) if baseline_path else None
+        terminalreporter.write_sep("-", "load test")
+        for line in report.lines(baseline):
+            terminalreporter.write_line(line)
+        terminalreporter.write_line(f"report written to {config.getoption('load_output')}")
+
+
+@pytest.fixture(scope="session")
+def api_settings(pytestconfig):
+    """Settings resolved at session start from the environment, --api-profile and config.py"""
+    return pytestconfig.stash[settings_key]
+
+
+@pytest.fixture(scope="session")
+def standin_server(api_settings):
+    """Start the in-process stand-in API for the whole session"""
+    with StandInServer(tokens=(api_settings.datacenter_token, api_settings.forecast_token)) as server:
+        yield server
+
+
+@pytest.fixture(scope="session")
+def api_base_url(request, api_settings):
+    """Datacenter API base URL; the local stand-in under the local profile"""
+    if api_settings.datacenter_url != STANDIN:
+        return api_settings.datacenter_url
+    return request.getfixturevalue("standin_server").url
+
+
+@pytest.fixture(scope="session")
+def forecast_base_url(request, api_settings):
+    """Forecast API base URL; the local stand-in under the local profile"""
+    if api_settings.forecast_url != STANDIN:
+        return api_settings.forecast_url
+    return request.getfixturevalue("standin_server").url
+
+
+@pytest.fixture(scope="session")
+def payload_validators():
+    """Schema validators for every API payload, compiled once per session"""
+    return compile_validators()
+
+
+@pytest.fixture(scope="session")
+def api_auth_headers(api_settings):
+    """Headers that authenticate against the Datacenter API"""
+    return api_settings.datacenter_headers
+
+
+@pytest.fixture(scope="session")
+def forecast_auth_headers(api_settings):
+    """Headers that authenticate against the Forecast API"""
+    return api_settings.forecast_headers
+
+
+@pytest.fixture(scope="session")
+def request_context_factory(playwright, api_base_url, pytestconfig):
+    """Build each distinct (base_url, headers) request context once per session
+
+    Call it as ``request_context_factory(base_url=None, headers=None)``; the
+    base URL defaults to the Datacenter API. Contexts are disposed at session end.
+    """
+    factory = RequestContextFactory(playwright, api_base_url)
+    pytestconfig.stash[context_factory_key] = factory
+    yield factory
+    factory.dispose()
+
+
+@pytest.fixture(scope="session")
+def auth_contexts(request_context_factory, api_auth_headers, pytestconfig):
+    """Warmed Datacenter API contexts per auth variant: "valid", "none" and "invalid"
+
+    Session-scoped, so each xdist worker process builds its own pool once.
+    With --cassette the contexts record or replay like datacenter_api_context;
+    replay skips the warmup so the pool needs no server. With --api-trace or
+    --api-slowest their calls are timed like datacenter_api_context's.
+    """
+    variants = dict(AUTH_VARIANTS, valid=api_auth_headers["Authorization"])
+    cassette = pytestconfig.stash.get(cassette_key, None)
+    trace = pytestconfig.stash.get(call_trace_key, None)
+
+    def layers(context, headers):
+        if cassette is not None:
+            context = CassetteRequestContext(context, cassette, headers)
+        if trace is not None:
+            context = InstrumentedRequestContext(context, trace)
+        return context
+
+    return RequestContextPool(
+        request_context_factory, variants=variants,
+        warmup_path=None if cassette is not None and cassette.mode == REPLAY else WARMUP_PATH,
+        layers=layers if cassette is not None or trace is not None else None,
+    )
+
+
+@pytest.fixture(scope="session")
+def call_recorder(request, pytestconfig):
+    """Record API calls in --load mode and replay them once the session's tests are done"""
+    recorder = pytestconfig.stash.get(call_recorder_key, None)
+    if recorder is None:
+        yield None
+        return
+
+    # Keep the APIs under test up until the replay has finished
+    request.getfixturevalue("api_base_url")
+    request.getfixturevalue("forecast_base_url")
+    yield recorder
+
+    if request.session.testsfailed or not recorder.calls:
+        return
+    report = LoadRunner(
+        recorder.calls,
+        workers=_option(pytestconfig, "load_workers", pytestconfig.stash[settings_key].concurrency),
+        duration=pytestconfig.getoption("load_duration"),
+        requests=pytestconfig.getoption("load_requests"),
+    ).run()
+    report.write_json(per_worker_path(pytestconfig, pytestconfig.getoption("load_output")))
+    pytestconfig.stash[load_report_key] = report
+
+
+def _layered_context(request_context, pytestconfig, base_url, headers, recorder, cache=None):
+    """Apply the retry and optional cassette, gate, cache, recording and timing layers to a request context"""
+    context = request_context
+    retry_policy = pytestconfig.stash.get(retry_policy_key, None)
+    if retry_policy is not None:
+        context = RetryingRequestContext(context, retry_policy)
+    cassette = pytestconfig.stash.get(cassette_key, None)
+    if cassette is not None:
+        context = CassetteRequestContext(context, cassette, headers)
+    gate = pytestconfig.stash.get(perf_gate_key, None)
+    if gate is not None:
+        context = GatedRequestContext(context, gate)
+    if cache is not None:
+        context = CachingRequestContext(context, cache, headers)
+    if recorder is not None:
+        context = RecordingRequestContext(context, recorder, base_url, headers)
+    trace = pytestconfig.stash.get(call_trace_key, None)
+    if trace is not None:
+        context = InstrumentedRequestContext(context, trace)
+    return context
+
+
+@pytest.fixture(scope="session")
+def datacenter_api_context(request_context_factory, api_base_url, api_auth_headers, call_recorder,
+                           pytestconfig):
+    """Create API request context for Datacenter API with authentication"""
+    request_context = request_context_factory(api_base_url, api_auth_headers)
+    return _layered_context(request_context, pytestconfig, api_base_url, api_auth_headers, call_recorder,
+                            cache=pytestconfig.stash.get(response_cache_key, None))
+
+
+@pytest.fixture(scope="session")
+def api_request_context(request_context_factory, forecast_base_url, forecast_auth_headers, call_recorder,
+                        pytestconfig):
+    """Create API request context with base configuration"""
+    request_context = request_context_factory(forecast_base_url, forecast_auth_headers)
+    return _layered_context(request_context, pytestconfig, forecast_base_url, forecast_auth_headers,
+                            call_recorder)
+
+
+@pytest.fixture(scope="session")
+def async_datacenter_api(api_base_url, api_auth_headers, api_settings, pytestconfig):
+    """Async engine for the Datacenter API, for tests that issue many requests at once
+
+    Runs async Playwright on a background event loop; call ``get_many(requests)``
+    or ``run(coroutine_function)`` from a normal (sync) test.
+    """
+    concurrency = _option(pytestconfig, "async_concurrency", api_settings.concurrency)
+    cassette = pytestconfig.stash.get(cassette_key, None)
+    with AsyncEngine(api_base_url, api_auth_headers, concurrency, cassette=cassette) as engine:
+        yield engine
+
+
+@pytest.fixture(scope="session")
+def async_forecast_api(forecast_base_url, forecast_auth_headers, api_settings, pytestconfig):
+    """Async engine for the Forecast API"""
+    concurrency = _option(pytestconfig, "async_concurrency", api_settings.concurrency)
+    cassette = pytestconfig.stash.get(cassette_key, None)
+    with AsyncEngine(forecast_base_url, forecast_auth_headers, concurrency, cassette=cassette) as engine:
+        yield engine
+
+
+@pytest.fixture(scope="session")
+def forecast_sweep(async_forecast_api, payload_validators, pytestconfig):
+    """Sweep /v1/forecast over many coordinates at the async engine's concurrency
+
+    Call ``forecast_sweep.run(locations)`` with (latitude, longitude) pairs,
+    e.g. from harness.sweep.grid(); the results are summarised at session end.
+    """
+    sweep = ForecastSweep(async_forecast_api, payload_validators["forecast"])
+    pytestconfig.stash[forecast_sweep_key] = sweep
+    return sweep
+
+
+@pytest.fixture(scope="session")
+def details_paginator(api_base_url, api_auth_headers, api_settings, async_datacenter_api):
+    """Build DetailsPaginators with the profile's page size, concurrency and details timeout
+
+    Call it as ``details_paginator(site_id, **overrides)``. Pages are fetched on
+    the async_datacenter_api engine.
+    """
+    def build(site_id, **kwargs):
+        kwargs.setdefault("engine", async_datacenter_api)
+        kwargs.setdefault("limit", api_settings.page_size)
+        kwargs.setdefault("concurrency", api_settings.concurrency)
+        kwargs.setdefault("timeout", api_settings.timeout_for("/twin/datacenter/v1/details/{site_id}"))
+        return DetailsPaginator(api_base_url, api_auth_headers, site_id, **kwargs)
+    return build
+
+
+@pytest.fixture(scope="session")
+def site_snapshots(pytestconfig, api_settings, payload_validators):
+    """Last successful per-site content hashes; validate only what changed since
+
+    Use ``site_snapshots.validator(site_id, payload_validators)`` on a
+    ``keep_raw=True`` stream, then ``commit(site_id, validator)`` once it passed.
+    Snapshots are kept per Datacenter API URL and are void once a schema changes.
+    """
+    path = pytestconfig.getoption("snapshot_file") or os.path.join(pytestconfig.rootpath, ".site-snapshots.json")
+    store = SnapshotStore(path, base_url=api_settings.datacenter_url, fingerprint=fingerprint(payload_validators),
+                          ignore_previous=pytestconfig.getoption("full_validation"))
+    pytestconfig.stash[snapshot_store_key] = store
+    return store
+
+
+@pytest.fixture(scope="session")
+def api_metadata(datacenter_api_context, api_settings, pytestconfig):
+    """Ontology prefixes and the indexed model, kept on disk and revalidated once per session
+
+    ``api_metadata.prefixes()`` maps prefix to URI; ``api_metadata.model()``
+    maps each entityType, relationshipType and measurementType to its definition.
+    """
+    # Files are keyed by the configured URL, so the stand-in's per-session port does not matter
+    cache = MetadataCache(pytestconfig.getoption("metadata_cache_dir"), datacenter_api_context,
+                          api_settings.datacenter_url, refresh=pytestconfig.getoption("refresh_metadata"))
+    pytestconfig.stash[metadata_cache_key] = cache
+    return cache
+
+
+@pytest.fixture(scope="session")
+def model_catalog(api_metadata):
+    """Frozen lookup tables of the declared entity, relationship and measurement types, built once per session"""
+    return ModelCatalog.from_index(api_metadata.model())
+
+
+@pytest.fixture(scope="session")
+def bench_report(pytestconfig):
+    """Harness benchmark results for the terminal table; kept only under --benchmarks"""
+    return pytestconfig.stash.get(bench_report_key, None) or BenchReport()
+
+
+@pytest.fixture(scope="session")
+def site_views(datacenter_api_context):
+    """Unfiltered details per site, fetched once and shared by matrix cases"""
+    return SiteViews(datacenter_api_context)
+
+
+@pytest.fixture(autouse=True)
+def _api_test_scope(request):
+    """Tell the session-wide API layers which test is running"""
+    stash = request.config.stash
+    cache = stash.get(response_cache_key, None)
+    recorder = stash.get(call_recorder_key, None)
+    trace = stash.get(call_trace_key, None)
+    gate = stash.get(perf_gate_key, None)
+    retry_policy = stash.get(retry_policy_key, None)
+    if cache is not None:
+        cache.bypass = request.node.get_closest_marker("no_cache") is not None
+    if recorder is not None:
+        recorder.nodeid = request.node.nodeid
+    if trace is not None:
+        trace.nodeid = request.node.nodeid
+    if gate is not None:
+        gate.nodeid = request.node.nodeid
+    if retry_policy is not None:
+        retry_policy.nodeid = request.node.nodeid
+    yield
+    if cache is not None:
+        cache.bypass = False
+    if gate is not None:
+        # Calls made by a failed setup or by fixture teardown are never sampled
+        gate.discard(request.node.nodeid)
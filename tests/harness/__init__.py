@@ -0,0 +1 @@
+"""Support code for the Datacenter and Forecast API test suites"""
@@ -0,0 +1,167 @@
+"""Asyncio request engine built on playwright.async_api
+
+The sync Playwright fixtures keep an event loop attached to the main thread, so
+AsyncEngine runs async Playwright on its own long-lived loop in a background
+thread. Sync tests hand it coroutines, or use get_many(), and block on the
+result. Requests are bounded by a semaphore, so a sweep over sites x types takes
+roughly (sites x types / concurrency) x RTT instead of sites x types x RTT.
+
+The engine is the one place the harness runs async Playwright: DetailsPaginator
+spawns its page producer on an engine loop and LoadRunner replays calls on one,
+using context_for() for request contexts on other base URLs or headers.
+"""
+import asyncio
+import threading
+import time
+
+from playwright.async_api import async_playwright
+
+from harness.cache import CachedResponse
+from harness.cassette import REPLAY, conditional
+
+
+class AsyncResponse(CachedResponse):
+    """Fully read response of one async request"""
+
+    def __init__(self, url, params, status, status_text, headers, body, elapsed):
+        super().__init__(url, status, status_text, headers, body)
+        self.params = params
+        self.elapsed = elapsed
+
+
+class AsyncAPIClient:
+    """Async request context with a concurrency limit
+
+    With a ``cassette`` (harness.cassette) GETs are recorded to it, or in
+    replay mode answered from it without touching the network, keyed like
+    CassetteRequestContext by the ``Authorization`` of ``headers``.
+    """
+
+    def __init__(self, context, concurrency, cassette=None, headers=None):
+        if concurrency < 1:
+            raise ValueError(f"concurrency must be at least 1, got {concurrency}")
+        self._context = context
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._cassette = cassette
+        self._headers = dict(headers or {})
+        self.concurrency = concurrency
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def with_limit(self, concurrency):
+        """A client sharing this context with a different concurrency limit"""
+        return AsyncAPIClient(self._context, concurrency, self._cassette, self._headers)
+
+    async def get(self, url, params=None, **kwargs):
+        async with self._semaphore:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            started = time.perf_counter()
+            try:
+                status, status_text, headers, body = await self._exchange(url, params, kwargs)
+            finally:
+                self.in_flight -= 1
+        return AsyncResponse(url, params, status, status_text, headers, body, time.perf_counter() - started)
+
+    async def _exchange(self, url, params, kwargs):
+        """(status, status_text, headers, body) from the cassette or the network"""
+        cassette = self._cassette
+        if cassette is not None:
+            auth = (kwargs.get("headers") or {}).get("Authorization", self._headers.get("Authorization"))
+            validators = conditional(kwargs.get("headers"))
+            if cassette.mode == REPLAY:
+                recorded = cassette.play(url, params, auth, validators)
+                return recorded.status, recorded.status_text, recorded.headers, recorded.body()
+        response = await self._context.get(url, params=params, **kwargs)
+        exchanged = (response.status, response.status_text, dict(response.headers), await response.body())
+        if cassette is not None:
+            cassette.record(url, params, auth, CachedResponse(response.url, *exchanged), validators)
+        return exchanged
+
+    async def get_many(self, requests):
+        """Issue (url, params) pairs concurrently; results keep the input order"""
+        return await asyncio.gather(*(self.get(url, params) for url, params in requests))
+
+
+class AsyncEngine:
+    """Background event loop owning async Playwright and its request contexts
+
+    ``base_url`` and ``headers`` configure the default context behind
+    ``client``; without a base URL there is no default client and callers
+    build their own with context_for() or client_for(). Clients record to, or
+    replay from, ``cassette`` when one is given.
+    """
+
+    def __init__(self, base_url=None, headers=None, concurrency=8, cassette=None):
+        self.base_url = base_url
+        self.headers = dict(headers or {})
+        self.concurrency = concurrency
+        self.cassette = cassette
+        self.client = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="async-engine", daemon=True)
+        self._playwright = None
+        self._contexts = {}
+
+    def start(self):
+        self._thread.start()
+        self.submit(self._setup())
+        return self
+
+    async def _setup(self):
+        self._playwright = await async_playwright().start()
+        if self.base_url is not None:
+            self.client = await self.client_for(self.base_url, self.headers, self.concurrency)
+
+    async def context_for(self, base_url, headers=None):
+        """The engine's request context for a base URL and headers, created on first use"""
+        key = (base_url, tuple(sorted((headers or {}).items())))
+        context = self._contexts.get(key)
+        if context is None:
+            context = self._contexts[key] = await self._playwright.request.new_context(
+                base_url=base_url, extra_http_headers=dict(headers or {})
+            )
+        return context
+
+    async def client_for(self, base_url, headers=None, concurrency=None):
+        """An AsyncAPIClient on context_for(base_url, headers)"""
+        return AsyncAPIClient(await self.context_for(base_url, headers), concurrency or self.concurrency,
+                              self.cassette, headers)
+
+    def submit(self, coroutine):
+        """Run a coroutine on the engine loop and block until it returns"""
+        return self.spawn(coroutine).result()
+
+    def spawn(self, coroutine):
+        """Schedule a coroutine on the engine loop; returns a concurrent.futures.Future"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+    def run(self, coroutine_function, *args, concurrency=None):
+        """Run ``coroutine_function(client, *args)`` on the engine loop and return its result"""
+        client = self.client if concurrency is None else self.client.with_limit(concurrency)
+        return self.submit(coroutine_function(client, *args))
+
+    def get_many(self, requests, concurrency=None):
+        """Blocking helper: issue (url, params) pairs concurrently, results in input order"""
+        return self.run(AsyncAPIClient.get_many, list(requests), concurrency=concurrency)
+
+    async def _teardown(self):
+        for context in self._contexts.values():
+            await context.dispose()
+        self._contexts.clear()
+        if self._playwright is not None:
+            await self._playwright.stop()
+
+    def stop(self):
+        try:
+            self.submit(self._teardown())
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
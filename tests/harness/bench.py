@@ -0,0 +1,204 @@
+"""Stage-by-stage benchmarks of the harness itself
+
+For each endpoint case, HarnessBench times the stages a test goes through,
+separately:
+
+- context: ``playwright.request.new_context()``
+- first_request: the first GET on a fresh context, i.e. connection setup (and
+  TLS for https URLs) plus the request itself
+- request: a GET on an already connected context
+- body: ``response.body()``
+- decode: ``json.loads`` of the body
+- validate: the compiled schema validator on the decoded payload
+
+Every stage gets ``warmup`` untimed runs, then ``repeat`` timed ones. The
+median is compared against a stored baseline, because it is the statistic
+least disturbed by the odd slow sample. Run against the local stand-in, the
+payloads are deterministic, so two runs differ only by harness changes and
+machine noise. The stand-in speaks plain HTTP; run against a real https API
+(``--bench-api``) to include the TLS handshake in first_request.
+"""
+import json
+import statistics
+import time
+from dataclasses import dataclass
+
+from harness.stats import percentile
+from harness.workers import merge_json
+
+
+STAGES = ("context", "first_request", "request", "body", "decode", "validate")
+
+
+@dataclass(frozen=True)
+class BenchCase:
+    """One endpoint request to benchmark on ``api``, validated with ``schema``"""
+
+    name: str
+    url: str
+    params: tuple = ()
+    schema: str = ""
+    api: str = "datacenter"
+
+
+BENCH_CASES = (
+    BenchCase("model", "/twin/datacenter/v1/model", schema="model"),
+    BenchCase("details", "/twin/datacenter/v1/details/Site-001", schema="details"),
+    BenchCase("details-paged", "/twin/datacenter/v1/details/Site-001", (("limit", "10"),), "details"),
+    BenchCase("ontology", "/twin/datacenter/v1/ontology", schema="ontology"),
+    BenchCase("forecast", "/v1/forecast", (("latitude", "52.52"), ("longitude", "13.405")), "forecast", "forecast"),
+)
+
+
+class StageStats:
+    """Timing samples of one stage, in seconds, summarised in milliseconds"""
+
+    def __init__(self, samples):
+        self.samples = sorted(samples)
+
+    @property
+    def median_ms(self):
+        return 1000.0 * statistics.median(self.samples)
+
+    @property
+    def p95_ms(self):
+        return 1000.0 * percentile(self.samples, 95)
+
+    @property
+    def min_ms(self):
+        return 1000.0 * self.samples[0]
+
+    @property
+    def stdev_ms(self):
+        return 1000.0 * statistics.pstdev(self.samples)
+
+    def to_dict(self):
+        return {"n": len(self.samples), "median_ms": round(self.median_ms, 4), "p95_ms": round(self.p95_ms, 4),
+                "min_ms": round(self.min_ms, 4), "stdev_ms": round(self.stdev_ms, 4)}
+
+
+def measure(run, warmup=3, repeat=20):
+    """Seconds taken by each of ``repeat`` calls of ``run()`` after ``warmup`` untimed calls"""
+    for _ in range(warmup):
+        run()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+class HarnessBench:
+    """Time each stage of each BenchCase; ``targets`` maps BenchCase.api to (base_url, headers)"""
+
+    def __init__(self, playwright, targets, validators, warmup=3, repeat=20):
+        self._playwright = playwright
+        self.targets = {api: (base_url, dict(headers)) for api, (base_url, headers) in targets.items()}
+        self.validators = validators
+        self.warmup = warmup
+        self.repeat = repeat
+
+    def _new_context(self, api):
+        base_url, headers = self.targets[api]
+        return self._playwright.request.new_context(base_url=base_url, extra_http_headers=headers)
+
+    def run_case(self, case):
+        """{stage: StageStats} for one case; raises if the response is not a valid 200"""
+        params = dict(case.params) or None
+        samples = {stage: [] for stage in STAGES}
+
+        def cold_start(timed):
+            started = time.perf_counter()
+            context = self._new_context(case.api)
+            created = time.perf_counter()
+            context.get(case.url, params=params).dispose()
+            if timed:
+                samples["context"].append(created - started)
+                samples["first_request"].append(time.perf_counter() - created)
+            context.dispose()
+
+        for run in range(self.warmup + self.repeat):
+            cold_start(timed=run >= self.warmup)
+
+        context = self._new_context(case.api)
+        try:
+            for run in range(self.warmup + self.repeat):
+                started = time.perf_counter()
+                response = context.get(case.url, params=params)
+                received = time.perf_counter()
+                body = response.body()
+                if run >= self.warmup:
+                    samples["request"].append(received - started)
+                    samples["body"].append(time.perf_counter() - received)
+                if response.status != 200:
+                    raise AssertionError(f"{case.name}: {case.url} returned {response.status}")
+                response.dispose()
+        finally:
+            context.dispose()
+
+        data = json.loads(body)
+        validator = self.validators[case.schema]
+        validator.assert_valid(data)
+        samples["decode"] = measure(lambda: json.loads(body), self.warmup, self.repeat)
+        samples["validate"] = measure(lambda: validator.validate(data), self.warmup, self.repeat)
+        return {stage: StageStats(values) for stage, values in samples.items()}
+
+
+class BenchReport:
+    """Results per case and stage, with a comparison table against a baseline file
+
+    A stage is flagged as a regression when its median is more than
+    ``threshold_pct`` above the baseline median and more than ``min_delta_ms``
+    above it in absolute terms, so sub-microsecond stages do not flag on noise.
+    Under xdist the controller merge()s each worker's to_dict().
+    """
+
+    def __init__(self, threshold_pct=10.0, min_delta_ms=0.05):
+        self.results = {}
+        self.merged = {}
+        self.threshold_pct = threshold_pct
+        self.min_delta_ms = min_delta_ms
+
+    def add(self, case_name, stages):
+        self.results[case_name] = stages
+
+    def merge(self, rows):
+        """Add rows of another report's to_dict(), e.g. from an xdist worker"""
+        self.merged.update(rows)
+
+    def to_dict(self):
+        rows = dict(self.merged)
+        rows.update((f"{case}/{stage}", stats.to_dict())
+                    for case, stages in self.results.items() for stage, stats in stages.items())
+        return rows
+
+    def save(self, path):
+        """Merge these results into the baseline file; safe across xdist workers"""
+        merge_json(path, self.to_dict())
+
+    def _regressed(self, median, base):
+        delta = median - base
+        return delta > self.min_delta_ms and delta > base * self.threshold_pct / 100.0
+
+    def regressions(self, baseline):
+        return [key for key, stats in self.to_dict().items()
+                if key in baseline and self._regressed(stats["median_ms"], baseline[key]["median_ms"])]
+
+    def lines(self, baseline=None):
+        """Table rows: statistics per case and stage, then baseline median and change"""
+        baseline = baseline or {}
+        rows = [f"{'case/stage':<28} {'n':>4} {'median':>10} {'p95':>10} {'stdev':>9} {'baseline':>10} {'change':>8}"]
+        for key, stats in self.to_dict().items():
+            base = baseline.get(key)
+            if base:
+                delta = stats["median_ms"] - base["median_ms"]
+                change = f"{delta / base['median_ms']:+.1%}" if base["median_ms"] > 0 else f"{delta:+.3f}ms"
+                if self._regressed(stats["median_ms"], base["median_ms"]):
+                    change += " !"
+                base_cell = f"{base['median_ms']:8.3f}ms"
+            else:
+                change, base_cell = "new", "-"
+            rows.append(f"{key:<28} {stats['n']:>4} {stats['median_ms']:8.3f}ms {stats['p95_ms']:8.3f}ms "
+                        f"{stats['stdev_ms']:7.3f}ms {base_cell:>10} {change:>8}")
+        return rows
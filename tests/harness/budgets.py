@@ -0,0 +1,154 @@
+"""Latency and payload-size budgets per endpoint with a rolling baseline
+
+When the gate is enabled, every distinct GET a test makes through the API
+fixtures is re-issued ``samples`` times after the test body has passed. The
+samples are grouped by endpoint template. Each group is checked against:
+
+- its budget (the latency_budgets setting or a ``latency_budget`` marker): p95 of
+  the samples and the largest response body
+- the rolling baseline: median of the samples against the median of the last
+  ``window`` stored medians, failing only past both ``regression_pct`` and
+  ``min_delta_ms`` and only once ``min_history`` runs are stored, so
+  run-to-run jitter is not reported as a regression
+
+Samples that needed a retry (see harness.retry) measure the backoff rather
+than the endpoint, so they are counted in ``retried`` and left out.
+"""
+import json
+import os
+import statistics
+import time
+
+from harness.endpoints import endpoint_template
+from harness.stats import percentile
+from harness.workers import merge_json
+
+
+class PerfRegressionWarning(UserWarning):
+    """A test exceeded its latency budget or regressed against the baseline"""
+
+
+class GatedRequestContext:
+    """APIRequestContext wrapper that remembers each test's calls for re-sampling"""
+
+    def __init__(self, context, gate):
+        self._context = context
+        self._gate = gate
+
+    def get(self, url, params=None, **kwargs):
+        self._gate.note(self._context, url, params, kwargs)
+        return self._context.get(url, params=params, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._context, name)
+
+
+class EndpointSamples:
+
+    def __init__(self):
+        self.latencies = []
+        self.max_bytes = 0
+        self.retried = 0
+
+    @property
+    def median_ms(self):
+        return 1000.0 * statistics.median(self.latencies)
+
+    @property
+    def p95_ms(self):
+        return 1000.0 * percentile(sorted(self.latencies), 95)
+
+
+class PerfGate:
+    """Samples, budget checks and the rolling baseline for one session"""
+
+    def __init__(self, budgets, baseline_path, samples=5, regression_pct=25.0,
+                 min_delta_ms=5.0, window=10, min_history=3):
+        self.budgets = budgets
+        self.baseline_path = baseline_path
+        self.samples = samples
+        self.regression_pct = regression_pct
+        self.min_delta_ms = min_delta_ms
+        self.window = window
+        self.min_history = min_history
+        self.nodeid = ""
+        self.measured = 0
+        self.problems = 0
+        self._calls = {}
+        self._updated = set()
+        self._baseline = self._load()
+
+    def _load(self):
+        if not os.path.exists(self.baseline_path):
+            return {}
+        with open(self.baseline_path) as fh:
+            return json.load(fh)
+
+    def save(self):
+        """Merge this process's series into the baseline file; safe across xdist workers"""
+        if self._updated:
+            merge_json(self.baseline_path, {key: self._baseline[key] for key in self._updated})
+
+    def note(self, context, url, params, kwargs):
+        key = (url, tuple(sorted((str(k), str(v)) for k, v in (params or {}).items())))
+        calls = self._calls.setdefault(self.nodeid, {})
+        calls.setdefault(key, (context, url, params, kwargs))
+
+    def discard(self, nodeid):
+        """Forget a test's calls without sampling them, e.g. after it failed"""
+        self._calls.pop(nodeid, None)
+
+    def sample(self, nodeid):
+        """Re-issue each distinct call of a test; samples grouped by endpoint template"""
+        groups = {}
+        for context, url, params, kwargs in self._calls.pop(nodeid, {}).values():
+            group = groups.setdefault(endpoint_template(url), EndpointSamples())
+            for _ in range(self.samples):
+                started = time.perf_counter()
+                response = context.get(url, params=params, **kwargs)
+                size = len(response.body())
+                elapsed = time.perf_counter() - started
+                group.max_bytes = max(group.max_bytes, size)
+                if getattr(context, "last_attempts", 1) > 1:
+                    group.retried += 1
+                    continue
+                group.latencies.append(elapsed)
+        return groups
+
+    def check(self, nodeid, marker_budgets=()):
+        """Sample a finished test and return a list of budget/regression problems"""
+        problems = []
+        for endpoint, group in self.sample(nodeid).items():
+            if not group.latencies:
+                continue
+            self.measured += 1
+            budget = dict(self.budgets.get(endpoint, {}))
+            for marker_budget in marker_budgets:
+                if marker_budget.get("endpoint") in (None, endpoint):
+                    budget.update({k: v for k, v in marker_budget.items() if k != "endpoint"})
+
+            if "p95_ms" in budget and group.p95_ms > budget["p95_ms"]:
+                problems.append(f"{endpoint}: p95 {group.p95_ms:.1f}ms over budget {budget['p95_ms']}ms "
+                                f"({len(group.latencies)} samples)")
+            if "max_bytes" in budget and group.max_bytes > budget["max_bytes"]:
+                problems.append(f"{endpoint}: {group.max_bytes} bytes over budget {budget['max_bytes']} bytes")
+
+            key = f"{nodeid}::{endpoint}"
+            history = self._baseline.get(key, [])
+            median = group.median_ms
+            regressed = False
+            if len(history) >= self.min_history:
+                reference = statistics.median(history)
+                delta = median - reference
+                # A 0ms reference has no relative threshold; only min_delta_ms applies
+                relative = reference <= 0 or delta > reference * self.regression_pct / 100.0
+                if delta > self.min_delta_ms and relative:
+                    regressed = True
+                    change = f"{delta / reference:+.0%}" if reference > 0 else f"{delta:+.1f}ms"
+                    problems.append(f"{endpoint}: median {median:.1f}ms regressed {change} "
+                                    f"against baseline {reference:.1f}ms (last {len(history)} runs)")
+            if not regressed:
+                self._baseline[key] = (history + [round(median, 3)])[-self.window:]
+                self._updated.add(key)
+        self.problems += bool(problems)
+        return problems
@@ -0,0 +1,142 @@
+"""Per-session memoization of idempotent GET responses"""
+import json
+from collections import OrderedDict
+
+
+class CachedResponse:
+    """Detached copy of an APIResponse that outlives its request context"""
+
+    def __init__(self, url, status, status_text, headers, body, from_cache=False):
+        self.url = url
+        self.status = status
+        self.status_text = status_text
+        self.headers = headers
+        self.from_cache = from_cache
+        self._body = body
+
+    @classmethod
+    def from_response(cls, response):
+        return cls(response.url, response.status, response.status_text,
+                   dict(response.headers), response.body())
+
+    def as_hit(self):
+        """Copy marked as served from the cache; the body bytes are shared"""
+        return CachedResponse(self.url, self.status, self.status_text, self.headers,
+                              self._body, from_cache=True)
+
+    @property
+    def ok(self):
+        return 200 <= self.status <= 299
+
+    @property
+    def size(self):
+        return len(self._body)
+
+    def body(self):
+        return self._body
+
+    def text(self):
+        return self._body.decode("utf-8")
+
+    def json(self):
+        return json.loads(self._body)
+
+    def dispose(self):
+        pass
+
+
+CONDITIONAL_HEADERS = ("if-none-match", "if-modified-since")
+
+
+def conditional(headers):
+    """The conditional-request validators among request headers, by lower-case name"""
+    return {name.lower(): value for name, value in (headers or {}).items() if name.lower() in CONDITIONAL_HEADERS}
+
+
+def request_key(method, url, params, auth):
+    """Cache key for a request: (method, path, sorted params, auth header)"""
+    items = tuple(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+    return method.upper(), url, items, auth
+
+
+class ResponseCache:
+    """LRU of CachedResponse objects bounded by total body bytes"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.evictions = 0
+        self.bypass = False
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        response = self._entries.get(key)
+        if response is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return response
+
+    def put(self, key, response):
+        if response.size > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.bytes_used -= previous.size
+        self._entries[key] = response
+        self.bytes_used += response.size
+        while self.bytes_used > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.bytes_used -= evicted.size
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes_used = 0
+
+    def summary(self):
+        lookups = self.hits + self.misses
+        ratio = self.hits / lookups if lookups else 0.0
+        return (f"hits={self.hits} misses={self.misses} bypassed={self.bypassed} "
+                f"hit_ratio={ratio:.1%} entries={len(self)} "
+                f"bytes={self.bytes_used}/{self.max_bytes} evictions={self.evictions}")
+
+
+class CachingRequestContext:
+    """APIRequestContext wrapper that serves repeated successful GETs from a ResponseCache
+
+    While the cache's ``bypass`` flag is set, requests go straight through
+    without reading or populating the cache. So do conditional GETs: they ask
+    the server whether a copy is still current, which a cached 200 cannot answer.
+    """
+
+    def __init__(self, context, cache, headers=None):
+        self._context = context
+        self._cache = cache
+        self._auth = (headers or {}).get("Authorization")
+
+    def get(self, url, params=None, **kwargs):
+        if self._cache.bypass or conditional(kwargs.get("headers")):
+            self._cache.bypassed += 1
+            return self._context.get(url, params=params, **kwargs)
+
+        auth = (kwargs.get("headers") or {}).get("Authorization", self._auth)
+        key = request_key("GET", url, params, auth)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached.as_hit()
+
+        response = CachedResponse.from_response(self._context.get(url, params=params, **kwargs))
+        if response.ok:
+            self._cache.put(key, response)
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self._context, name)
@@ -0,0 +1,210 @@
+"""Record/replay cassettes of API responses for offline reruns
+
+A cassette directory holds two files:
+
+- bodies.pack: zlib-compressed response bodies, one after another. Each
+  distinct body is stored once, keyed by the SHA-256 of its uncompressed
+  bytes, so identical payloads recorded for different requests or sites
+  share one copy.
+- index.json: request key -> status, headers, body digest and recording
+  time, plus body digest -> (offset, length) in bodies.pack.
+
+Conditional GETs (If-None-Match / If-Modified-Since) are keyed with their
+validators, so a recorded 304 is only replayed for the same conditional
+request. A conditional request with no recording of its own replays the full
+response of the plain GET, which is always a valid answer to it.
+
+Replay memory-maps bodies.pack and decompresses a body only when a request
+asks for it, so replays make no network calls and load no unused bodies.
+"""
+import hashlib
+import json
+import mmap
+import os
+import time
+import zlib
+from urllib.parse import urlencode
+
+from harness.cache import CachedResponse, conditional, request_key
+from harness.workers import locked
+
+
+INDEX_FILE = "index.json"
+PACK_FILE = "bodies.pack"
+
+RECORD = "record"
+REPLAY = "replay"
+
+
+class CassetteMiss(AssertionError):
+    """Replay mode found no recording for a request"""
+
+
+class StaleCassetteWarning(UserWarning):
+    """Replayed recordings are older than --cassette-max-age"""
+
+
+def cassette_key(url, params, auth, validators=None):
+    """Stable string key for a GET; the auth header is stored only as a hash"""
+    method, path, items, _ = request_key("GET", url, params, auth)
+    auth_hash = hashlib.sha256(auth.encode()).hexdigest()[:16] if auth else "-"
+    query = f"?{urlencode(items)}" if items else ""
+    key = f"{method} {path}{query} auth={auth_hash}"
+    for name, value in sorted((validators or {}).items()):
+        key += f" {name}={value}"
+    return key
+
+
+class Cassette:
+    """On-disk store of recorded responses, opened for recording or replay
+
+    ``max_age`` is in seconds; replayed entries older than that are counted in
+    ``stale_hits`` and listed by stale_entries().
+    """
+
+    def __init__(self, directory, mode, max_age=None, clock=time.time):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"cassette mode must be {RECORD!r} or {REPLAY!r}, got {mode!r}")
+        self.directory = directory
+        self.mode = mode
+        self.max_age = max_age
+        self._clock = clock
+        self.index_path = os.path.join(directory, INDEX_FILE)
+        self.pack_path = os.path.join(directory, PACK_FILE)
+        self.entries = {}
+        self.blobs = {}
+        self.recorded = 0
+        self.replayed = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self._pending_entries = {}
+        self._pending_bodies = {}
+        self._pack = None
+        self._pack_file = None
+        if mode == REPLAY:
+            self._open_for_replay()
+
+    def _read_index(self):
+        if not os.path.exists(self.index_path):
+            return {}, {}
+        with open(self.index_path) as fh:
+            index = json.load(fh)
+        return index["entries"], index["blobs"]
+
+    def _open_for_replay(self):
+        self.entries, self.blobs = self._read_index()
+        if os.path.exists(self.pack_path) and os.path.getsize(self.pack_path):
+            self._pack_file = open(self.pack_path, "rb")
+            self._pack = mmap.mmap(self._pack_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self):
+        return len(self.entries) + len(self._pending_entries)
+
+    def record(self, url, params, auth, response, validators=None):
+        """Keep a response for save(); bodies already seen are not stored twice"""
+        body = response.body()
+        digest = hashlib.sha256(body).hexdigest()
+        if digest not in self.blobs and digest not in self._pending_bodies:
+            self._pending_bodies[digest] = zlib.compress(body)
+        self._pending_entries[cassette_key(url, params, auth, validators)] = {
+            "url": response.url,
+            "status": response.status,
+            "status_text": response.status_text,
+            "headers": dict(response.headers),
+            "body": digest,
+            "size": len(body),
+            "recorded_at": self._clock(),
+        }
+        self.recorded += 1
+
+    def play(self, url, params, auth, validators=None):
+        """The recorded response for a request, or CassetteMiss"""
+        key = cassette_key(url, params, auth, validators)
+        entry = self.entries.get(key)
+        if entry is None and validators:
+            entry = self.entries.get(cassette_key(url, params, auth))
+        if entry is None:
+            self.misses += 1
+            raise CassetteMiss(f"No recording for {key} in {self.directory}; "
+                               f"re-record with --cassette=record")
+        offset, length = self.blobs[entry["body"]]
+        body = zlib.decompress(self._pack[offset:offset + length])
+        if self._is_stale(entry):
+            self.stale_hits += 1
+        self.replayed += 1
+        return CachedResponse(entry["url"], entry["status"], entry["status_text"], entry["headers"],
+                              body, from_cache=True)
+
+    def _is_stale(self, entry):
+        return self.max_age is not None and self._clock() - entry["recorded_at"] > self.max_age
+
+    def stale_entries(self):
+        """Keys of recordings older than max_age"""
+        return [key for key, entry in self.entries.items() if self._is_stale(entry)]
+
+    def save(self):
+        """Merge pending recordings into the directory under an inter-process lock
+
+        Safe to call from several xdist workers: each one re-reads the index,
+        appends only bodies not yet in the pack, and replaces the index atomically.
+        """
+        if not self._pending_entries:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        with locked(self.index_path):
+            entries, blobs = self._read_index()
+            with open(self.pack_path, "ab") as pack:
+                offset = pack.tell()
+                for digest, compressed in self._pending_bodies.items():
+                    if digest in blobs:
+                        continue
+                    pack.write(compressed)
+                    blobs[digest] = (offset, len(compressed))
+                    offset += len(compressed)
+            entries.update(self._pending_entries)
+            tmp_path = f"{self.index_path}.tmp.{os.getpid()}"
+            with open(tmp_path, "w") as fh:
+                json.dump({"entries": entries, "blobs": blobs}, fh, sort_keys=True)
+            os.replace(tmp_path, self.index_path)
+        self.entries, self.blobs = entries, blobs
+        self._pending_entries = {}
+        self._pending_bodies = {}
+
+    def close(self):
+        if self._pack is not None:
+            self._pack.close()
+            self._pack_file.close()
+            self._pack = self._pack_file = None
+
+    def summary(self):
+        if self.mode == RECORD:
+            pack_bytes = os.path.getsize(self.pack_path) if os.path.exists(self.pack_path) else 0
+            return (f"recorded {self.recorded} responses into {self.directory}: "
+                    f"{len(self.entries)} requests, {len(self.blobs)} distinct bodies, "
+                    f"{pack_bytes} bytes compressed")
+        return (f"replayed {self.replayed} responses from {self.directory}, "
+                f"{self.misses} misses, {self.stale_hits} stale")
+
+
+class CassetteRequestContext:
+    """APIRequestContext wrapper that records GETs to, or replays them from, a Cassette
+
+    In replay mode the wrapped context is never called.
+    """
+
+    def __init__(self, context, cassette, headers=None):
+        self._context = context
+        self._cassette = cassette
+        self._auth = (headers or {}).get("Authorization")
+
+    def get(self, url, params=None, **kwargs):
+        auth = (kwargs.get("headers") or {}).get("Authorization", self._auth)
+        validators = conditional(kwargs.get("headers"))
+        if self._cassette.mode == REPLAY:
+            return self._cassette.play(url, params, auth, validators)
+        response = CachedResponse.from_response(self._context.get(url, params=params, **kwargs))
+        self._cassette.record(url, params, auth, response, validators)
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self._context, name)
@@ -0,0 +1,231 @@
+"""Columnar typed-array storage for forecast points and measurement values
+
+Forecast points and entity state are decoded into one ``array('d')`` per
+metric or measurement type (8 bytes per value instead of a dict entry plus a
+float object). Checks run over whole columns with builtins (min, max, map,
+sum), so the per-value loop stays in C. Missing and non-numeric values are
+stored as NaN and counted separately from NaNs the API actually sent.
+"""
+import math
+import operator
+from array import array
+from datetime import datetime
+from itertools import islice
+
+import config
+
+
+# Plausible bounds per forecast metric; values outside are reported
+FORECAST_RANGES = {
+    "dryBulbTemperature": (-90.0, 60.0),
+    "wetBulbTemperature": (-90.0, 60.0),
+    "dewPointTemperature": (-90.0, 60.0),
+    "relativeHumidity": (0.0, 100.0),
+}
+
+# Bounds for measurement types that have natural limits
+MEASUREMENT_RANGES = {
+    "PowerFactor": (-1.0, 1.0),
+    "SoC": (0.0, 100.0),
+    "SoH": (0.0, 100.0),
+    "THDI": (0.0, 100.0),
+    "THDV": (0.0, 100.0),
+    "Humidity": (0.0, 100.0),
+    "Frequency": (0.0, 1000.0),
+    "RemainingTime": (0.0, math.inf),
+}
+
+_NUMERIC = frozenset((int, float))
+_NAN = math.nan
+
+
+def nan_count(column):
+    return sum(map(math.isnan, column))
+
+
+def out_of_range_count(column, low, high):
+    """Values below low or above high; NaN compares false and is not counted"""
+    if not column or (min(column) >= low and max(column) <= high):
+        return 0
+    return sum(map(float(low).__gt__, column)) + sum(map(float(high).__lt__, column))
+
+
+def non_increasing_steps(column):
+    """Number of positions where a value is not greater than the one before it"""
+    return sum(map(operator.ge, column, islice(column, 1, None)))
+
+
+def epoch_seconds(timestamp):
+    """Seconds since the epoch for an ISO 8601 timestamp, NaN if it does not parse"""
+    try:
+        return datetime.fromisoformat(timestamp.replace("Z", "+00:00")).timestamp()
+    except (AttributeError, TypeError, ValueError):
+        return _NAN
+
+
+class Columns:
+    """Named float64 columns backed by array('d')
+
+    Columns grow independently; ``invalid[name]`` counts missing or
+    non-numeric values (bools included) that were stored as NaN.
+    """
+
+    def __init__(self, names):
+        self.data = {name: array("d") for name in names}
+        self.invalid = dict.fromkeys(self.data, 0)
+
+    def __getitem__(self, name):
+        return self.data[name]
+
+    def __contains__(self, name):
+        return name in self.data
+
+    def add_column(self, name):
+        self.data.setdefault(name, array("d"))
+        self.invalid.setdefault(name, 0)
+
+    def extend_column(self, name, values):
+        column = self.data[name]
+        if set(map(type, values)) <= _NUMERIC:
+            column.extend(values)
+            return
+        numeric = [value if type(value) in _NUMERIC else _NAN for value in values]
+        self.invalid[name] += sum(1 for value in values if type(value) not in _NUMERIC)
+        column.extend(numeric)
+
+    def extend_rows(self, rows):
+        """Append one value per column from each row dict"""
+        for name in self.data:
+            self.extend_column(name, [row.get(name) for row in rows])
+
+    def clear(self):
+        for name in self.data:
+            self.data[name] = array("d")
+            self.invalid[name] = 0
+
+    @property
+    def nbytes(self):
+        return sum(len(column) * column.itemsize for column in self.data.values())
+
+    def problems(self, ranges):
+        """Invalid, NaN and out-of-range counts per column"""
+        problems = []
+        for name, column in self.data.items():
+            invalid = self.invalid[name]
+            if invalid:
+                problems.append(f"{name}: {invalid} missing or non-numeric values")
+            nans = nan_count(column) - invalid
+            if nans:
+                problems.append(f"{name}: {nans} NaN values")
+            if name in ranges:
+                low, high = ranges[name]
+                outside = out_of_range_count(column, low, high)
+                if outside:
+                    problems.append(f"{name}: {outside} values outside [{low}, {high}]")
+        return problems
+
+
+def _assert_no_problems(problems, what):
+    if problems:
+        raise AssertionError(f"{len(problems)} {what} problems:\n  " + "\n  ".join(problems))
+
+
+class ForecastColumns:
+    """Forecast points as a timestamp column plus one column per metric
+
+    Reuse one instance across coordinates with clear() to validate many
+    locations in the memory of one.
+    """
+
+    def __init__(self, metrics):
+        self.timestamps = array("d")
+        self.invalid_timestamps = 0
+        self.metrics = Columns(metrics)
+
+    @classmethod
+    def from_payload(cls, payload):
+        data = payload["data"]
+        columns = cls(metric["name"] for metric in data["metrics"])
+        columns.extend(data["points"])
+        return columns
+
+    def extend(self, points):
+        timestamps = [epoch_seconds(point.get("timestamp")) for point in points]
+        self.invalid_timestamps += nan_count(timestamps)
+        self.timestamps.extend(timestamps)
+        self.metrics.extend_rows(points)
+
+    def clear(self):
+        self.timestamps = array("d")
+        self.invalid_timestamps = 0
+        self.metrics.clear()
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def __getitem__(self, metric):
+        return self.metrics[metric]
+
+    @property
+    def nbytes(self):
+        return len(self.timestamps) * self.timestamps.itemsize + self.metrics.nbytes
+
+    def problems(self, ranges=FORECAST_RANGES):
+        problems = []
+        if self.invalid_timestamps:
+            problems.append(f"timestamp: {self.invalid_timestamps} missing or unparseable values")
+        steps = non_increasing_steps(self.timestamps)
+        if steps:
+            problems.append(f"timestamp: {steps} points not after the previous point")
+        return problems + self.metrics.problems(ranges)
+
+    def assert_valid(self, ranges=FORECAST_RANGES):
+        _assert_no_problems(self.problems(ranges), "forecast")
+
+
+class MeasurementColumns:
+    """Entity state values from /details, one column per measurementType
+
+    Measurement types outside config.MEASUREMENT_TYPES get a column too and
+    are counted in ``unknown_types``.
+    """
+
+    def __init__(self, measurement_types=config.MEASUREMENT_TYPES):
+        self.known_types = frozenset(measurement_types)
+        self.values = Columns(measurement_types)
+        self.unknown_types = {}
+
+    @classmethod
+    def from_entities(cls, entities, **kwargs):
+        columns = cls(**kwargs)
+        columns.add_entities(entities)
+        return columns
+
+    def add_entities(self, entities):
+        buckets = {}
+        for entity in entities:
+            state = entity.get("state")
+            if not state:
+                continue
+            for key, measurement in state.items():
+                buckets.setdefault(measurement.get("measurementType", key), []).append(measurement.get("value"))
+        for measurement_type, values in buckets.items():
+            if measurement_type not in self.known_types:
+                self.unknown_types[measurement_type] = self.unknown_types.get(measurement_type, 0) + len(values)
+                self.values.add_column(measurement_type)
+            self.values.extend_column(measurement_type, values)
+
+    def __getitem__(self, measurement_type):
+        return self.values[measurement_type]
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes
+
+    def problems(self, ranges=MEASUREMENT_RANGES):
+        problems = [f"{name}: {count} values of an unknown measurementType"
+                    for name, count in self.unknown_types.items()]
+        return problems + self.values.problems(ranges)
+
+    def assert_valid(self, ranges=MEASUREMENT_RANGES):
+        _assert_no_problems(self.problems(ranges), "measurement")
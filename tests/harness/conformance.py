@@ -0,0 +1,179 @@
+"""Conformance of /details payloads to the /model catalog
+
+ModelCatalog turns the model (as indexed by harness.metadata) into frozen
+lookup tables, once per session:
+
+- the entity, relationship and measurement type sets, each joined with the
+  config.py vocabulary, so a type declared in either place is accepted
+- measurementType -> unit, and the set of valid (measurementType, unit)
+  pairs, so a well-formed measurement costs one tuple lookup
+- entityType -> allowed attribute names, for types whose model definition
+  lists ``attributes``; other types accept any attribute
+
+ConformanceChecker looks up every entity, relationship and measurement in
+those tables. Each lookup is a set or dict membership test, so checking adds
+little to a streamed pass over the payload. Use it as a MemberStream consumer
+next to StreamValidator and SiteGraph. Violations are collected, not raised,
+so one run lists every problem. Types and units that are not strings are
+flagged before any lookup, so a malformed element is reported instead of
+breaking the run.
+"""
+from dataclasses import dataclass
+from types import MappingProxyType
+
+import config
+from harness.metadata import index_model
+from harness.schema import Violation
+
+
+def _kind(value):
+    return type(value).__name__
+
+
+@dataclass(frozen=True)
+class ModelCatalog:
+    """Frozen lookup tables built from /model; see the module docstring"""
+
+    entity_types: frozenset
+    relationship_types: frozenset
+    measurement_units: MappingProxyType
+    measurement_keys: frozenset
+    attributes: MappingProxyType
+
+    @classmethod
+    def from_index(cls, model, entity_types=config.ENTITY_TYPES, relationship_types=config.RELATIONSHIP_TYPES,
+                   measurement_types=config.MEASUREMENT_TYPES):
+        """Catalog from a model index (MetadataCache.model()) plus the given vocabularies"""
+        units = dict.fromkeys(measurement_types)
+        units.update((name, item.get("unit")) for name, item in model["measurements"].items())
+        keys = {(name, None) for name in units}
+        keys.update((name, unit) for name, unit in units.items() if unit is not None)
+        return cls(
+            entity_types=frozenset(model["entityTypes"]).union(entity_types),
+            relationship_types=frozenset(model["relationships"]).union(relationship_types),
+            measurement_units=MappingProxyType(units),
+            measurement_keys=frozenset(keys),
+            attributes=MappingProxyType({
+                name: frozenset(item["attributes"])
+                for name, item in model["entityTypes"].items() if "attributes" in item
+            }),
+        )
+
+    @classmethod
+    def from_payload(cls, payload, **kwargs):
+        """Catalog from a raw /model payload"""
+        return cls.from_index(index_model(payload), **kwargs)
+
+
+class ConformanceChecker:
+    """Check /details elements against a ModelCatalog, collecting violations
+
+    ``counts`` has the elements checked per kind. ``total`` counts every
+    violation, but only the first ``max_violations`` are kept in
+    ``violations``, so a badly broken million-entity site does not hold
+    millions of messages.
+    """
+
+    def __init__(self, catalog, max_violations=1000):
+        self.catalog = catalog
+        self.max_violations = max_violations
+        self.violations = []
+        self.total = 0
+        self.counts = {"entities": 0, "relationships": 0}
+
+    def _flag(self, path, message):
+        self.total += 1
+        if len(self.violations) < self.max_violations:
+            self.violations.append(Violation(path, message))
+
+    def _check_measurement(self, measurement, path, expected_type=None):
+        """Flag what is wrong with a measurement that failed the fast (type, unit) lookup"""
+        measurement_type = measurement.get("measurementType")
+        units = self.catalog.measurement_units
+        if type(measurement_type) is not str:
+            self._flag((path, "measurementType"), f"measurementType must be a string, got {_kind(measurement_type)}")
+            return
+        if measurement_type not in units:
+            self._flag((path, "measurementType"), f"measurementType {measurement_type!r} is not declared in /model")
+            return
+        if expected_type is not None and measurement_type != expected_type:
+            self._flag((path, "measurementType"), f"state key {expected_type!r} holds a {measurement_type!r}")
+        unit, declared = measurement.get("unit"), units[measurement_type]
+        if unit is not None and type(unit) is not str:
+            self._flag((path, "unit"), f"unit must be a string, got {_kind(unit)}")
+        elif unit is not None and declared is not None and unit != declared:
+            self._flag((path, "unit"), f"unit {unit!r} for {measurement_type}, /model declares {declared!r}")
+
+    def check_entity(self, entity, index):
+        catalog = self.catalog
+        keys = catalog.measurement_keys
+        entity_type = entity.get("type")
+        if type(entity_type) is not str:
+            self._flag((((None, "entities"), index), "type"), f"entity type must be a string, got {_kind(entity_type)}")
+            entity_type = None
+        elif entity_type not in catalog.entity_types:
+            self._flag((((None, "entities"), index), "type"), f"entity type {entity_type!r} is not declared in /model")
+        attributes = entity.get("attributes")
+        if type(attributes) is dict:
+            allowed = catalog.attributes.get(entity_type)
+            if allowed is not None and not allowed.issuperset(attributes):
+                extra = sorted(set(attributes) - allowed)
+                self._flag((((None, "entities"), index), "attributes"),
+                           f"{entity_type} does not declare attribute(s) {', '.join(extra)}")
+            for name, value in attributes.items():
+                if type(value) is dict and "measurementType" in value:
+                    measurement_type, unit = value["measurementType"], value.get("unit")
+                    if (type(measurement_type) is not str or (unit is not None and type(unit) is not str)
+                            or (measurement_type, unit) not in keys):
+                        self._check_measurement(value, ((((None, "entities"), index), "attributes"), name))
+        state = entity.get("state")
+        if type(state) is dict:
+            for name, value in state.items():
+                if type(value) is dict:
+                    unit = value.get("unit")
+                    if (value.get("measurementType") != name or (unit is not None and type(unit) is not str)
+                            or (name, unit) not in keys):
+                        self._check_measurement(value, ((((None, "entities"), index), "state"), name), name)
+
+    def check_relationship(self, relationship, index):
+        relationship_type = relationship.get("type")
+        if type(relationship_type) is not str:
+            self._flag((((None, "relationships"), index), "type"),
+                       f"relationship type must be a string, got {_kind(relationship_type)}")
+        elif relationship_type not in self.catalog.relationship_types:
+            self._flag((((None, "relationships"), index), "type"),
+                       f"relationship type {relationship_type!r} is not declared in /model")
+
+    def add_member(self, key, value):
+        """Check one streamed (key, element) pair, see harness.streaming"""
+        if type(value) is not dict:
+            return
+        if key == "relationships":
+            index = self.counts["relationships"]
+            self.counts["relationships"] = index + 1
+            relationship_type = value.get("type")
+            if type(relationship_type) is not str or relationship_type not in self.catalog.relationship_types:
+                self.check_relationship(value, index)
+        elif key == "entities":
+            index = self.counts["entities"]
+            self.counts["entities"] = index + 1
+            self.check_entity(value, index)
+
+    def check_payload(self, payload):
+        """Check a decoded /details payload or page; returns the violations so far"""
+        for key in ("entities", "relationships"):
+            for element in payload.get(key, ()):
+                self.add_member(key, element)
+        return self.violations
+
+    def report(self, max_reported=20):
+        lines = [f"{self.total} conformance violation(s) in {self.counts['entities']} entities "
+                 f"and {self.counts['relationships']} relationships:"]
+        shown = self.violations[:max_reported]
+        lines.extend(f"  {violation!r}" for violation in shown)
+        if self.total > len(shown):
+            lines.append(f"  ... and {self.total - len(shown)} more")
+        return "\n".join(lines)
+
+    def assert_conforms(self):
+        assert not self.total, self.report()
@@ -0,0 +1,20 @@
+"""Endpoint templates used to group per-call measurements"""
+from urllib.parse import urlsplit
+
+
+# Path prefix -> template for endpoints with a path parameter
+PATH_PARAMETERS = (
+    ("/twin/datacenter/v1/details/", "/twin/datacenter/v1/details/{site_id}"),
+)
+
+
+def endpoint_template(url):
+    """Template for a request URL, e.g. /twin/datacenter/v1/details/{site_id}
+
+    Accepts absolute or relative URLs; the query string is dropped.
+    """
+    path = urlsplit(url).path or "/"
+    for prefix, template in PATH_PARAMETERS:
+        if path.startswith(prefix) and "/" not in path[len(prefix):]:
+            return template
+    return path
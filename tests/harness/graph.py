@@ -0,0 +1,192 @@
+"""Indexed in-memory graph of a /details subgraph for topology assertions
+
+SiteGraph is filled page by page (add_page) or from one payload, and keeps
+entities by id and type plus adjacency per relationship type. Referential
+integrity, inverse pairing and power-flow cycle checks each visit every edge
+once, so they stay linear on sites with millions of relationships instead of
+rescanning the relationship list per check.
+"""
+# Forward relationship type -> inverse type that must accompany it
+INVERSE_PAIRS = {
+    "feeds": "fedBy",
+    "controls": "controlledBy",
+    "protects": "protectedBy",
+}
+
+# Relationship types along which power flows downstream
+POWER_FLOW_TYPES = ("feeds", "suppliesPowerTo")
+
+
+class SiteGraph:
+    """Entities and relationships of one site, indexed for O(1) lookups
+
+    ``adjacency[rel_type][source]`` maps each target to the relationship id,
+    in the order the relationships arrived.
+    """
+
+    def __init__(self, inverse_pairs=INVERSE_PAIRS):
+        self.entity_by_id = {}
+        self.ids_by_type = {}
+        self.adjacency = {}
+        self.relationship_count = 0
+        self.duplicate_relationships = []
+        self.inverse_of = dict(inverse_pairs)
+        self.inverse_of.update({inverse: forward for forward, inverse in inverse_pairs.items()})
+
+    @classmethod
+    def from_payload(cls, payload, **kwargs):
+        graph = cls(**kwargs)
+        graph.add_page(payload)
+        return graph
+
+    @classmethod
+    def from_pages(cls, pages, **kwargs):
+        graph = cls(**kwargs)
+        for page in pages:
+            graph.add_page(page)
+        return graph
+
+    def add_page(self, page):
+        """Index the entities and relationships of one details page"""
+        self.add_entities(page.get("entities", ()))
+        self.add_relationships(page.get("relationships", ()))
+
+    def add_member(self, key, value):
+        """Index one streamed (key, element) pair, see harness.streaming"""
+        if key == "entities":
+            self.add_entities((value,))
+        elif key == "relationships":
+            self.add_relationships((value,))
+
+    def add_entities(self, entities):
+        entity_by_id = self.entity_by_id
+        ids_by_type = self.ids_by_type
+        for entity in entities:
+            entity_id = entity["id"]
+            if entity_id not in entity_by_id:
+                ids_by_type.setdefault(entity["type"], []).append(entity_id)
+            entity_by_id[entity_id] = entity
+
+    def add_relationships(self, relationships):
+        adjacency = self.adjacency
+        for relationship in relationships:
+            targets = adjacency.setdefault(relationship["type"], {}).setdefault(relationship["source"], {})
+            target = relationship["target"]
+            if target in targets:
+                self.duplicate_relationships.append(relationship["id"])
+                continue
+            targets[target] = relationship["id"]
+            self.relationship_count += 1
+
+    def __contains__(self, entity_id):
+        return entity_id in self.entity_by_id
+
+    def __getitem__(self, entity_id):
+        return self.entity_by_id[entity_id]
+
+    def entities_of_type(self, entity_type):
+        return [self.entity_by_id[entity_id] for entity_id in self.ids_by_type.get(entity_type, ())]
+
+    def targets(self, source, rel_type):
+        """Ids the source points to through rel_type"""
+        return list(self.adjacency.get(rel_type, {}).get(source, ()))
+
+    def has_edge(self, source, rel_type, target):
+        return target in self.adjacency.get(rel_type, {}).get(source, ())
+
+    def edges(self, rel_type=None):
+        """(relationship id, source, type, target) for every edge, or only rel_type"""
+        rel_types = self.adjacency if rel_type is None else (rel_type,)
+        for current_type in rel_types:
+            for source, targets in self.adjacency.get(current_type, {}).items():
+                for target, relationship_id in targets.items():
+                    yield relationship_id, source, current_type, target
+
+    def dangling_references(self):
+        """Problems for relationships whose source or target is not a known entity"""
+        entity_by_id = self.entity_by_id
+        problems = []
+        for rel_type, by_source in self.adjacency.items():
+            for source, targets in by_source.items():
+                if source not in entity_by_id:
+                    problems.extend(f"{relationship_id} ({rel_type}): unknown source {source!r}"
+                                    for relationship_id in targets.values())
+                for target, relationship_id in targets.items():
+                    if target not in entity_by_id:
+                        problems.append(f"{relationship_id} ({rel_type}): unknown target {target!r}")
+        return problems
+
+    def missing_inverses(self):
+        """Problems for paired relationships without their inverse edge"""
+        problems = []
+        for rel_type, inverse in self.inverse_of.items():
+            inverse_adjacency = self.adjacency.get(inverse, {})
+            for source, targets in self.adjacency.get(rel_type, {}).items():
+                for target, relationship_id in targets.items():
+                    if source not in inverse_adjacency.get(target, ()):
+                        problems.append(f"{relationship_id}: {source} {rel_type} {target} "
+                                        f"has no {target} {inverse} {source}")
+        return problems
+
+    def find_cycle(self, rel_types=POWER_FLOW_TYPES):
+        """Entity ids of one cycle along rel_types (first id repeated at the end), or None
+
+        Peels off nodes with no remaining incoming edges (Kahn's algorithm);
+        whatever is left lies on or behind a cycle, and walking predecessors
+        from any leftover node must come back round to one.
+        """
+        layers = [self.adjacency[rel_type] for rel_type in rel_types if self.adjacency.get(rel_type)]
+        if not layers:
+            return None
+        if len(layers) == 1:
+            successors = layers[0]
+        else:
+            successors = {}
+            for layer in layers:
+                for source, targets in layer.items():
+                    successors.setdefault(source, {}).update(targets)
+
+        indegree = {}
+        for targets in successors.values():
+            for target in targets:
+                indegree[target] = indegree.get(target, 0) + 1
+        ready = [node for node in successors if node not in indegree]
+        while ready:
+            for target in successors.get(ready.pop(), ()):
+                indegree[target] -= 1
+                if not indegree[target]:
+                    ready.append(target)
+
+        remaining = {node for node, count in indegree.items() if count}
+        if not remaining:
+            return None
+        predecessor = {}
+        for source, targets in successors.items():
+            if source in remaining:
+                for target in targets:
+                    if target in remaining:
+                        predecessor.setdefault(target, source)
+        order = {}
+        node = next(iter(remaining))
+        while node not in order:
+            order[node] = len(order)
+            node = predecessor[node]
+        walked = list(order)[order[node]:]
+        walked.reverse()
+        return walked + [walked[0]]
+
+    def problems(self):
+        """Every referential, inverse, duplicate and power-flow cycle problem"""
+        problems = self.dangling_references() + self.missing_inverses()
+        problems.extend(f"{relationship_id}: duplicate edge" for relationship_id in self.duplicate_relationships)
+        cycle = self.find_cycle()
+        if cycle is not None:
+            problems.append("power flow cycle: " + " -> ".join(cycle))
+        return problems
+
+    def assert_consistent(self, limit=20):
+        problems = self.problems()
+        if problems:
+            shown = "\n  ".join(problems[:limit])
+            more = f"\n  ... and {len(problems) - limit} more" if len(problems) > limit else ""
+            raise AssertionError(f"{len(problems)} graph problems:\n  {shown}{more}")
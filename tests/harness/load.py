@@ -0,0 +1,200 @@
+"""Load-test mode: replay the HTTP calls of the selected tests under concurrency
+
+During the functional run RecordingRequestContext captures every call a test
+makes through the API fixtures. LoadRunner then replays those calls round-robin
+from N concurrent workers for a fixed duration or request count and reports
+latency percentiles, throughput and error rate per endpoint.
+"""
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+
+from harness.async_client import AsyncEngine
+from harness.endpoints import endpoint_template
+from harness.stats import latency_summary
+
+
+@dataclass(frozen=True)
+class RecordedCall:
+    """One HTTP call captured from a functional test"""
+
+    base_url: str
+    url: str
+    params: tuple
+    headers: tuple
+    expected_status: int
+    nodeid: str = ""
+
+    @property
+    def endpoint(self):
+        return f"GET {endpoint_template(self.url)}"
+
+
+class CallRecorder:
+    """Collects the calls made by tests, tagged with the running test's node ID"""
+
+    def __init__(self):
+        self.calls = []
+        self.nodeid = ""
+
+    def record(self, base_url, url, params, headers, status):
+        self.calls.append(RecordedCall(
+            base_url=base_url,
+            url=url,
+            params=tuple(sorted((str(k), str(v)) for k, v in (params or {}).items())),
+            headers=tuple(sorted(headers.items())),
+            expected_status=status,
+            nodeid=self.nodeid,
+        ))
+
+
+class RecordingRequestContext:
+    """APIRequestContext wrapper that reports every GET to a CallRecorder"""
+
+    def __init__(self, context, recorder, base_url, headers=None):
+        self._context = context
+        self._recorder = recorder
+        self._base_url = base_url
+        self._headers = dict(headers or {})
+
+    def get(self, url, params=None, **kwargs):
+        response = self._context.get(url, params=params, **kwargs)
+        headers = dict(self._headers, **(kwargs.get("headers") or {}))
+        self._recorder.record(self._base_url, url, params, headers, response.status)
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self._context, name)
+
+
+@dataclass
+class EndpointResult:
+    latencies: list = field(default_factory=list)
+    errors: int = 0
+
+
+@dataclass
+class LoadReport:
+    """Per-endpoint results of one load run"""
+
+    workers: int
+    elapsed: float
+    endpoints: dict
+
+    @property
+    def total_requests(self):
+        return sum(len(result.latencies) for result in self.endpoints.values())
+
+    def to_dict(self):
+        endpoints = {}
+        for name, result in sorted(self.endpoints.items()):
+            count = len(result.latencies)
+            endpoints[name] = dict(
+                latency_summary(result.latencies),
+                errors=result.errors,
+                error_rate=result.errors / count if count else 0.0,
+                rps=count / self.elapsed if self.elapsed else 0.0,
+            )
+        return {
+            "workers": self.workers,
+            "elapsed_s": self.elapsed,
+            "requests": self.total_requests,
+            "rps": self.total_requests / self.elapsed if self.elapsed else 0.0,
+            "endpoints": endpoints,
+        }
+
+    def write_json(self, path):
+        with open(path, "w") as fh:
+            json.dump(self.to_dict(), fh, indent=2, sort_keys=True)
+
+    def lines(self, baseline=None):
+        """Rows for the terminal summary, with p95/rps deltas against a baseline dict"""
+        data = self.to_dict()
+        rows = [f"{data['requests']} requests from {self.workers} workers in {self.elapsed:.2f}s "
+                f"({data['rps']:.1f} req/s)"]
+        base_endpoints = (baseline or {}).get("endpoints", {})
+        for name, stats in data["endpoints"].items():
+            row = (f"{name:<48} n={stats['count']:<6} rps={stats['rps']:8.1f} "
+                   f"p50={stats['p50_ms']:7.2f}ms p95={stats['p95_ms']:7.2f}ms "
+                   f"p99={stats['p99_ms']:7.2f}ms errors={stats['error_rate']:.1%}")
+            base = base_endpoints.get(name)
+            if base:
+                row += (f"  p95 {_delta(stats['p95_ms'], base['p95_ms'])}"
+                        f" rps {_delta(stats['rps'], base['rps'])}")
+            rows.append(row)
+        return rows
+
+
+def _delta(value, base):
+    if not base:
+        return "n/a"
+    return f"{(value - base) / base:+.1%}"
+
+
+def load_baseline(path):
+    with open(path) as fh:
+        return json.load(fh)
+
+
+class LoadRunner:
+    """Replay recorded calls from ``workers`` concurrent workers
+
+    Stops after ``duration`` seconds or ``requests`` total requests, whichever
+    is given (request count wins if both are set).
+    """
+
+    def __init__(self, calls, workers=8, duration=None, requests=None, timeout=30000):
+        if not calls:
+            raise ValueError("No recorded calls to replay")
+        if duration is None and requests is None:
+            raise ValueError("Either duration or requests must be set")
+        self.calls = list(calls)
+        self.workers = workers
+        self.duration = duration
+        self.requests = requests
+        self.timeout = timeout
+
+    def run(self):
+        with AsyncEngine() as engine:
+            return engine.submit(self._run(engine))
+
+    async def _run(self, engine):
+        results = {}
+        issued = 0
+        contexts = {}
+        for call in self.calls:
+            key = (call.base_url, call.headers)
+            if key not in contexts:
+                contexts[key] = await engine.context_for(call.base_url, dict(call.headers))
+
+        started = time.perf_counter()
+        deadline = None if self.duration is None else started + self.duration
+
+        def next_call():
+            nonlocal issued
+            if self.requests is not None:
+                if issued >= self.requests:
+                    return None
+            elif time.perf_counter() >= deadline:
+                return None
+            call = self.calls[issued % len(self.calls)]
+            issued += 1
+            return call
+
+        async def worker():
+            while (call := next_call()) is not None:
+                context = contexts[(call.base_url, call.headers)]
+                result = results.setdefault(call.endpoint, EndpointResult())
+                began = time.perf_counter()
+                try:
+                    response = await context.get(call.url, params=dict(call.params), timeout=self.timeout)
+                    await response.body()
+                    failed = response.status != call.expected_status
+                except Exception:
+                    failed = True
+                result.latencies.append(time.perf_counter() - began)
+                result.errors += failed
+
+        await asyncio.gather(*(worker() for _ in range(self.workers)))
+        return LoadReport(workers=self.workers, elapsed=time.perf_counter() - started, endpoints=results)
@@ -0,0 +1,110 @@
+"""Data-driven case matrix over config vocabularies with batched fetching
+
+Cases that would each request a filtered /details view are served from one
+unfiltered fetch per site: SiteView indexes the subgraph once and answers
+every (entityType, relationshipType) filter client-side with the same
+semantics as the API (see harness.standin.select_details).
+"""
+from dataclasses import dataclass
+from itertools import product
+
+import config
+
+
+DETAILS_PATH = "/twin/datacenter/v1/details/{site_id}"
+
+
+@dataclass(frozen=True)
+class MatrixCase:
+    """One combination of site and optional entity/relationship/measurement type"""
+
+    site_id: str
+    entity_type: str = None
+    relationship_type: str = None
+    measurement_type: str = None
+
+    @property
+    def id(self):
+        parts = [self.site_id, self.entity_type, self.relationship_type, self.measurement_type]
+        return "-".join(part for part in parts if part)
+
+    @property
+    def fetch_key(self):
+        """Cases with the same key are answered from the same request"""
+        return self.site_id
+
+
+def expand(site_ids=config.VALID_SITE_IDS, entity_types=(None,), relationship_types=(None,),
+           measurement_types=(None,)):
+    """Cartesian product of the given vocabularies as MatrixCases"""
+    return [
+        MatrixCase(site_id, entity_type, relationship_type, measurement_type)
+        for site_id, entity_type, relationship_type, measurement_type
+        in product(site_ids, entity_types, relationship_types, measurement_types)
+    ]
+
+
+def full_matrix(site_ids=config.VALID_SITE_IDS):
+    """Sites x entity types x relationship types, plus sites x measurement types"""
+    return (
+        expand(site_ids, config.ENTITY_TYPES, (None,) + tuple(config.RELATIONSHIP_TYPES))
+        + expand(site_ids, measurement_types=config.MEASUREMENT_TYPES)
+    )
+
+
+class SiteView:
+    """Indexed unfiltered details payload for one site"""
+
+    def __init__(self, payload):
+        self.site_id = payload["siteId"]
+        self.entities = payload["entities"]
+        self.relationships = payload["relationships"]
+        self.entity_by_id = {}
+        self.entities_by_type = {}
+        for entity in self.entities:
+            self.entity_by_id[entity["id"]] = entity
+            self.entities_by_type.setdefault(entity["type"], []).append(entity)
+
+        self.relationships_by_type = {}
+        self._by_source_type = {}
+        for relationship in self.relationships:
+            self.relationships_by_type.setdefault(relationship["type"], []).append(relationship)
+            source = self.entity_by_id.get(relationship["source"])
+            source_type = source["type"] if source is not None else None
+            self._by_source_type.setdefault((source_type, None), []).append(relationship)
+            self._by_source_type.setdefault((source_type, relationship["type"]), []).append(relationship)
+
+    def select(self, entity_type=None, relationship_type=None):
+        """(entities, relationships) the API would return for these filters, unpaged"""
+        if entity_type is None:
+            entities = self.entities
+            if relationship_type is None:
+                return entities, self.relationships
+            return entities, self.relationships_by_type.get(relationship_type, [])
+        entities = self.entities_by_type.get(entity_type, [])
+        return entities, self._by_source_type.get((entity_type, relationship_type), [])
+
+    def entities_measuring(self, measurement_type):
+        """Entities whose state carries the given measurementType"""
+        return [e for e in self.entities if measurement_type in (e.get("state") or {})]
+
+
+class SiteViews:
+    """One unfiltered request per site, shared by every matrix case"""
+
+    def __init__(self, context):
+        self._context = context
+        self._views = {}
+        self.requests = 0
+
+    def __getitem__(self, site_id):
+        view = self._views.get(site_id)
+        if view is None:
+            response = self._context.get(DETAILS_PATH.format(site_id=site_id))
+            assert response.ok, f"Request for {site_id} failed with status {response.status}"
+            self.requests += 1
+            view = self._views[site_id] = SiteView(response.json())
+        return view
+
+    def for_case(self, case):
+        return self[case.fetch_key]
@@ -0,0 +1,166 @@
+"""On-disk cache of /ontology and /model, revalidated with conditional GETs
+
+Both endpoints return JSON-LD context and type catalogs that rarely change.
+MetadataCache keeps, per base URL and endpoint, a file with the response's
+ETag and Last-Modified and an index built from the payload:
+
+- ontology: {"prefixes": {prefix: URI}}
+- model: {"entityTypes": {entityType: definition}, "relationships":
+  {relationshipType: definition}, "measurements": {measurementType: definition}}
+
+fetch() sends If-None-Match and If-Modified-Since from the stored entry. On a
+304 the stored index is used as is, so a session that finds the metadata
+unchanged neither transfers the body nor rebuilds the index. Each endpoint is
+revalidated at most once per session.
+"""
+import hashlib
+import json
+import os
+import time
+from dataclasses import asdict, dataclass
+
+
+ONTOLOGY_PATH = "/twin/datacenter/v1/ontology"
+MODEL_PATH = "/twin/datacenter/v1/model"
+
+# Bump when an indexer changes, so files written by older code are refetched
+INDEX_VERSION = 1
+
+
+def index_ontology(payload):
+    context = payload["@context"]
+    return {"prefixes": {prefix: uri for prefix, uri in context.items() if isinstance(uri, str)}}
+
+
+def index_model(payload):
+    return {
+        "entityTypes": {item["entityType"]: item for item in payload.get("entityTypes", [])},
+        "relationships": {item["relationshipType"]: item for item in payload.get("relationships", [])},
+        "measurements": {item["measurementType"]: item for item in payload.get("measurements", [])},
+    }
+
+
+INDEXERS = {
+    ONTOLOGY_PATH: index_ontology,
+    MODEL_PATH: index_model,
+}
+
+
+class MetadataFetchError(AssertionError):
+    """A metadata request returned neither 2xx nor a usable 304"""
+
+    def __init__(self, path, status):
+        super().__init__(f"Request for {path} failed with status {status}")
+        self.path = path
+        self.status = status
+
+
+@dataclass
+class MetadataEntry:
+    """Validators and pre-built index of one endpoint's last 200 response"""
+
+    path: str
+    etag: str
+    last_modified: str
+    size: int
+    stored_at: float
+    index: dict
+    version: int = INDEX_VERSION
+
+    def conditional_headers(self):
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class MetadataCache:
+    """Conditional-GET cache of the metadata endpoints, one JSON file each in ``directory``
+
+    ``context`` is a request context for the API; ``base_url`` only keeps the
+    files of different APIs apart. With ``refresh`` the stored entries are
+    ignored and overwritten.
+    """
+
+    def __init__(self, directory, context, base_url, refresh=False, clock=time.time):
+        self.directory = directory
+        self.base_url = base_url
+        self.refresh = refresh
+        self._context = context
+        self._clock = clock
+        self._session = {}
+        self.fetched = 0
+        self.not_modified = 0
+        self.bytes_fetched = 0
+        self.bytes_saved = 0
+
+    def path_for(self, endpoint):
+        digest = hashlib.sha256(f"{self.base_url}{endpoint}".encode()).hexdigest()[:16]
+        return os.path.join(self.directory, f"{endpoint.rstrip('/').rsplit('/', 1)[-1]}-{digest}.json")
+
+    def stored(self, endpoint):
+        """The entry on disk for an endpoint, or None if missing, unreadable or from another INDEX_VERSION"""
+        if self.refresh:
+            return None
+        try:
+            with open(self.path_for(endpoint)) as fh:
+                entry = MetadataEntry(**json.load(fh))
+        except (OSError, ValueError, TypeError):
+            return None
+        return entry if entry.version == INDEX_VERSION else None
+
+    def _store(self, entry):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path_for(entry.path)
+        tmp_path = f"{path}.tmp.{os.getpid()}"
+        with open(tmp_path, "w") as fh:
+            json.dump(asdict(entry), fh)
+        os.replace(tmp_path, path)
+
+    def fetch(self, endpoint):
+        """MetadataEntry for an endpoint, revalidating the stored one on first use this session"""
+        entry = self._session.get(endpoint)
+        if entry is not None:
+            return entry
+        stored = self.stored(endpoint)
+        headers = stored.conditional_headers() if stored is not None else {}
+        response = self._context.get(endpoint, headers=headers) if headers else self._context.get(endpoint)
+        try:
+            if response.status == 304 and stored is not None:
+                self.not_modified += 1
+                self.bytes_saved += stored.size
+                entry = stored
+            elif response.ok:
+                body = response.body()
+                entry = MetadataEntry(
+                    path=endpoint,
+                    etag=response.headers.get("etag"),
+                    last_modified=response.headers.get("last-modified"),
+                    size=len(body),
+                    stored_at=self._clock(),
+                    index=INDEXERS[endpoint](json.loads(body)),
+                )
+                self.fetched += 1
+                self.bytes_fetched += len(body)
+                if entry.etag or entry.last_modified:
+                    self._store(entry)
+            else:
+                raise MetadataFetchError(endpoint, response.status)
+        finally:
+            response.dispose()
+        self._session[endpoint] = entry
+        return entry
+
+    def prefixes(self):
+        """Ontology prefix -> URI"""
+        return self.fetch(ONTOLOGY_PATH).index["prefixes"]
+
+    def model(self):
+        """Model index: entityTypes, relationships and measurements, each keyed by type name"""
+        return self.fetch(MODEL_PATH).index
+
+    def summary(self):
+        return (f"fetched={self.fetched} not_modified={self.not_modified} "
+                f"bytes_fetched={self.bytes_fetched} bytes_saved={self.bytes_saved} dir={self.directory}")
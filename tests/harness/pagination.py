@@ -0,0 +1,167 @@
+"""Cursor-pagination walker for /twin/datacenter/v1/details/{site_id}
+
+Pages are fetched on an AsyncEngine's event loop so the next page is already in
+flight while the caller validates the current one. Entity-type partitions are
+walked side by side, bounded by a concurrency limit.
+"""
+import asyncio
+import concurrent.futures
+import json
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+
+import config
+from harness.async_client import AsyncEngine
+
+
+DETAILS_PATH = "/twin/datacenter/v1/details/{site_id}"
+
+_DONE = object()
+
+
+class PageFetchError(AssertionError):
+    """A page request returned a non-2xx status"""
+
+    def __init__(self, url, params, status, body):
+        super().__init__(f"Request for {url} {params} failed with status {status}: {body[:200]!r}")
+        self.url = url
+        self.params = params
+        self.status = status
+
+
+@dataclass
+class WalkStats:
+    """Throughput counters for one walk"""
+
+    pages: int = 0
+    bytes: int = 0
+    entities: int = 0
+    relationships: int = 0
+    started: float = field(default_factory=time.perf_counter)
+    finished: float = None
+
+    @property
+    def elapsed(self):
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return max(end - self.started, 1e-9)
+
+    @property
+    def pages_per_sec(self):
+        return self.pages / self.elapsed
+
+    @property
+    def bytes_per_sec(self):
+        return self.bytes / self.elapsed
+
+    def summary(self):
+        return (f"{self.pages} pages, {self.entities} entities, {self.relationships} relationships, "
+                f"{self.bytes} bytes in {self.elapsed:.3f}s "
+                f"({self.pages_per_sec:.1f} pages/s, {self.bytes_per_sec / 1024:.1f} KiB/s)")
+
+
+class DetailsPaginator:
+    """Stream every page of a site's details, optionally fanned out by entityType
+
+    Usage::
+
+        paginator = DetailsPaginator(base_url, headers, "Site-001", limit=100)
+        for page in paginator.pages():
+            validate(page)
+        print(paginator.stats.summary())
+
+    Pass a running ``engine`` (e.g. the async_datacenter_api fixture) to fetch
+    on its loop and request contexts; otherwise each pages() call starts and
+    stops an AsyncEngine of its own.
+    """
+
+    def __init__(self, base_url, headers, site_id, limit=config.MAX_LIMIT,
+                 concurrency=4, prefetch=2, params=None, timeout=30000, engine=None):
+        if not 1 <= limit <= config.MAX_LIMIT:
+            raise ValueError(f"limit must be between 1 and {config.MAX_LIMIT}, got {limit}")
+        if concurrency < 1:
+            raise ValueError(f"concurrency must be at least 1, got {concurrency}")
+        self.base_url = base_url
+        self.headers = dict(headers)
+        self.site_id = site_id
+        self.limit = limit
+        self.concurrency = concurrency
+        self.prefetch = max(prefetch, 1)
+        self.params = dict(params or {})
+        self.timeout = timeout
+        self.engine = engine
+        self.stats = WalkStats()
+
+    def pages(self, entity_types=None):
+        """Yield page payloads in arrival order
+
+        With entity_types (e.g. config.ENTITY_TYPES) each type is walked as a
+        separate cursor chain, up to ``concurrency`` chains at a time; pages of
+        different partitions may interleave.
+        """
+        partitions = [None] if entity_types is None else list(entity_types)
+        self.stats = WalkStats()
+        pages = queue.Queue(maxsize=self.prefetch)
+        stop = threading.Event()
+        engine = self.engine or AsyncEngine().start()
+        producer = engine.spawn(self._produce(engine, partitions, pages, stop))
+        try:
+            while True:
+                item = pages.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            concurrent.futures.wait([producer])
+            if engine is not self.engine:
+                engine.stop()
+            self.stats.finished = time.perf_counter()
+
+    async def _produce(self, engine, partitions, pages, stop):
+        try:
+            client = await engine.client_for(self.base_url, self.headers, self.concurrency)
+            await asyncio.gather(*(self._walk(client, entity_type, pages, stop) for entity_type in partitions))
+        except BaseException as error:
+            await asyncio.to_thread(_put, pages, error, stop)
+        else:
+            await asyncio.to_thread(_put, pages, _DONE, stop)
+
+    async def _walk(self, client, entity_type, pages, stop):
+        url = DETAILS_PATH.format(site_id=self.site_id)
+        params = dict(self.params, limit=str(self.limit))
+        if entity_type is not None:
+            params["entityType"] = entity_type
+        while not stop.is_set():
+            response = await client.get(url, params=params, timeout=self.timeout)
+            body = response.body()
+            if not response.ok:
+                raise PageFetchError(url, params, response.status, body)
+            payload = json.loads(body)
+            self._count(payload, len(body))
+            if not await asyncio.to_thread(_put, pages, payload, stop):
+                return
+            cursor = payload.get("page", {}).get("nextCursor")
+            if not cursor:
+                return
+            params = dict(params, cursor=cursor)
+
+    def _count(self, payload, size):
+        self.stats.pages += 1
+        self.stats.bytes += size
+        self.stats.entities += len(payload.get("entities", ()))
+        self.stats.relationships += len(payload.get("relationships", ()))
+
+
+def _put(pages, item, stop):
+    """Block until the consumer takes room in the queue; False if it went away"""
+    while not stop.is_set():
+        try:
+            pages.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
@@ -0,0 +1,110 @@
+"""Memoized request contexts shared across a test session
+
+RequestContextFactory builds one APIRequestContext per distinct (base_url,
+headers) and hands the same context to every later caller, so connections stay
+open between tests instead of being re-established per test.
+RequestContextPool names the auth variants the 401 tests need.
+"""
+import time
+
+import config
+
+
+# Auth variant -> Authorization header value (None sends no header)
+AUTH_VARIANTS = {
+    "valid": f"Bearer {config.AUTH_TOKEN}",
+    "none": None,
+    "invalid": "Bearer INVALID_TOKEN",
+}
+
+WARMUP_PATH = "/twin/datacenter/v1/ontology"
+
+
+class RequestContextFactory:
+    """Build each distinct request context once and reuse it until dispose()
+
+    Tracks how long each context took to build; every reuse counts that build
+    time as saved. A warmup request is timed separately in ``warmup_seconds``:
+    a reuse does not save it, because the test still makes its own request.
+    """
+
+    def __init__(self, playwright, base_url=None):
+        self._playwright = playwright
+        self.base_url = base_url
+        self._contexts = {}
+        self._build_seconds = {}
+        self.built = 0
+        self.reused = 0
+        self.saved_seconds = 0.0
+        self.warmup_seconds = 0.0
+
+    @staticmethod
+    def key(base_url, headers):
+        return base_url, tuple(sorted((headers or {}).items()))
+
+    def __call__(self, base_url=None, headers=None, warmup_path=None):
+        base_url = base_url or self.base_url
+        key = self.key(base_url, headers)
+        context = self._contexts.get(key)
+        if context is not None:
+            self.reused += 1
+            self.saved_seconds += self._build_seconds[key]
+            return context
+
+        started = time.perf_counter()
+        context = self._playwright.request.new_context(
+            base_url=base_url, extra_http_headers=dict(headers or {})
+        )
+        self._build_seconds[key] = time.perf_counter() - started
+        if warmup_path:
+            started = time.perf_counter()
+            context.get(warmup_path).dispose()
+            self.warmup_seconds += time.perf_counter() - started
+        self._contexts[key] = context
+        self.built += 1
+        return context
+
+    def __len__(self):
+        return len(self._contexts)
+
+    @property
+    def build_seconds(self):
+        return sum(self._build_seconds.values())
+
+    def summary(self):
+        warmup = f" (+{self.warmup_seconds * 1000:.1f}ms warming up)" if self.warmup_seconds else ""
+        return (f"{self.built} contexts built in {self.build_seconds * 1000:.1f}ms{warmup}, "
+                f"{self.reused} reuses saved ~{self.saved_seconds * 1000:.1f}ms of setup")
+
+    def dispose(self):
+        for context in self._contexts.values():
+            context.dispose()
+        self._contexts.clear()
+
+
+class RequestContextPool:
+    """Warmed contexts for each auth variant, built through a RequestContextFactory
+
+    Warming issues one request per context so the connection is already open
+    when the first test uses it; pass ``warmup_path=None`` where there is no
+    server to warm up against, e.g. when replaying a cassette. Lookups go back
+    through the factory so each use is counted towards the setup time saved.
+    ``layers(context, headers)``, if given, wraps each context handed out.
+    """
+
+    def __init__(self, factory, base_url=None, variants=None, warmup_path=WARMUP_PATH, layers=None):
+        self._factory = factory
+        self._layers = layers
+        self._variants = {}
+        for name, authorization in (variants or AUTH_VARIANTS).items():
+            headers = {} if authorization is None else {"Authorization": authorization}
+            self._variants[name] = (base_url, headers)
+            factory(base_url, headers, warmup_path=warmup_path)
+
+    def __getitem__(self, variant):
+        base_url, headers = self._variants[variant]
+        context = self._factory(base_url, headers)
+        return context if self._layers is None else self._layers(context, headers)
+
+    def __contains__(self, variant):
+        return variant in self._variants
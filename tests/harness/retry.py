@@ -0,0 +1,134 @@
+"""Timeouts, retries and jittered exponential backoff for the API fixtures
+
+RetryingRequestContext gives every GET the timeout configured for its
+endpoint. It retries 5xx responses, Playwright timeouts and connection
+failures up to ``retries`` times, sleeping a random delay in [0, min(max_backoff,
+backoff * 2**attempt)] before each retry ("full jitter"). 4xx responses are
+returned as they are, because the 400/401/404 tests assert on them, and any
+other Playwright error (a disposed context, a bad URL) is raised at once. A
+session-wide budget caps the total number of retries, so an unhealthy backend
+fails fast instead of multiplying the run time.
+
+``last_attempts`` reports how many attempts the latest call took, so the
+timing and perf-gate layers can keep retried calls out of their latency
+numbers.
+"""
+import random
+import time
+from dataclasses import dataclass
+
+from playwright.sync_api import Error as PlaywrightError
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from harness.endpoints import endpoint_template
+
+
+# Substrings of the Playwright error message for a failed or dropped connection
+CONNECTION_ERRORS = ("ECONNREFUSED", "ECONNRESET", "ETIMEDOUT", "EPIPE", "socket hang up")
+
+
+@dataclass(frozen=True)
+class RetryEvent:
+    """One retry: which call, which attempt failed and why, and the delay before the next"""
+
+    nodeid: str
+    url: str
+    attempt: int
+    reason: str
+    delay_s: float
+
+
+class RetryPolicy:
+    """Timeouts per endpoint template plus the retry/backoff rules and session budget"""
+
+    def __init__(self, retries=2, backoff_ms=100, max_backoff_ms=2000, budget=20,
+                 timeouts_ms=None, default_timeout_ms=None, sleep=time.sleep, rng=random.random):
+        self.retries = retries
+        self.backoff_ms = backoff_ms
+        self.max_backoff_ms = max_backoff_ms
+        self.budget = budget
+        self.timeouts_ms = dict(timeouts_ms or {})
+        self.default_timeout_ms = default_timeout_ms
+        self._sleep = sleep
+        self._rng = rng
+        self.nodeid = ""
+        self.used = 0
+        self.exhausted = 0
+        self.events = []
+
+    def timeout_for(self, url):
+        return self.timeouts_ms.get(endpoint_template(url), self.default_timeout_ms)
+
+    @staticmethod
+    def retryable_status(status):
+        return 500 <= status <= 599
+
+    @staticmethod
+    def retryable_error(error):
+        if isinstance(error, PlaywrightTimeoutError):
+            return True
+        message = str(error)
+        return any(marker in message for marker in CONNECTION_ERRORS)
+
+    def backoff(self, attempt):
+        """Full-jitter delay in seconds before retry number ``attempt + 1``"""
+        ceiling = min(self.max_backoff_ms, self.backoff_ms * 2 ** attempt)
+        return self._rng() * ceiling / 1000.0
+
+    def take(self, attempt):
+        """Claim a retry after ``attempt`` failed attempts; False when out of retries or budget"""
+        if attempt > self.retries:
+            return False
+        if self.used >= self.budget:
+            self.exhausted += 1
+            return False
+        self.used += 1
+        return True
+
+    def wait(self, url, attempt, reason):
+        delay = self.backoff(attempt - 1)
+        self.events.append(RetryEvent(self.nodeid, url, attempt, reason, delay))
+        self._sleep(delay)
+
+    def summary(self):
+        calls = len({(event.nodeid, event.url) for event in self.events})
+        line = f"{self.used}/{self.budget} retries used across {calls} calls"
+        if self.exhausted:
+            line += f", budget exhausted for {self.exhausted} more"
+        return line
+
+
+class RetryingRequestContext:
+    """APIRequestContext wrapper applying a RetryPolicy to every GET"""
+
+    def __init__(self, context, policy):
+        self._context = context
+        self._policy = policy
+        self.last_attempts = 1
+
+    def get(self, url, params=None, **kwargs):
+        policy = self._policy
+        if "timeout" not in kwargs:
+            timeout = policy.timeout_for(url)
+            if timeout is not None:
+                kwargs["timeout"] = timeout
+        attempt = 1
+        while True:
+            try:
+                response = self._context.get(url, params=params, **kwargs)
+            except PlaywrightError as error:
+                if not policy.retryable_error(error) or not policy.take(attempt):
+                    self.last_attempts = attempt
+                    raise
+                reason = str(error).splitlines()[0] if str(error) else type(error).__name__
+            else:
+                if not policy.retryable_status(response.status) or not policy.take(attempt):
+                    self.last_attempts = attempt
+                    return response
+                reason = f"HTTP {response.status}"
+                response.dispose()
+            policy.wait(url, attempt, reason)
+            attempt += 1
+
+    def __getattr__(self, name):
+        return getattr(self._context, name)
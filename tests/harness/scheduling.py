@@ -0,0 +1,52 @@
+"""Order tests longest-first using durations recorded by previous runs"""
+import json
+import os
+import statistics
+
+from harness.workers import merge_json
+
+
+class DurationStore:
+    """Per-test wall time (setup + call + teardown) keyed by node ID
+
+    Registered as a pytest plugin. Under xdist the controller receives every
+    worker's reports, so only the controller is created with ``save=True``.
+    """
+
+    def __init__(self, path, save=True):
+        self.path = path
+        self.save_on_finish = save
+        self.previous = {}
+        if os.path.exists(path):
+            with open(path) as fh:
+                self.previous = json.load(fh)
+        self.current = {}
+
+    def record(self, nodeid, seconds):
+        self.current[nodeid] = self.current.get(nodeid, 0.0) + seconds
+
+    def save(self):
+        if self.current:
+            merge_json(self.path, {k: round(v, 6) for k, v in self.current.items()})
+
+    def order_longest_first(self, items):
+        """Sort items in place by expected duration, longest first
+
+        Tests without history are assumed to take the median known duration.
+        The sort is stable, so ties keep collection order and every xdist
+        worker derives the same order from the same file.
+        """
+        if not self.previous:
+            return
+        default = statistics.median(self.previous.values())
+        items.sort(key=lambda item: self.previous.get(item.nodeid, default), reverse=True)
+
+    def pytest_collection_modifyitems(self, items):
+        self.order_longest_first(items)
+
+    def pytest_runtest_logreport(self, report):
+        self.record(report.nodeid, report.duration)
+
+    def pytest_sessionfinish(self):
+        if self.save_on_finish:
+            self.save()
@@ -0,0 +1,406 @@
+"""Declarative payload schemas compiled into specialized validator closures
+
+Schemas are declared once with the node types below and compiled into nested
+closures by Validator. Validation walks the payload in a single pass without
+building intermediate lists and collects every violation with its JSON path.
+"""
+import hashlib
+import json
+from abc import ABC, abstractmethod
+
+_MISSING = object()
+
+# Exact-type sets so bool is not accepted as a number
+NUMBER_TYPES = frozenset((int, float))
+INTEGER_TYPES = frozenset((int,))
+STRING_TYPES = frozenset((str,))
+BOOLEAN_TYPES = frozenset((bool,))
+
+
+class Violation:
+    """One schema violation at a JSON path"""
+
+    __slots__ = ("_path", "message")
+
+    def __init__(self, path, message):
+        self._path = path
+        self.message = message
+
+    @property
+    def path(self):
+        return format_path(self._path)
+
+    def __repr__(self):
+        return f"{self.path}: {self.message}"
+
+
+def format_path(path):
+    """Render a (parent, key) chain as a JSON path such as $.entities[3].id"""
+    parts = []
+    while path is not None:
+        path, key = path
+        parts.append(f"[{key}]" if type(key) is int else f".{key}")
+    return "$" + "".join(reversed(parts))
+
+
+class Node(ABC):
+    """Base schema node
+
+    ``exact_types`` is set on leaf nodes whose whole check is an exact type
+    test plus an optional ``min_length``; objects inline those instead of
+    calling a nested validator.
+    """
+
+    exact_types = None
+    min_length = 0
+    description = "value"
+
+    @abstractmethod
+    def compile(self):
+        """Return ``check(value, path, errors)``, which appends a Violation per problem"""
+
+
+class _TypeNode(Node):
+
+    def __init__(self, types, description):
+        self.exact_types = types
+        self.description = description
+
+    def compile(self):
+        types, expected = self.exact_types, f"expected {self.description}"
+
+        def check(value, path, errors):
+            if type(value) not in types:
+                errors.append(Violation(path, f"{expected}, got {type(value).__name__}"))
+        return check
+
+
+def Number():
+    return _TypeNode(NUMBER_TYPES, "number")
+
+
+def Integer():
+    return _TypeNode(INTEGER_TYPES, "integer")
+
+
+def Boolean():
+    return _TypeNode(BOOLEAN_TYPES, "boolean")
+
+
+class String(Node):
+
+    exact_types = STRING_TYPES
+    description = "string"
+
+    def __init__(self, min_length=0):
+        self.min_length = min_length
+
+    def compile(self):
+        min_length = self.min_length
+
+        def check(value, path, errors):
+            if type(value) is not str:
+                errors.append(Violation(path, f"expected string, got {type(value).__name__}"))
+            elif len(value) < min_length:
+                errors.append(Violation(path, f"expected at least {min_length} characters"))
+        return check
+
+
+class Enum(Node):
+
+    def __init__(self, values):
+        self.values = frozenset(values)
+        self.description = "one of a fixed set"
+
+    def compile(self):
+        values = self.values
+
+        def check(value, path, errors):
+            try:
+                known = value in values
+            except TypeError:
+                known = False
+            if not known:
+                errors.append(Violation(path, f"unexpected value {value!r}"))
+        return check
+
+
+class Nullable(Node):
+
+    def __init__(self, schema):
+        self.schema = schema
+
+    def compile(self):
+        check_value = self.schema.compile()
+
+        def check(value, path, errors):
+            if value is not None:
+                check_value(value, path, errors)
+        return check
+
+
+class ArrayOf(Node):
+
+    description = "array"
+
+    def __init__(self, items, min_items=0):
+        self.items = items
+        self.min_items = min_items
+
+    def compile(self):
+        min_items = self.min_items
+        item_types = self.items.exact_types if not self.items.min_length else None
+        check_item = self.items.compile()
+        item_expected = f"expected {self.items.description}"
+
+        if item_types is not None:
+            def check(value, path, errors):
+                if type(value) is not list:
+                    errors.append(Violation(path, f"expected array, got {type(value).__name__}"))
+                    return
+                if len(value) < min_items:
+                    errors.append(Violation(path, f"expected at least {min_items} items"))
+                for index, item in enumerate(value):
+                    if type(item) not in item_types:
+                        errors.append(Violation((path, index), f"{item_expected}, got {type(item).__name__}"))
+            return check
+
+        def check(value, path, errors):
+            if type(value) is not list:
+                errors.append(Violation(path, f"expected array, got {type(value).__name__}"))
+                return
+            if len(value) < min_items:
+                errors.append(Violation(path, f"expected at least {min_items} items"))
+            for index, item in enumerate(value):
+                check_item(item, (path, index), errors)
+        return check
+
+
+class MapOf(Node):
+    """Object with arbitrary string keys and uniformly typed values"""
+
+    description = "object"
+
+    def __init__(self, values):
+        self.values = values
+
+    def compile(self):
+        check_value = self.values.compile()
+
+        def check(value, path, errors):
+            if type(value) is not dict:
+                errors.append(Violation(path, f"expected object, got {type(value).__name__}"))
+                return
+            for key, item in value.items():
+                check_value(item, (path, key), errors)
+        return check
+
+
+class Object(Node):
+    """Object with declared required and optional fields; other keys are allowed"""
+
+    description = "object"
+
+    def __init__(self, required=None, optional=None):
+        self.required = dict(required or {})
+        self.optional = dict(optional or {})
+
+    def compile(self):
+        # Split fields into inline leaf checks and nested validators
+        required_leaves = _leaves(self.required)
+        required_nested = _nested(self.required)
+        optional_leaves = _leaves(self.optional)
+        optional_nested = _nested(self.optional)
+
+        def check(value, path, errors):
+            if type(value) is not dict:
+                errors.append(Violation(path, f"expected object, got {type(value).__name__}"))
+                return
+            get = value.get
+            for key, types, min_length, description in required_leaves:
+                field = get(key, _MISSING)
+                if field is _MISSING:
+                    errors.append(Violation((path, key), "missing required field"))
+                elif type(field) not in types:
+                    errors.append(Violation((path, key), f"expected {description}, got {type(field).__name__}"))
+                elif min_length and len(field) < min_length:
+                    errors.append(Violation((path, key), f"expected at least {min_length} characters"))
+            for key, check_field in required_nested:
+                field = get(key, _MISSING)
+                if field is _MISSING:
+                    errors.append(Violation((path, key), "missing required field"))
+                else:
+                    check_field(field, (path, key), errors)
+            for key, types, min_length, description in optional_leaves:
+                field = get(key, _MISSING)
+                if field is _MISSING:
+                    continue
+                if type(field) not in types:
+                    errors.append(Violation((path, key), f"expected {description}, got {type(field).__name__}"))
+                elif min_length and len(field) < min_length:
+                    errors.append(Violation((path, key), f"expected at least {min_length} characters"))
+            for key, check_field in optional_nested:
+                field = get(key, _MISSING)
+                if field is not _MISSING:
+                    check_field(field, (path, key), errors)
+        return check
+
+
+def _leaves(fields):
+    return tuple((key, node.exact_types, node.min_length, node.description)
+                 for key, node in fields.items() if node.exact_types is not None)
+
+
+def _nested(fields):
+    return tuple((key, node.compile()) for key, node in fields.items() if node.exact_types is None)
+
+
+class Validator:
+    """A schema compiled once and applied to many payloads"""
+
+    def __init__(self, schema, max_reported=20):
+        self.schema = schema
+        self.max_reported = max_reported
+        self._check = schema.compile()
+
+    def validate(self, value, path=None):
+        """Return every violation in value; path roots the reported JSON paths"""
+        errors = []
+        self._check(value, path, errors)
+        return errors
+
+    def validate_into(self, value, path, errors):
+        """Append violations to an existing list, for streaming callers"""
+        self._check(value, path, errors)
+
+    def assert_valid(self, value, path=None):
+        errors = self.validate(value, path)
+        assert not errors, report(errors, self.max_reported)
+
+
+def report(errors, max_reported=20):
+    """Human-readable summary of a list of violations"""
+    lines = [f"{len(errors)} schema violation(s):"]
+    lines.extend(f"  {error!r}" for error in errors[:max_reported])
+    if len(errors) > max_reported:
+        lines.append(f"  ... and {len(errors) - max_reported} more")
+    return "\n".join(lines)
+
+
+def describe(node):
+    """Plain-data form of a schema tree, the same in every run for the same declarations"""
+    if isinstance(node, Node):
+        fields = {name: getattr(node, name) for name in ("exact_types", "min_length", "description")}
+        fields.update(vars(node))
+        return [type(node).__name__, {name: describe(value) for name, value in sorted(fields.items())}]
+    if isinstance(node, dict):
+        return {str(key): describe(value) for key, value in sorted(node.items())}
+    if isinstance(node, (frozenset, set)):
+        return sorted(describe(value) if isinstance(value, type) else repr(value) for value in node)
+    if isinstance(node, type):
+        return node.__name__
+    return node
+
+
+def fingerprint(validators):
+    """Short hash of the schemas behind a name -> Validator dict; changes whenever a schema does"""
+    schemas = {name: describe(validator.schema) for name, validator in validators.items()}
+    return hashlib.sha256(json.dumps(schemas, sort_keys=True).encode()).hexdigest()[:16]
+
+
+# API payload schemas
+
+MEASUREMENT = Object(
+    required={"value": Number(), "measurementType": String(min_length=1)},
+    optional={"unit": String()},
+)
+
+ENTITY = Object(
+    required={
+        "id": String(min_length=1),
+        "type": String(min_length=1),
+        "attributes": Object(optional={
+            "name": String(),
+            "siteId": String(),
+            "ratedPower": MEASUREMENT,
+        }),
+    },
+    optional={"state": MapOf(MEASUREMENT)},
+)
+
+RELATIONSHIP = Object(required={
+    "id": String(min_length=1),
+    "source": String(min_length=1),
+    "target": String(min_length=1),
+    "type": String(min_length=1),
+})
+
+PAGE = Object(optional={
+    "limit": Integer(),
+    "count": Integer(),
+    "nextCursor": String(min_length=1),
+})
+
+DETAILS = Object(required={
+    "siteId": String(),
+    "entities": ArrayOf(ENTITY),
+    "relationships": ArrayOf(RELATIONSHIP),
+    "page": PAGE,
+})
+
+MODEL = Object(required={
+    "entityTypes": ArrayOf(Object(
+        required={"id": String(), "entityType": String(min_length=1)},
+        optional={"attributes": ArrayOf(String(min_length=1))},
+    )),
+    "measurements": ArrayOf(MEASUREMENT),
+    "relationships": ArrayOf(Object(required={"relationshipType": String(min_length=1)})),
+})
+
+ONTOLOGY = Object(required={"@context": MapOf(String())})
+
+ERROR = Object(required={"error": Object(required={"code": String(), "message": String()})})
+
+FORECAST_METRIC = Object(required={
+    "name": String(min_length=1),
+    "unit": String(),
+    "quantityKind": String(),
+    "description": String(),
+})
+
+FORECAST_POINT = Object(required={
+    "timestamp": String(min_length=1),
+    "dryBulbTemperature": Number(),
+    "wetBulbTemperature": Number(),
+    "relativeHumidity": Number(),
+})
+
+FORECAST = Object(required={
+    "data": Object(required={
+        "resource": Object(required={
+            "longitude": Number(),
+            "latitude": Number(),
+            "timezone": String(),
+            "elevation": Number(),
+        }),
+        "metrics": ArrayOf(FORECAST_METRIC, min_items=1),
+        "points": ArrayOf(FORECAST_POINT, min_items=1),
+    }),
+})
+
+SCHEMAS = {
+    "measurement": MEASUREMENT,
+    "entity": ENTITY,
+    "relationship": RELATIONSHIP,
+    "details": DETAILS,
+    "model": MODEL,
+    "ontology": ONTOLOGY,
+    "error": ERROR,
+    "forecast_point": FORECAST_POINT,
+    "forecast": FORECAST,
+}
+
+
+def compile_validators(schemas=SCHEMAS):
+    """Compile every declared schema; done once per session by the payload_validators fixture"""
+    return {name: Validator(schema) for name, schema in schemas.items()}
@@ -0,0 +1,225 @@
+"""One place for where the suite points and how hard it pushes
+
+Each setting resolves from the first of these layers that has it:
+
+1. an environment variable (ENV_VARS)
+2. the selected profile, tests/profiles/<name>.json (or a path to a JSON file)
+3. config.py
+
+Dict-valued settings (timeouts_ms, latency_budgets, retry) are merged key by
+key over the layer below, so a profile can change one endpoint's budget
+without restating the others. A URL of "standin" (the local profile) means
+the in-process stand-in API.
+
+load_settings() reads the profile file and environment only when it is
+called, which conftest does once at session start. Every problem is reported
+in one SettingsError, before any test runs.
+"""
+import json
+import os
+from dataclasses import dataclass, field
+
+import config
+
+
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "profiles")
+DEFAULT_PROFILE = "local"
+PROFILE_ENV_VAR = "API_TEST_PROFILE"
+STANDIN = "standin"
+
+# Setting -> environment variable; dict-valued settings take a JSON object
+ENV_VARS = {
+    "datacenter_url": "DATACENTER_API_URL",
+    "forecast_url": "FORECAST_API_URL",
+    "datacenter_token": "DATACENTER_API_TOKEN",
+    "forecast_token": "FORECAST_API_TOKEN",
+    "concurrency": "API_TEST_CONCURRENCY",
+    "page_size": "API_TEST_PAGE_SIZE",
+    "cache_bytes": "API_TEST_CACHE_BYTES",
+    "default_timeout_ms": "API_TEST_TIMEOUT_MS",
+    "timeouts_ms": "API_TEST_TIMEOUTS_MS",
+    "latency_budgets": "API_TEST_LATENCY_BUDGETS",
+    "retry": "API_TEST_RETRY",
+}
+
+INT_SETTINGS = ("concurrency", "page_size", "cache_bytes", "default_timeout_ms")
+DICT_SETTINGS = ("timeouts_ms", "latency_budgets", "retry")
+BUDGET_KEYS = ("p95_ms", "max_bytes")
+
+# config.py tokens only the stand-in accepts
+PLACEHOLDER_TOKENS = (config.AUTH_TOKEN, config.FORECAST_AUTH_TOKEN)
+
+
+class SettingsError(ValueError):
+    """The selected profile, environment or config.py values are unusable"""
+
+
+def _defaults():
+    return {
+        "datacenter_url": config.BASE_URL,
+        "forecast_url": config.BASE_URL,
+        "datacenter_token": config.AUTH_TOKEN,
+        "forecast_token": config.FORECAST_AUTH_TOKEN,
+        "concurrency": config.CONCURRENCY,
+        "page_size": config.DEFAULT_LIMIT,
+        "cache_bytes": config.CACHE_BYTES,
+        "default_timeout_ms": config.DEFAULT_TIMEOUT_MS,
+        "timeouts_ms": config.REQUEST_TIMEOUTS_MS,
+        "latency_budgets": config.LATENCY_BUDGETS,
+        "retry": config.RETRY_POLICY,
+    }
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Resolved settings; ``sources`` names the layer each value came from"""
+
+    profile: str
+    datacenter_url: str
+    forecast_url: str
+    datacenter_token: str
+    forecast_token: str
+    concurrency: int
+    page_size: int
+    cache_bytes: int
+    default_timeout_ms: int
+    timeouts_ms: dict
+    latency_budgets: dict
+    retry: dict
+    sources: dict = field(default_factory=dict, compare=False)
+
+    @property
+    def uses_standin(self):
+        return STANDIN in (self.datacenter_url, self.forecast_url)
+
+    @property
+    def datacenter_headers(self):
+        return {"Authorization": f"Bearer {self.datacenter_token}"}
+
+    @property
+    def forecast_headers(self):
+        return {"Authorization": f"Bearer {self.forecast_token}"}
+
+    def timeout_for(self, endpoint):
+        return self.timeouts_ms.get(endpoint, self.default_timeout_ms)
+
+    def describe(self):
+        """One line for the pytest header"""
+        def where(url):
+            return "stand-in" if url == STANDIN else url
+        return (f"api profile: {self.profile} (datacenter {where(self.datacenter_url)}, "
+                f"forecast {where(self.forecast_url)}, concurrency {self.concurrency}, "
+                f"page size {self.page_size})")
+
+
+def profile_path(profile, profile_dir=PROFILE_DIR):
+    if profile.endswith(".json") or os.sep in profile:
+        return profile
+    return os.path.join(profile_dir, f"{profile}.json")
+
+
+def available_profiles(profile_dir=PROFILE_DIR):
+    return sorted(name[:-len(".json")] for name in os.listdir(profile_dir) if name.endswith(".json"))
+
+
+def _read_profile(profile, profile_dir):
+    path = profile_path(profile, profile_dir)
+    if not os.path.exists(path):
+        raise SettingsError(f"unknown profile {profile!r}; available: {', '.join(available_profiles(profile_dir))}")
+    with open(path) as fh:
+        try:
+            values = json.load(fh)
+        except ValueError as error:
+            raise SettingsError(f"{path}: {error}") from None
+    values.pop("description", None)
+    unknown = sorted(set(values) - set(ENV_VARS))
+    if unknown:
+        raise SettingsError(f"{path}: unknown settings {', '.join(unknown)}")
+    return values
+
+
+def _read_env(environ, problems):
+    values = {}
+    for name, var in ENV_VARS.items():
+        raw = environ.get(var)
+        if raw is None or raw == "":
+            continue
+        if name in INT_SETTINGS:
+            try:
+                values[name] = int(raw)
+            except ValueError:
+                problems.append(f"{var}: expected an integer, got {raw!r}")
+        elif name in DICT_SETTINGS:
+            try:
+                values[name] = json.loads(raw)
+            except ValueError:
+                problems.append(f"{var}: expected a JSON object, got {raw!r}")
+        else:
+            values[name] = raw
+    return values
+
+
+def _positive_int(value):
+    return type(value) is int and value > 0
+
+
+def _validate(values, problems):
+    for name in ("datacenter_url", "forecast_url"):
+        url = values[name]
+        if url != STANDIN and not (isinstance(url, str) and url.startswith(("http://", "https://"))):
+            problems.append(f"{name}: expected {STANDIN!r} or an http(s) URL, got {url!r}")
+    for name, url_name in (("datacenter_token", "datacenter_url"), ("forecast_token", "forecast_url")):
+        token = values[name]
+        if not isinstance(token, str) or not token:
+            problems.append(f"{name}: expected a non-empty string")
+        elif token in PLACEHOLDER_TOKENS and values[url_name] != STANDIN:
+            problems.append(f"{name}: still the config.py placeholder; set {ENV_VARS[name]}")
+    for name in INT_SETTINGS:
+        if name == "cache_bytes":
+            if type(values[name]) is not int or values[name] < 0:
+                problems.append(f"cache_bytes: expected a non-negative integer, got {values[name]!r}")
+        elif not _positive_int(values[name]):
+            problems.append(f"{name}: expected a positive integer, got {values[name]!r}")
+    if _positive_int(values["page_size"]) and values["page_size"] > config.MAX_LIMIT:
+        problems.append(f"page_size: at most {config.MAX_LIMIT} (config.MAX_LIMIT), got {values['page_size']}")
+    for endpoint, timeout in values["timeouts_ms"].items():
+        if not _positive_int(timeout):
+            problems.append(f"timeouts_ms[{endpoint!r}]: expected a positive integer, got {timeout!r}")
+    for endpoint, budget in values["latency_budgets"].items():
+        if not isinstance(budget, dict) or set(budget) - set(BUDGET_KEYS):
+            problems.append(f"latency_budgets[{endpoint!r}]: expected an object with {' and/or '.join(BUDGET_KEYS)}")
+            continue
+        for key, limit in budget.items():
+            if type(limit) not in (int, float) or limit <= 0:
+                problems.append(f"latency_budgets[{endpoint!r}][{key!r}]: expected a positive number, got {limit!r}")
+    if set(values["retry"]) != set(config.RETRY_POLICY):
+        problems.append(f"retry: expected exactly {', '.join(config.RETRY_POLICY)}")
+    for key, value in values["retry"].items():
+        if type(value) not in (int, float) or value < 0:
+            problems.append(f"retry[{key!r}]: expected a non-negative number, got {value!r}")
+
+
+def load_settings(profile=None, environ=None, profile_dir=PROFILE_DIR):
+    """Resolve and validate settings for a profile (default: $API_TEST_PROFILE, else "local")"""
+    environ = os.environ if environ is None else environ
+    profile = profile or environ.get(PROFILE_ENV_VAR) or DEFAULT_PROFILE
+    problems = []
+    layers = [
+        ("config.py", _defaults()),
+        (f"profile {profile}", _read_profile(profile, profile_dir)),
+        ("env", _read_env(environ, problems)),
+    ]
+    values, sources = {}, {}
+    for source, layer in layers:
+        for name, value in layer.items():
+            if name in DICT_SETTINGS:
+                if not isinstance(value, dict):
+                    problems.append(f"{name} ({source}): expected an object, got {type(value).__name__}")
+                    continue
+                value = {**values.get(name, {}), **value}
+            values[name] = value
+            sources[name] = ENV_VARS[name] if source == "env" else source
+    _validate(values, problems)
+    if problems:
+        raise SettingsError(f"invalid settings for profile {profile!r}:\n  " + "\n  ".join(problems))
+    return Settings(profile=profile, sources=sources, **values)
@@ -0,0 +1,198 @@
+"""Content-hash snapshots of site subgraphs and change-only validation
+
+A SiteSnapshot maps each entity and relationship id to a hash of its JSON
+text as served. The next run hashes the streamed elements again. Only
+elements that are new or whose hash changed go through the schema
+validators, so the work scales with the change instead of the site. Hashes
+are taken over the raw element text from MemberStream, which is far cheaper
+than re-encoding each decoded element.
+
+SnapshotStore keeps snapshots per API base URL and site. Each snapshot
+records the fingerprint of the schemas it was validated with
+(harness.schema.fingerprint); after a schema change the old snapshot no
+longer counts, so every element is validated again.
+"""
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass, field
+
+from harness.streaming import StreamValidator
+from harness.workers import merge_json
+
+
+def content_hash(text):
+    return hashlib.blake2b(text.encode(), digest_size=8).hexdigest()
+
+
+@dataclass
+class SiteSnapshot:
+    """Per-element content hashes for one site: {"entities": {id: hash}, "relationships": {...}}"""
+
+    site_id: str
+    hashes: dict
+    taken_at: float = field(default_factory=time.time)
+    fingerprint: str = None
+
+    def to_dict(self):
+        return {"taken_at": self.taken_at, "fingerprint": self.fingerprint, **self.hashes}
+
+    @classmethod
+    def from_dict(cls, site_id, data):
+        data = dict(data)
+        taken_at = data.pop("taken_at", 0.0)
+        fingerprint = data.pop("fingerprint", None)
+        return cls(site_id, data, taken_at, fingerprint)
+
+
+@dataclass
+class KindDiff:
+    """Added, removed and changed ids of one element kind"""
+
+    added: list
+    removed: list
+    changed: list
+    unchanged: int
+
+    @property
+    def changes(self):
+        return len(self.added) + len(self.removed) + len(self.changed)
+
+
+class SnapshotDiff:
+    """Differences between a previous and a current SiteSnapshot"""
+
+    def __init__(self, previous, current):
+        self.site_id = current.site_id
+        self.first_run = previous is None
+        self.kinds = {}
+        previous_hashes = previous.hashes if previous is not None else {}
+        for kind, hashes in current.hashes.items():
+            before = previous_hashes.get(kind, {})
+            added, changed = [], []
+            for item_id, digest in hashes.items():
+                old = before.get(item_id)
+                if old is None:
+                    added.append(item_id)
+                elif old != digest:
+                    changed.append(item_id)
+            removed = [item_id for item_id in before if item_id not in hashes]
+            self.kinds[kind] = KindDiff(added, removed, changed, len(hashes) - len(added) - len(changed))
+
+    def __getitem__(self, kind):
+        return self.kinds[kind]
+
+    @property
+    def changes(self):
+        return sum(diff.changes for diff in self.kinds.values())
+
+    def lines(self, limit=5):
+        """Change report: one count line per kind, then up to ``limit`` ids per change"""
+        label = "first snapshot" if self.first_run else f"{self.changes} changes"
+        lines = [f"{self.site_id}: {label}"]
+        for kind, diff in self.kinds.items():
+            lines.append(f"  {kind}: +{len(diff.added)} -{len(diff.removed)} "
+                         f"~{len(diff.changed)} ={diff.unchanged}")
+            if self.first_run:
+                continue
+            for sign, ids in (("+", diff.added), ("-", diff.removed), ("~", diff.changed)):
+                for item_id in ids[:limit]:
+                    lines.append(f"    {sign} {item_id}")
+                if len(ids) > limit:
+                    lines.append(f"    {sign} ... and {len(ids) - limit} more")
+        return lines
+
+
+class ChangeOnlyValidator(StreamValidator):
+    """StreamValidator that skips elements whose hash matches the previous snapshot
+
+    Feed it a MemberStream opened with ``keep_raw=True``. Elements without a
+    string id are always validated. Top-level members such as siteId and page
+    are always validated.
+    """
+
+    def __init__(self, item_validators, member_validators=None, previous=None):
+        super().__init__(item_validators, member_validators)
+        self.previous = previous
+        self._previous_hashes = previous.hashes if previous is not None else {}
+        self.hashes = {}
+        self.validated = {}
+
+    def validate(self, stream, *consumers):
+        if not stream.keep_raw:
+            raise ValueError("ChangeOnlyValidator needs a MemberStream opened with keep_raw=True")
+        self.hashes = {key: {} for key in self.item_validators}
+        self.validated = dict.fromkeys(self.item_validators, 0)
+        return super().validate(stream, *consumers)
+
+    def wants(self, key, value, stream):
+        item_id = value.get("id") if type(value) is dict else None
+        if type(item_id) is str:
+            digest = content_hash(stream.raw)
+            self.hashes[key][item_id] = digest
+            if self._previous_hashes.get(key, {}).get(item_id) == digest:
+                return False
+        self.validated[key] += 1
+        return True
+
+    def snapshot(self, site_id):
+        return SiteSnapshot(site_id, self.hashes)
+
+    def diff(self, site_id):
+        return SnapshotDiff(self.previous, self.snapshot(site_id))
+
+
+class SnapshotStore:
+    """Last successful snapshot per base URL and site, kept in a JSON file
+
+    commit() only stages a snapshot; save() merges the staged ones into the
+    file under a lock, so xdist workers checking different sites can share it.
+    A stored snapshot whose ``fingerprint`` differs from the store's is
+    treated as missing.
+    """
+
+    def __init__(self, path, base_url=None, fingerprint=None, ignore_previous=False):
+        self.path = path
+        self.base_url = base_url
+        self.fingerprint = fingerprint
+        self.ignore_previous = ignore_previous
+        self._stored = {}
+        if os.path.exists(path):
+            with open(path) as fh:
+                self._stored = json.load(fh)
+        self._pending = {}
+        self.diffs = []
+
+    def key(self, site_id):
+        return site_id if self.base_url is None else f"{self.base_url} {site_id}"
+
+    def previous(self, site_id):
+        stored = self._stored.get(self.key(site_id))
+        if self.ignore_previous or stored is None:
+            return None
+        snapshot = SiteSnapshot.from_dict(site_id, stored)
+        return snapshot if snapshot.fingerprint == self.fingerprint else None
+
+    def validator(self, site_id, validators=None):
+        """ChangeOnlyValidator for /details of site_id against its last snapshot"""
+        return ChangeOnlyValidator.for_details(validators, previous=self.previous(site_id))
+
+    def commit(self, site_id, validator):
+        """Stage the validator's snapshot and keep its diff for the change report"""
+        diff = validator.diff(site_id)
+        snapshot = validator.snapshot(site_id)
+        snapshot.fingerprint = self.fingerprint
+        self._pending[self.key(site_id)] = snapshot.to_dict()
+        self.diffs.append(diff)
+        return diff
+
+    def save(self):
+        if self._pending:
+            merge_json(self.path, self._pending)
+            self._stored.update(self._pending)
+            self._pending = {}
+
+    def lines(self):
+        return [line for diff in self.diffs for line in diff.lines()]
+
@@ -0,0 +1,504 @@
+"""In-process stand-in for the Datacenter and Forecast APIs
+
+Serves deterministic synthetic data built from the vocabularies in config.py so
+the suite can run without a live backend.
+"""
+import base64
+import binascii
+import hashlib
+import json
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import config
+
+
+MODEL_PATH = "/twin/datacenter/v1/model"
+DETAILS_PATH = "/twin/datacenter/v1/details/"
+ONTOLOGY_PATH = "/twin/datacenter/v1/ontology"
+FORECAST_PATH = "/v1/forecast"
+
+# Mostly static endpoints served with ETag/Last-Modified and 304 revalidation
+CONDITIONAL_PATHS = (MODEL_PATH, ONTOLOGY_PATH)
+METADATA_LAST_MODIFIED = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+LOCATION_TYPES = (
+    "SiteType",
+    "ElectricalRoom",
+    "DataHall",
+    "BatteryRoom",
+    "GeneratorYard",
+    "GeneratorRoom",
+)
+
+# Upstream to downstream order of the power path
+POWER_CHAIN = (
+    "UtilityMeterType",
+    "SwitchgearType",
+    "UPSType",
+    "PDUType",
+    "RackPDUType",
+    "Rack",
+)
+
+# Relationship types that come in forward/inverse pairs
+INVERSE_RELATIONSHIPS = {
+    "feeds": "fedBy",
+    "suppliesPowerTo": "suppliedBy",
+    "hasLocation": "locatedIn",
+    "connectedTo": "connectedFrom",
+    "controls": "controlledBy",
+    "protects": "protectedBy",
+}
+
+ONTOLOGY_CONTEXT = {
+    "dc": "https://example.org/ontology/datacenter#",
+    "brick": "https://brickschema.org/schema/Brick#",
+    "qudt": "http://qudt.org/schema/qudt/",
+    "unit": "http://qudt.org/vocab/unit/",
+    "rdf": "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
+    "rdfs": "http://www.w3.org/2000/01/rdf-schema#",
+    "xsd": "http://www.w3.org/2001/XMLSchema#",
+}
+
+MEASUREMENT_UNITS = {
+    "ActivePower": "kW",
+    "ActiveEnergyExport": "kWh",
+    "ActiveEnergyImport": "kWh",
+    "ApparentPower": "kVA",
+    "ReactivePower": "kvar",
+    "Voltage": "V",
+    "VoltageLL": "V",
+    "VoltageLN": "V",
+    "DCVoltage": "V",
+    "Current": "A",
+    "DCCurrent": "A",
+    "Frequency": "Hz",
+    "PowerFactor": "1",
+    "RemainingTime": "min",
+    "SoC": "percent",
+    "SoH": "percent",
+    "THDI": "percent",
+    "THDV": "percent",
+    "Temperature": "degC",
+    "Humidity": "percent",
+}
+
+FORECAST_METRICS = (
+    {
+        "name": "dryBulbTemperature",
+        "unit": "degC",
+        "quantityKind": "Temperature",
+        "description": "Air temperature measured by a thermometer freely exposed to the air",
+    },
+    {
+        "name": "wetBulbTemperature",
+        "unit": "degC",
+        "quantityKind": "Temperature",
+        "description": "Temperature reached by adiabatic evaporative cooling of the air",
+    },
+    {
+        "name": "relativeHumidity",
+        "unit": "percent",
+        "quantityKind": "RelativeHumidity",
+        "description": "Ratio of the partial pressure of water vapour to its saturation pressure",
+    },
+    {
+        "name": "dewPointTemperature",
+        "unit": "degC",
+        "quantityKind": "Temperature",
+        "description": "Temperature at which the air becomes saturated with water vapour",
+    },
+)
+
+FORECAST_START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+FORECAST_HOURS = 240
+
+DEVICES_PER_TYPE = 2
+
+
+def _measurement(measurement_type, value):
+    return {
+        "value": value,
+        "measurementType": measurement_type,
+        "unit": MEASUREMENT_UNITS.get(measurement_type, "1"),
+    }
+
+
+def _entity_attributes(site_id, entity_type, index, ordinal):
+    """Attributes and state for one synthetic entity"""
+    attributes = {"name": f"{entity_type} {index + 1}", "siteId": site_id}
+    if entity_type in LOCATION_TYPES or entity_type == "Rack":
+        return attributes, None
+
+    measurement_type = config.MEASUREMENT_TYPES[ordinal % len(config.MEASUREMENT_TYPES)]
+    attributes["ratedPower"] = _measurement("ActivePower", float(100 * (ordinal % 7 + 1)))
+    state = {}
+    for offset in range(3):
+        name = config.MEASUREMENT_TYPES[(ordinal + offset) % len(config.MEASUREMENT_TYPES)]
+        value = round(10.0 + (ordinal * 7 + offset * 3) % 90 + 0.25, 2)
+        if name == "PowerFactor":
+            value = round(value / 100.0, 4)
+        state[name] = _measurement(name, value)
+    state.setdefault(measurement_type, _measurement(measurement_type, 0.0))
+    return attributes, state
+
+
+@lru_cache(maxsize=None)
+def build_site(site_id):
+    """Build the full synthetic subgraph for a site
+
+    Returns a dict with "entities" and "relationships" lists in the order the
+    stand-in serves them.
+    """
+    entities = []
+    by_type = {}
+    ordinal = 0
+    for entity_type in config.ENTITY_TYPES:
+        count = 1 if entity_type == "SiteType" else DEVICES_PER_TYPE
+        for index in range(count):
+            entity_id = f"{site_id}:{entity_type}-{index + 1:03d}"
+            attributes, state = _entity_attributes(site_id, entity_type, index, ordinal)
+            entity = {"id": entity_id, "type": entity_type, "attributes": attributes}
+            if state is not None:
+                entity["state"] = state
+            entities.append(entity)
+            by_type.setdefault(entity_type, []).append(entity_id)
+            ordinal += 1
+
+    relationships = []
+
+    def relate(source, target, forward):
+        for rel_type, src, tgt in ((forward, source, target),
+                                   (INVERSE_RELATIONSHIPS.get(forward), target, source)):
+            if rel_type is None:
+                continue
+            relationships.append({
+                "id": f"{site_id}:rel-{len(relationships) + 1:05d}",
+                "source": src,
+                "target": tgt,
+                "type": rel_type,
+            })
+
+    site = by_type["SiteType"][0]
+    rooms = [room for room_type in LOCATION_TYPES[1:] for room in by_type.get(room_type, [])]
+    for room in rooms:
+        relate(site, room, "containsEquipment")
+
+    for upstream_type, downstream_type in zip(POWER_CHAIN, POWER_CHAIN[1:]):
+        for upstream, downstream in zip(by_type[upstream_type], by_type[downstream_type]):
+            relate(upstream, downstream, "feeds")
+
+    devices = [e["id"] for e in entities if e["type"] not in LOCATION_TYPES]
+    for position, device in enumerate(devices):
+        relate(device, rooms[position % len(rooms)], "hasLocation")
+
+    for controller, device in zip(by_type["ControllerType"], by_type["MCCType"]):
+        relate(controller, device, "controls")
+    for spd, device in zip(by_type["SPDType"], by_type["SwitchgearType"]):
+        relate(spd, device, "protects")
+
+    return {"entities": entities, "relationships": relationships}
+
+
+def build_model():
+    """Payload served by /twin/datacenter/v1/model"""
+    return {
+        "entityTypes": [
+            {"id": f"dc:{entity_type}", "entityType": entity_type, "attributes": list(_attributes_of(entity_type))}
+            for entity_type in config.ENTITY_TYPES
+        ],
+        "measurements": [
+            _measurement(measurement_type, 0.0) for measurement_type in config.MEASUREMENT_TYPES
+        ],
+        "relationships": [
+            {"relationshipType": rel_type, "inverse": _inverse_of(rel_type)}
+            for rel_type in config.RELATIONSHIP_TYPES
+        ],
+    }
+
+
+def _attributes_of(entity_type):
+    """Attribute names entities of a type may carry, as declared by /model"""
+    if entity_type in LOCATION_TYPES or entity_type == "Rack":
+        return ("name", "siteId")
+    return ("name", "siteId", "ratedPower")
+
+
+def _inverse_of(rel_type):
+    for forward, inverse in INVERSE_RELATIONSHIPS.items():
+        if rel_type == forward:
+            return inverse
+        if rel_type == inverse:
+            return forward
+    return None
+
+
+def build_ontology():
+    """Payload served by /twin/datacenter/v1/ontology"""
+    return {"@context": dict(ONTOLOGY_CONTEXT)}
+
+
+def build_forecast(longitude, latitude, hours=FORECAST_HOURS):
+    """Payload served by /v1/forecast for one coordinate"""
+    utc_offset = int(round(longitude / 15.0))
+    points = []
+    for hour in range(hours):
+        diurnal = math.sin((hour + utc_offset - 9) / 24.0 * 2 * math.pi)
+        dry_bulb = round(25.0 - abs(latitude) * 0.3 + 6.0 * diurnal, 2)
+        humidity = round(min(100.0, max(5.0, 60.0 - 20.0 * diurnal)), 2)
+        points.append({
+            "timestamp": (FORECAST_START + timedelta(hours=hour)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "dryBulbTemperature": dry_bulb,
+            "wetBulbTemperature": round(dry_bulb - (100.0 - humidity) / 5.0, 2),
+            "relativeHumidity": humidity,
+            "dewPointTemperature": round(dry_bulb - (100.0 - humidity) / 5.0 - 1.5, 2),
+        })
+    return {
+        "data": {
+            "resource": {
+                "longitude": longitude,
+                "latitude": latitude,
+                "timezone": "UTC" if utc_offset == 0 else f"Etc/GMT{-utc_offset:+d}",
+                "elevation": round(abs(math.sin(math.radians(latitude + longitude))) * 500.0, 1),
+            },
+            "metrics": [dict(metric) for metric in FORECAST_METRICS],
+            "points": points,
+        }
+    }
+
+
+def encode_cursor(site_id, offset):
+    return base64.urlsafe_b64encode(f"{site_id}:{offset}".encode()).decode()
+
+
+def decode_cursor(site_id, cursor):
+    """Offset encoded in a cursor, or None if the cursor is not valid for the site"""
+    try:
+        decoded = base64.urlsafe_b64decode(cursor.encode()).decode()
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    prefix, _, offset = decoded.rpartition(":")
+    if prefix != site_id or not offset.isdigit():
+        return None
+    return int(offset)
+
+
+class APIError(Exception):
+    """Error rendered as the API's error envelope"""
+
+    def __init__(self, status, code, message):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.message = message
+
+    def payload(self):
+        return {"error": {"code": self.code, "message": self.message}}
+
+
+def page_window(site_id, params, total):
+    """(offset, stop, page) selected by the cursor and limit parameters out of ``total`` entities"""
+    offset = 0
+    cursor = params.get("cursor")
+    if cursor is not None:
+        offset = decode_cursor(site_id, cursor)
+        if offset is None:
+            raise APIError(400, "INVALID_CURSOR", f"Cursor '{cursor}' is not valid")
+
+    limit = params.get("limit")
+    page = {}
+    if limit is None:
+        return offset, total, page
+    if not str(limit).isdigit() or not 1 <= int(limit) <= config.MAX_LIMIT:
+        raise APIError(400, "INVALID_LIMIT",
+                       f"limit must be an integer between 1 and {config.MAX_LIMIT}")
+    limit = int(limit)
+    page["limit"] = limit
+    if offset + limit < total:
+        page["nextCursor"] = encode_cursor(site_id, offset + limit)
+    return offset, offset + limit, page
+
+
+def select_details(site_id, params, site=None):
+    """Apply the /details query parameters to a site subgraph
+
+    entityType filters entities, relationshipType filters relationships, and
+    limit/cursor page over the entities. A page carries the relationships whose
+    source is one of its entities.
+    """
+    if site is None:
+        site = build_site(site_id)
+    entities = site["entities"]
+    relationships = site["relationships"]
+
+    entity_type = params.get("entityType")
+    if entity_type:
+        entities = [e for e in entities if e["type"] == entity_type]
+
+    offset, stop, page = page_window(site_id, params, len(entities))
+    if offset or stop < len(entities):
+        entities = entities[offset:stop]
+
+    if "limit" in page or offset or entity_type:
+        sources = {e["id"] for e in entities}
+        relationships = [r for r in relationships if r["source"] in sources]
+
+    relationship_type = params.get("relationshipType")
+    if relationship_type:
+        relationships = [r for r in relationships if r["type"] == relationship_type]
+
+    page["count"] = len(entities)
+    return {
+        "siteId": site_id,
+        "entities": entities,
+        "relationships": relationships,
+        "page": page,
+    }
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Routes requests to the synthetic payload builders"""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "DatacenterStandIn/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._started = time.perf_counter()
+        url = urlsplit(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query, keep_blank_values=True).items()}
+        try:
+            self._check_auth()
+            payload = self._route(url.path, params)
+        except APIError as error:
+            self._send(error.status, error.payload())
+            return
+        if url.path in CONDITIONAL_PATHS:
+            self._send_conditional(payload)
+            return
+        self._send(200, payload)
+
+    def _check_auth(self):
+        header = self.headers.get("Authorization", "")
+        if not header.startswith("Bearer "):
+            raise APIError(401, "UNAUTHORIZED", "Missing bearer token")
+        if header[len("Bearer "):] not in self.server.tokens:
+            raise APIError(401, "UNAUTHORIZED", "Invalid bearer token")
+
+    def _route(self, path, params):
+        if path == MODEL_PATH:
+            return build_model()
+        if path == ONTOLOGY_PATH:
+            return build_ontology()
+        if path.startswith(DETAILS_PATH):
+            site_id = path[len(DETAILS_PATH):]
+            site = self.server.sites.get(site_id)
+            if site is not None:
+                return site.details(params)
+            if site_id not in self.server.site_ids:
+                raise APIError(404, "NOT_FOUND", f"Site '{site_id}' not found")
+            return select_details(site_id, params)
+        if path == FORECAST_PATH:
+            try:
+                longitude = float(params["longitude"])
+                latitude = float(params["latitude"])
+            except (KeyError, ValueError):
+                raise APIError(400, "INVALID_COORDINATES",
+                               "longitude and latitude must be numeric") from None
+            if not (-180.0 <= longitude <= 180.0 and -90.0 <= latitude <= 90.0):
+                raise APIError(422, "COORDINATES_OUT_OF_RANGE",
+                               "longitude and latitude are out of range")
+            return build_forecast(longitude, latitude)
+        raise APIError(404, "NOT_FOUND", f"No route for '{path}'")
+
+    def _not_modified(self, etag):
+        """Whether the request's validators match; If-None-Match wins over If-Modified-Since"""
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            return "*" in tags or etag in tags
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since is not None:
+            try:
+                return parsedate_to_datetime(if_modified_since) >= METADATA_LAST_MODIFIED
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def _send_conditional(self, payload):
+        body = json.dumps(payload, separators=(",", ":")).encode()
+        etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        headers = {
+            "ETag": etag,
+            "Last-Modified": format_datetime(METADATA_LAST_MODIFIED, usegmt=True),
+            "Cache-Control": "no-cache",
+        }
+        if self._not_modified(etag):
+            self._write(304, None, headers)
+        else:
+            self._write(200, body, headers)
+
+    def _send(self, status, payload):
+        self._write(status, json.dumps(payload, separators=(",", ":")).encode())
+
+    def _write(self, status, body, headers=None):
+        """Send a response; a body of None (a 304) sends headers only"""
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Server-Timing", f"app;dur={(time.perf_counter() - self._started) * 1000:.3f}")
+        if body is not None:
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body is not None:
+            self.wfile.write(body)
+
+
+class StandInServer:
+    """Threaded HTTP server hosting the stand-in API on a free local port
+
+    ``sites`` adds generated sites (harness.synthetic.SyntheticSite) served
+    under their own site IDs.
+    """
+
+    def __init__(self, tokens=(config.AUTH_TOKEN,), site_ids=config.VALID_SITE_IDS,
+                 host="127.0.0.1", port=0, sites=()):
+        self._httpd = ThreadingHTTPServer((host, port), StandInHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.tokens = frozenset(tokens)
+        self._httpd.site_ids = frozenset(site_ids)
+        self._httpd.sites = {site.site_id: site for site in sites}
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever,
+                                        name="standin-api", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,25 @@
+"""Small statistics helpers shared by the timing reports"""
+import math
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile (q in 0..100) of an already sorted sequence"""
+    if not sorted_values:
+        return float("nan")
+    rank = max(1, math.ceil(q / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def latency_summary(samples):
+    """count, mean, p50, p95, p99 and max of latency samples in seconds, reported in ms"""
+    ordered = sorted(samples)
+    if not ordered:
+        return {"count": 0}
+    return {
+        "count": len(ordered),
+        "mean_ms": 1000.0 * sum(ordered) / len(ordered),
+        "p50_ms": 1000.0 * percentile(ordered, 50),
+        "p95_ms": 1000.0 * percentile(ordered, 95),
+        "p99_ms": 1000.0 * percentile(ordered, 99),
+        "max_ms": 1000.0 * ordered[-1],
+    }
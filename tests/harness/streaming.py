@@ -0,0 +1,228 @@
+"""Incremental decoding of large JSON object payloads
+
+MemberStream reads a top-level JSON object from chunks of bytes and yields
+its members one at a time. Arrays under ``stream_keys`` are yielded element by
+element, so an unpaged /details response never exists as one object tree.
+Each element is decoded with json.JSONDecoder.raw_decode from a small rolling
+buffer, so the per-element work is still done by the C decoder.
+
+Playwright's APIResponse only exposes the whole body, so for live responses
+the raw bytes stay in memory. The decoded str and the object tree do not. Fed
+from a file, peak memory is one buffer plus one element.
+"""
+import codecs
+import json
+import re
+
+from harness.schema import PAGE, String, Validator, Violation, compile_validators, report
+
+
+DETAILS_STREAM_KEYS = ("entities", "relationships")
+MODEL_STREAM_KEYS = ("entityTypes", "measurements", "relationships")
+
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_decoder = json.JSONDecoder()
+
+
+class StreamDecodeError(ValueError):
+    """The stream is not a JSON object of the expected shape"""
+
+
+def byte_chunks(data, size=CHUNK_SIZE):
+    """Slices of an in-memory body, without copying it"""
+    view = memoryview(data)
+    for start in range(0, len(view), size):
+        yield view[start:start + size]
+
+
+def file_chunks(path, size=CHUNK_SIZE):
+    with open(path, "rb") as fh:
+        while True:
+            chunk = fh.read(size)
+            if not chunk:
+                return
+            yield chunk
+
+
+class _Buffer:
+    """Rolling text buffer over an iterator of byte chunks"""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.text = ""
+        self.pos = 0
+        self.start = 0
+        self.eof = False
+
+    def fill(self):
+        """Append the next chunk; False once the stream is exhausted"""
+        if self.eof:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self.eof = True
+            self.text = self.text[self.pos:] + self._utf8.decode(b"", final=True)
+        else:
+            self.text = self.text[self.pos:] + self._utf8.decode(bytes(chunk))
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Next non-whitespace character, or "" at end of stream"""
+        while True:
+            self.pos = _WHITESPACE.match(self.text, self.pos).end()
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise StreamDecodeError(f"expected {char!r}, found {found or 'end of stream'!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value
+
+        A value that runs to the very end of the buffer may be a number cut at
+        a chunk boundary, so it is only accepted once more text follows it or
+        the stream has ended.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError as error:
+                if not self.fill():
+                    raise StreamDecodeError(str(error)) from None
+                continue
+            if end < len(self.text) or self.eof:
+                self.start, self.pos = self.pos, end
+                return value
+            self.fill()
+
+
+class MemberStream:
+    """Iterate (key, value) for each member of a top-level JSON object
+
+    Arrays under ``stream_keys`` yield one (key, element) per element;
+    every other member yields (key, whole value). ``keys`` lists the
+    top-level keys seen so far, including streamed arrays that were empty;
+    ``arrays`` holds the keys whose arrays were streamed. With ``keep_raw``,
+    ``raw`` is the JSON text of the member or element just yielded.
+    """
+
+    def __init__(self, chunks, stream_keys=DETAILS_STREAM_KEYS, keep_raw=False):
+        self._buffer = _Buffer(chunks)
+        self.stream_keys = frozenset(stream_keys)
+        self.keep_raw = keep_raw
+        self.raw = None
+        self.keys = []
+        self.arrays = set()
+
+    def __iter__(self):
+        buffer = self._buffer
+        buffer.expect("{")
+        if buffer.peek() == "}":
+            buffer.pos += 1
+            return
+        while True:
+            key = buffer.value()
+            if type(key) is not str:
+                raise StreamDecodeError(f"expected an object key, found {key!r}")
+            self.keys.append(key)
+            buffer.expect(":")
+            if key in self.stream_keys and buffer.peek() == "[":
+                self.arrays.add(key)
+                buffer.pos += 1
+                if buffer.peek() != "]":
+                    while True:
+                        value = buffer.value()
+                        if self.keep_raw:
+                            self.raw = buffer.text[buffer.start:buffer.pos]
+                        yield key, value
+                        if buffer.peek() != ",":
+                            break
+                        buffer.pos += 1
+                buffer.expect("]")
+            else:
+                value = buffer.value()
+                if self.keep_raw:
+                    self.raw = buffer.text[buffer.start:buffer.pos]
+                yield key, value
+            if buffer.peek() != ",":
+                break
+            buffer.pos += 1
+        buffer.expect("}")
+
+
+def stream_response(response, stream_keys=DETAILS_STREAM_KEYS, chunk_size=CHUNK_SIZE, keep_raw=False):
+    """MemberStream over an APIResponse (or CachedResponse) body"""
+    return MemberStream(byte_chunks(response.body(), chunk_size), stream_keys, keep_raw)
+
+
+class StreamValidator:
+    """Validate a streamed payload element by element with the compiled schemas
+
+    ``item_validators`` maps a streamed key to the Validator for one element,
+    ``member_validators`` maps the other keys to a Validator for the whole
+    member. Every key in either map is required. Violations carry the same
+    JSON paths as validating the whole payload.
+    """
+
+    def __init__(self, item_validators, member_validators=None):
+        self.item_validators = item_validators
+        self.member_validators = member_validators or {}
+        self.counts = {}
+
+    @classmethod
+    def for_details(cls, validators=None, **kwargs):
+        validators = validators or compile_validators()
+        return cls(
+            {"entities": validators["entity"], "relationships": validators["relationship"]},
+            {"siteId": Validator(String()), "page": Validator(PAGE)},
+            **kwargs,
+        )
+
+    def validate(self, stream, *consumers):
+        """Consume a MemberStream and return every violation
+
+        Each consumer is called as ``consumer(key, value)`` for every member,
+        e.g. SiteGraph.add_member, so one pass both validates and indexes.
+        """
+        errors = []
+        counts = self.counts = {}
+        item_validators = self.item_validators
+        member_validators = self.member_validators
+        for key, value in stream:
+            for consumer in consumers:
+                consumer(key, value)
+            validator = item_validators.get(key)
+            if validator is not None:
+                if key not in stream.arrays:
+                    errors.append(Violation((None, key), f"expected array, got {type(value).__name__}"))
+                    continue
+                index = counts.get(key, 0)
+                counts[key] = index + 1
+                if self.wants(key, value, stream):
+                    validator.validate_into(value, ((None, key), index), errors)
+                continue
+            validator = member_validators.get(key)
+            if validator is not None:
+                validator.validate_into(value, (None, key), errors)
+        seen = set(stream.keys)
+        errors.extend(Violation((None, key), "missing required field")
+                      for key in (*item_validators, *member_validators) if key not in seen)
+        return errors
+
+    def wants(self, key, value, stream):
+        """Whether to validate this streamed element; subclasses may skip some"""
+        return True
+
+    def assert_valid(self, stream, *consumers):
+        errors = self.validate(stream, *consumers)
+        assert not errors, report(errors)
@@ -0,0 +1,165 @@
+"""Forecast sweeps over many coordinates with bounded concurrency
+
+ForecastSweep sends one /v1/forecast request per location through an
+AsyncEngine, so N locations take about N / concurrency round trips. The
+responses are then checked as one batch:
+
+- each payload against the forecast schema
+- the echoed latitude and longitude against the requested ones, compared as
+  whole array('d') columns, plus a timezone and a finite elevation per
+  location
+- the presence of config.REQUIRED_FORECAST_METRICS, with their points checked
+  in one ForecastColumns that is reused across locations (harness.columns)
+
+A SweepResult keeps the latency of every location and all problems found.
+lines() reports the latency distribution, the throughput and the slowest
+locations.
+"""
+import math
+import operator
+import time
+from array import array
+from dataclasses import dataclass, field
+
+import config
+from harness.columns import ForecastColumns
+from harness.stats import latency_summary
+
+
+FORECAST_PATH = "/v1/forecast"
+ECHO_TOLERANCE = 1e-6
+
+
+def grid(south, north, west, east, rows, cols):
+    """rows x cols (latitude, longitude) points spanning a box, edges included, rounded to 4 decimals"""
+    def steps(low, high, count):
+        if count == 1:
+            return [round((low + high) / 2.0, 4)]
+        return [round(low + (high - low) * i / (count - 1), 4) for i in range(count)]
+    return [(latitude, longitude) for latitude in steps(south, north, rows) for longitude in steps(west, east, cols)]
+
+
+def _mismatches(requested, echoed, tolerance=ECHO_TOLERANCE):
+    """Positions where two columns differ by more than ``tolerance``"""
+    deviations = list(map(abs, map(operator.sub, echoed, requested)))
+    # all() rather than max(): max() may skip a NaN deviation, which must count as a mismatch
+    if all(deviation <= tolerance for deviation in deviations):
+        return []
+    return [position for position, deviation in enumerate(deviations) if not deviation <= tolerance]
+
+
+def check_responses(locations, responses, validator, required_metrics=config.REQUIRED_FORECAST_METRICS):
+    """(location, message) problems of forecast responses, in location order"""
+    problems = []
+    required = frozenset(required_metrics)
+    columns = ForecastColumns(required_metrics)
+    checked, requested_lat, requested_lon, echoed_lat, echoed_lon = [], array("d"), array("d"), array("d"), array("d")
+    for location, response in zip(locations, responses):
+        if response.status != 200:
+            problems.append((location, f"status {response.status}"))
+            continue
+        try:
+            payload = response.json()
+        except ValueError as error:
+            problems.append((location, f"body is not JSON: {error}"))
+            continue
+        errors = validator.validate(payload)
+        if errors:
+            problems.append((location, f"{len(errors)} schema violation(s), first {errors[0]!r}"))
+            continue
+        data = payload["data"]
+        resource = data["resource"]
+        checked.append(location)
+        requested_lat.append(location[0])
+        requested_lon.append(location[1])
+        echoed_lat.append(resource["latitude"])
+        echoed_lon.append(resource["longitude"])
+        if not resource["timezone"]:
+            problems.append((location, "empty timezone"))
+        if not math.isfinite(resource["elevation"]):
+            problems.append((location, f"elevation {resource['elevation']!r} is not finite"))
+        missing = required.difference(metric["name"] for metric in data["metrics"])
+        if missing:
+            problems.append((location, f"missing metric(s) {', '.join(sorted(missing))}"))
+        columns.clear()
+        columns.extend(data["points"])
+        problems.extend((location, problem) for problem in columns.problems())
+    for name, requested, echoed in (("latitude", requested_lat, echoed_lat), ("longitude", requested_lon, echoed_lon)):
+        for position in _mismatches(requested, echoed):
+            problems.append((checked[position], f"{name} echoed as {echoed[position]}, requested {requested[position]}"))
+    order = {location: position for position, location in enumerate(locations)}
+    problems.sort(key=lambda problem: order[problem[0]])
+    return problems
+
+
+@dataclass
+class SweepResult:
+    """Latency per location and problems of one sweep; times in seconds"""
+
+    locations: list
+    latencies: array
+    concurrency: int
+    wall_s: float
+    check_s: float
+    problems: list = field(default_factory=list)
+
+    def __len__(self):
+        return len(self.locations)
+
+    @property
+    def throughput(self):
+        """Requests per second over the whole sweep"""
+        return len(self.locations) / self.wall_s if self.wall_s else 0.0
+
+    def latency(self):
+        return latency_summary(self.latencies)
+
+    def slowest(self, count=5):
+        ranked = sorted(zip(self.latencies, self.locations), reverse=True)
+        return [(location, latency) for latency, location in ranked[:count]]
+
+    def lines(self, slowest=5):
+        latency = self.latency()
+        lines = [
+            f"{len(self)} locations at concurrency {self.concurrency}: {self.wall_s:.2f}s, "
+            f"{self.throughput:.0f} req/s, checks {self.check_s:.2f}s, {len(self.problems)} problem(s)",
+            f"latency ms: p50={latency.get('p50_ms', math.nan):.1f} p95={latency.get('p95_ms', math.nan):.1f} "
+            f"p99={latency.get('p99_ms', math.nan):.1f} max={latency.get('max_ms', math.nan):.1f}",
+        ]
+        lines.extend(f"  {latitude:9.4f} {longitude:9.4f} {1000.0 * seconds:8.1f}ms"
+                     for (latitude, longitude), seconds in self.slowest(slowest))
+        return lines
+
+    def assert_ok(self, max_reported=20):
+        if self.problems:
+            shown = [f"  ({latitude}, {longitude}): {message}"
+                     for (latitude, longitude), message in self.problems[:max_reported]]
+            if len(self.problems) > max_reported:
+                shown.append(f"  ... and {len(self.problems) - max_reported} more")
+            raise AssertionError(f"{len(self.problems)} forecast sweep problem(s):\n" + "\n".join(shown))
+
+
+class ForecastSweep:
+    """Run forecast sweeps on an AsyncEngine and keep their results for the session report"""
+
+    def __init__(self, engine, validator, concurrency=None):
+        self._engine = engine
+        self.validator = validator
+        self.concurrency = concurrency
+        self.results = []
+
+    def run(self, locations, concurrency=None, required_metrics=config.REQUIRED_FORECAST_METRICS):
+        """Request and check every (latitude, longitude); returns a SweepResult"""
+        locations = [(float(latitude), float(longitude)) for latitude, longitude in locations]
+        concurrency = concurrency or self.concurrency or self._engine.concurrency
+        requests = [(FORECAST_PATH, {"latitude": latitude, "longitude": longitude})
+                    for latitude, longitude in locations]
+        started = time.perf_counter()
+        responses = self._engine.get_many(requests, concurrency=concurrency)
+        wall_s = time.perf_counter() - started
+        started = time.perf_counter()
+        problems = check_responses(locations, responses, self.validator, required_metrics)
+        result = SweepResult(locations, array("d", (response.elapsed for response in responses)), concurrency,
+                             wall_s, time.perf_counter() - started, problems)
+        self.results.append(result)
+        return result
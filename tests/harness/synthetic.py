@@ -0,0 +1,316 @@
+"""Deterministic synthetic sites of any size, for scaling benchmarks
+
+A SyntheticSite with N entities (MIN_ENTITIES to MAX_ENTITIES) holds:
+
+- one SiteType containing N / ENTITIES_PER_ROOM rooms (at least one of each
+  other location type)
+- the power path utility meter -> switchgear -> UPS -> PDU -> rack PDU ->
+  rack. Each rack is fed by an A and a B rack PDU, and those hang off PDUs in
+  separate A and B banks. Every feeds edge has its fedBy inverse.
+- one device in AUX_SHARE of the other ENTITY_TYPES. Controllers control UPSs
+  and SPDs protect switchgear, both with inverses.
+- a hasLocation/locatedIn pair from every device to a room
+
+Nothing is stored. Every entity and its outgoing relationships are computed
+from its ordinal, so pages can be produced from any offset in constant memory.
+The seed only changes attribute and measurement values, never the topology.
+Relationships are ordered by source entity, as the stand-in serves them. A
+page therefore carries exactly the relationships whose source is on that page.
+"""
+import json
+import math
+import os
+from bisect import bisect_right
+from itertools import islice
+
+import config
+from harness.standin import (
+    LOCATION_TYPES,
+    MEASUREMENT_UNITS,
+    POWER_CHAIN,
+    encode_cursor,
+    page_window,
+    select_details,
+)
+
+
+MIN_ENTITIES = 100
+MAX_ENTITIES = 10_000_000
+ENTITIES_PER_ROOM = 2000
+AUX_SHARE = 10
+
+SWITCHGEAR_PER_UTILITY = 2
+UPS_PER_SWITCHGEAR = 2
+PDUS_PER_UPS = 4
+RACKS_PER_PDU = 8
+RACK_FEEDS = 2
+
+ROOM_TYPES = LOCATION_TYPES[1:]
+AUX_TYPES = tuple(t for t in config.ENTITY_TYPES if t not in LOCATION_TYPES and t not in POWER_CHAIN)
+
+SITE, ROOMS, AUX = "SiteType", "rooms", "aux"
+UTILITY, SWITCHGEAR, UPS, PDU, RACK_PDU, RACK = POWER_CHAIN
+
+_MASK = (1 << 64) - 1
+_ENCODER = json.JSONEncoder(separators=(",", ":"))
+
+
+def _mix(seed, ordinal):
+    """splitmix64 of (seed, ordinal): a cheap, stable pseudo-random 64-bit integer"""
+    z = (seed * 0x9E3779B97F4A7C15 + (ordinal + 1) * 0xBF58476D1CE4E5B9) & _MASK
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK
+    return z ^ (z >> 31)
+
+
+def chain_counts(racks):
+    """Entities per power-chain type for a given number of racks"""
+    pdu_bank = math.ceil(racks / RACKS_PER_PDU)
+    ups = math.ceil(2 * pdu_bank / PDUS_PER_UPS)
+    switchgear = math.ceil(ups / UPS_PER_SWITCHGEAR)
+    return {
+        UTILITY: math.ceil(switchgear / SWITCHGEAR_PER_UTILITY),
+        SWITCHGEAR: switchgear,
+        UPS: ups,
+        PDU: 2 * pdu_bank,
+        RACK_PDU: RACK_FEEDS * racks,
+        RACK: racks,
+    }
+
+
+class SyntheticSite:
+    """A generated site subgraph of ``entity_count`` entities"""
+
+    def __init__(self, site_id, entity_count, seed=0):
+        if not MIN_ENTITIES <= entity_count <= MAX_ENTITIES:
+            raise ValueError(f"entity_count must be between {MIN_ENTITIES} and {MAX_ENTITIES}, got {entity_count}")
+        self.site_id = site_id
+        self.entity_count = entity_count
+        self.seed = seed
+        rooms = max(len(ROOM_TYPES), entity_count // ENTITIES_PER_ROOM)
+        budget = entity_count - 1 - rooms - entity_count // AUX_SHARE
+        racks = int(budget / 3.3) + 1
+        while sum(chain_counts(racks).values()) > budget:
+            racks -= 1
+        chain = chain_counts(racks)
+        self.counts = {SITE: 1, ROOMS: rooms, **chain,
+                       AUX: entity_count - 1 - rooms - sum(chain.values())}
+        self.blocks = list(self.counts)
+        self.starts = []
+        start = 0
+        for block in self.blocks:
+            self.starts.append(start)
+            start += self.counts[block]
+        self._start = dict(zip(self.blocks, self.starts))
+        self.devices = entity_count - self._start[UTILITY]
+        self._pdu_bank = chain[PDU] // 2
+        self._width = len(str(entity_count))
+        self._materialized = None
+
+    def __len__(self):
+        return self.entity_count
+
+    # Identity
+
+    def locate(self, ordinal):
+        """(block, index within block) of an entity ordinal"""
+        position = bisect_right(self.starts, ordinal) - 1
+        block = self.blocks[position]
+        return block, ordinal - self.starts[position]
+
+    def type_of(self, block, index):
+        if block == ROOMS:
+            return ROOM_TYPES[index % len(ROOM_TYPES)]
+        if block == AUX:
+            return AUX_TYPES[index % len(AUX_TYPES)]
+        return block
+
+    def entity_id(self, block, index):
+        return f"{self.site_id}:{self.type_of(block, index)}-{index + 1:0{self._width}d}"
+
+    # Entities
+
+    def entity(self, ordinal):
+        block, index = self.locate(ordinal)
+        entity_type = self.type_of(block, index)
+        entity = {
+            "id": self.entity_id(block, index),
+            "type": entity_type,
+            "attributes": {"name": f"{entity_type} {index + 1}", "siteId": self.site_id},
+        }
+        if block in (SITE, ROOMS, RACK):
+            return entity
+        bits = _mix(self.seed, ordinal)
+        entity["attributes"]["ratedPower"] = {"value": float(100 * (bits % 7 + 1)),
+                                              "measurementType": "ActivePower", "unit": "kW"}
+        state = {}
+        first = (bits >> 8) % len(config.MEASUREMENT_TYPES)
+        for offset in range(3):
+            name = config.MEASUREMENT_TYPES[(first + offset) % len(config.MEASUREMENT_TYPES)]
+            value = round(10.0 + ((bits >> (16 + 12 * offset)) & 0xFFF) / 0xFFF * 80.0, 2)
+            if name == "PowerFactor":
+                value = round(value / 100.0, 4)
+            state[name] = {"value": value, "measurementType": name,
+                           "unit": MEASUREMENT_UNITS.get(name, "1")}
+        entity["state"] = state
+        return entity
+
+    def entities(self, start=0, stop=None):
+        stop = self.entity_count if stop is None else min(stop, self.entity_count)
+        for ordinal in range(start, stop):
+            yield self.entity(ordinal)
+
+    # Relationships
+
+    def _targets(self, block, index):
+        """(relationship type, target block, target index) for an entity's outgoing edges"""
+        counts = self.counts
+        if block == SITE:
+            return [("containsEquipment", ROOMS, room) for room in range(counts[ROOMS])]
+        if block == ROOMS:
+            return [("locatedIn", *self._device(device))
+                    for device in range(index, self.devices, counts[ROOMS])]
+
+        device = self._start[block] + index - self._start[UTILITY]
+        edges = [("hasLocation", ROOMS, device % counts[ROOMS])]
+        if block == AUX:
+            kind = AUX_TYPES[index % len(AUX_TYPES)]
+            number = index // len(AUX_TYPES)
+            if kind == "ControllerType":
+                edges.append(("controls", UPS, number % counts[UPS]))
+            elif kind == "SPDType":
+                edges.append(("protects", SWITCHGEAR, number % counts[SWITCHGEAR]))
+            return edges
+
+        edges.extend(("fedBy", *parent) for parent in self._parents(block, index))
+        edges.extend(("feeds", *child) for child in self._children(block, index))
+        if block == UPS:
+            edges.extend(("controlledBy", AUX, aux) for aux in self._aux_pointing_at("ControllerType", index, UPS))
+        elif block == SWITCHGEAR:
+            edges.extend(("protectedBy", AUX, aux) for aux in self._aux_pointing_at("SPDType", index, SWITCHGEAR))
+        return edges
+
+    def _device(self, device):
+        return self.locate(self._start[UTILITY] + device)
+
+    def _aux_pointing_at(self, kind, target, target_block):
+        """Aux indexes of the ``kind`` devices whose number maps onto ``target``"""
+        if kind not in AUX_TYPES:
+            return []
+        position = AUX_TYPES.index(kind)
+        members = max(0, (self.counts[AUX] - position + len(AUX_TYPES) - 1) // len(AUX_TYPES))
+        return [number * len(AUX_TYPES) + position
+                for number in range(target, members, self.counts[target_block])]
+
+    def _parents(self, block, index):
+        if block == SWITCHGEAR:
+            return [(UTILITY, index // SWITCHGEAR_PER_UTILITY)]
+        if block == UPS:
+            return [(SWITCHGEAR, index // UPS_PER_SWITCHGEAR)]
+        if block == PDU:
+            return [(UPS, index // PDUS_PER_UPS)]
+        if block == RACK_PDU:
+            bank, rack = index % RACK_FEEDS, index // RACK_FEEDS
+            return [(PDU, bank * self._pdu_bank + rack // RACKS_PER_PDU)]
+        if block == RACK:
+            return [(RACK_PDU, index * RACK_FEEDS + feed) for feed in range(RACK_FEEDS)]
+        return []
+
+    def _children(self, block, index):
+        def span(child, fanout):
+            return [(child, i) for i in range(index * fanout, min((index + 1) * fanout, self.counts[child]))]
+        if block == UTILITY:
+            return span(SWITCHGEAR, SWITCHGEAR_PER_UTILITY)
+        if block == SWITCHGEAR:
+            return span(UPS, UPS_PER_SWITCHGEAR)
+        if block == UPS:
+            return span(PDU, PDUS_PER_UPS)
+        if block == PDU:
+            bank, position = divmod(index, self._pdu_bank)
+            racks = range(position * RACKS_PER_PDU, min((position + 1) * RACKS_PER_PDU, self.counts[RACK]))
+            return [(RACK_PDU, rack * RACK_FEEDS + bank) for rack in racks]
+        if block == RACK_PDU:
+            return [(RACK, index // RACK_FEEDS)]
+        return []
+
+    def outgoing(self, ordinal):
+        """Relationships whose source is the entity at ``ordinal``"""
+        block, index = self.locate(ordinal)
+        source = self.entity_id(block, index)
+        prefix = f"{self.site_id}:rel-{ordinal:0{self._width}d}-"
+        return [{"id": f"{prefix}{number}", "source": source, "target": self.entity_id(*target), "type": rel_type}
+                for number, (rel_type, *target) in enumerate(self._targets(block, index))]
+
+    def relationships(self, start=0, stop=None):
+        stop = self.entity_count if stop is None else min(stop, self.entity_count)
+        for ordinal in range(start, stop):
+            yield from self.outgoing(ordinal)
+
+    # Payloads
+
+    def _payload(self, offset, stop, page):
+        stop = min(stop, self.entity_count)
+        page["count"] = max(0, stop - offset)
+        return {
+            "siteId": self.site_id,
+            "entities": list(self.entities(offset, stop)),
+            "relationships": list(self.relationships(offset, stop)),
+            "page": page,
+        }
+
+    def page(self, offset, limit):
+        """The /details page of ``limit`` entities from ``offset``; limit is not capped here"""
+        page = {"limit": limit}
+        if offset + limit < self.entity_count:
+            page["nextCursor"] = encode_cursor(self.site_id, offset + limit)
+        return self._payload(offset, offset + limit, page)
+
+    def details(self, params):
+        """Stand-in /details response; cursor/limit pages are generated without materializing"""
+        if set(params) - {"cursor", "limit"}:
+            return select_details(self.site_id, params, site=self.materialize())
+        return self._payload(*page_window(self.site_id, params, self.entity_count))
+
+    def materialize(self):
+        """The whole subgraph as lists, in the shape build_site returns; kept after the first call"""
+        if self._materialized is None:
+            self._materialized = {"entities": list(self.entities()), "relationships": list(self.relationships())}
+        return self._materialized
+
+    @staticmethod
+    def _encoded(items, batch):
+        separator = ""
+        while True:
+            text = _ENCODER.encode(list(islice(items, batch)))[1:-1]
+            if not text:
+                return
+            yield (separator + text).encode()
+            separator = ","
+
+    def chunks(self, batch=1000):
+        """The unpaged /details body as a stream of encoded chunks of ``batch`` elements each"""
+        yield f'{{"siteId":{json.dumps(self.site_id)},"entities":['.encode()
+        yield from self._encoded(self.entities(), batch)
+        yield b'],"relationships":['
+        yield from self._encoded(self.relationships(), batch)
+        yield f'],"page":{{"count":{self.entity_count}}}}}'.encode()
+
+    def write_details(self, path):
+        """Write the unpaged /details body to ``path``; returns its size in bytes"""
+        size = 0
+        with open(path, "wb") as fh:
+            for chunk in self.chunks():
+                fh.write(chunk)
+                size += len(chunk)
+        return size
+
+    def write_pages(self, directory, page_size=config.MAX_LIMIT):
+        """Write /details pages as page-000001.json, ... into ``directory``; returns the paths"""
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for offset in range(0, self.entity_count, page_size):
+            path = os.path.join(directory, f"page-{len(paths) + 1:06d}.json")
+            with open(path, "w") as fh:
+                json.dump(self.page(offset, page_size), fh, separators=(",", ":"))
+            paths.append(path)
+        return paths
@@ -0,0 +1,174 @@
+"""Per-request latency and payload-size instrumentation for the API fixtures
+
+Each call made through an InstrumentedRequestContext produces a CallRecord:
+
+- request_s: time spent in ``context.get()``, i.e. until Playwright has the
+  complete response (Playwright does not expose time-to-first-byte)
+- server_s: handler time reported by the server in a ``Server-Timing`` header,
+  if any; ``request_s - server_s`` approximates network and client overhead
+- body_s / decode_s: fetching the body into Python and ``json.loads`` on it
+- bytes: size of the body as read, or its Content-Length if the test never
+  read it
+- attempts: how many tries the retry layer needed; retried calls include
+  their backoff, so slowest() and the table leave them out and retried()
+  lists them separately
+"""
+import json
+import re
+import time
+from dataclasses import asdict, dataclass
+
+from harness.endpoints import endpoint_template
+
+
+SERVER_TIMING_DURATION = re.compile(r"dur=([0-9.]+)")
+
+
+def server_time(headers):
+    """Sum of Server-Timing durations in seconds, or None if the header is absent"""
+    value = headers.get("server-timing") or headers.get("Server-Timing")
+    if not value:
+        return None
+    return sum(float(ms) for ms in SERVER_TIMING_DURATION.findall(value)) / 1000.0
+
+
+def content_length(headers):
+    """Content-Length header as an int, or 0 if absent or malformed"""
+    value = headers.get("content-length") or headers.get("Content-Length")
+    try:
+        return int(value) if value else 0
+    except ValueError:
+        return 0
+
+
+@dataclass
+class CallRecord:
+    """Timing and size of one API call"""
+
+    nodeid: str
+    method: str
+    url: str
+    endpoint: str
+    params: dict
+    status: int = 0
+    started: float = 0.0
+    request_s: float = 0.0
+    server_s: float = None
+    body_s: float = 0.0
+    decode_s: float = 0.0
+    bytes: int = 0
+    from_cache: bool = False
+    attempts: int = 1
+
+    @property
+    def total_s(self):
+        return self.request_s + self.body_s + self.decode_s
+
+
+class CallTrace:
+    """Session-wide list of CallRecords, tagged with the running test's node ID"""
+
+    def __init__(self):
+        self.records = []
+        self.nodeid = ""
+        self._epoch = time.perf_counter()
+
+    def start(self, method, url, params):
+        record = CallRecord(
+            nodeid=self.nodeid,
+            method=method,
+            url=url,
+            endpoint=endpoint_template(url),
+            params={str(k): str(v) for k, v in (params or {}).items()},
+            started=time.perf_counter() - self._epoch,
+        )
+        self.records.append(record)
+        return record
+
+    def slowest(self, count):
+        first_try = (record for record in self.records if record.attempts == 1)
+        return sorted(first_try, key=lambda record: record.total_s, reverse=True)[:count]
+
+    def retried(self):
+        return [record for record in self.records if record.attempts > 1]
+
+    def write_jsonl(self, path):
+        with open(path, "w") as fh:
+            for record in self.records:
+                fh.write(json.dumps(dict(asdict(record), total_s=record.total_s)) + "\n")
+
+    def table(self, count):
+        """Rows for the top-N slowest calls"""
+        rows = [f"{'total':>9} {'request':>9} {'server':>9} {'body':>8} {'decode':>8} {'bytes':>10}  "
+                f"endpoint / test"]
+        for record in self.slowest(count):
+            server = "-" if record.server_s is None else f"{record.server_s * 1000:7.2f}ms"
+            rows.append(
+                f"{record.total_s * 1000:7.2f}ms {record.request_s * 1000:7.2f}ms {server:>9} "
+                f"{record.body_s * 1000:6.2f}ms {record.decode_s * 1000:6.2f}ms {record.bytes:>10}  "
+                f"{record.method} {record.endpoint}{' (cached)' if record.from_cache else ''}  "
+                f"{record.nodeid}"
+            )
+        return rows
+
+    def retried_table(self):
+        """Rows for calls that needed more than one attempt"""
+        rows = [f"{'total':>9} {'attempts':>8}  endpoint / test"]
+        for record in self.retried():
+            rows.append(f"{record.total_s * 1000:7.2f}ms {record.attempts:>8}  "
+                        f"{record.method} {record.endpoint} -> {record.status}  {record.nodeid}")
+        return rows
+
+
+class TimedResponse:
+    """APIResponse wrapper that times body transfer and JSON decoding"""
+
+    def __init__(self, response, record):
+        self._response = response
+        self._record = record
+        self._body = None
+
+    def body(self):
+        if self._body is None:
+            started = time.perf_counter()
+            self._body = self._response.body()
+            self._record.body_s = time.perf_counter() - started
+            self._record.bytes = len(self._body)
+        return self._body
+
+    def text(self):
+        return self.body().decode("utf-8")
+
+    def json(self):
+        body = self.body()
+        started = time.perf_counter()
+        data = json.loads(body)
+        self._record.decode_s += time.perf_counter() - started
+        return data
+
+    def __getattr__(self, name):
+        return getattr(self._response, name)
+
+
+class InstrumentedRequestContext:
+    """APIRequestContext wrapper that records a CallRecord for every GET"""
+
+    def __init__(self, context, trace):
+        self._context = context
+        self._trace = trace
+
+    def get(self, url, params=None, **kwargs):
+        record = self._trace.start("GET", url, params)
+        started = time.perf_counter()
+        response = self._context.get(url, params=params, **kwargs)
+        record.request_s = time.perf_counter() - started
+        record.status = response.status
+        record.server_s = server_time(response.headers)
+        record.bytes = content_length(response.headers)
+        record.from_cache = getattr(response, "from_cache", False)
+        if not record.from_cache:
+            record.attempts = getattr(self._context, "last_attempts", 1)
+        return TimedResponse(response, record)
+
+    def __getattr__(self, name):
+        return getattr(self._context, name)
@@ -0,0 +1,80 @@
+"""Helpers for running the suite across pytest-xdist worker processes"""
+import json
+import os
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def worker_id(config):
+    """xdist worker ID such as "gw0", or None in the controller or a serial run"""
+    workerinput = getattr(config, "workerinput", None)
+    if workerinput is None:
+        return None
+    return workerinput["workerid"]
+
+
+def is_controller(config):
+    return worker_id(config) is None
+
+
+def per_worker_path(config, path):
+    """Suffix an output path with the worker ID so workers do not overwrite each other"""
+    worker = worker_id(config)
+    if worker is None:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}.{worker}{ext}"
+
+
+@contextmanager
+def locked(path):
+    """Exclusive inter-process lock held on ``path + '.lock'``; flock on POSIX, msvcrt on Windows"""
+    with open(f"{path}.lock", "w") as lock:
+        _acquire(lock)
+        try:
+            yield
+        finally:
+            _release(lock)
+
+
+def _acquire(lock):
+    if fcntl is not None:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        return
+    # msvcrt.LK_LOCK gives up after about 10s, so keep trying like flock would
+    while True:
+        lock.seek(0)
+        try:
+            msvcrt.locking(lock.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            time.sleep(0.05)
+
+
+def _release(lock):
+    if fcntl is not None:
+        fcntl.flock(lock, fcntl.LOCK_UN)
+    else:
+        lock.seek(0)
+        msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def merge_json(path, updates):
+    """Merge a dict into a JSON object file under an inter-process lock"""
+    with locked(path):
+        current = {}
+        if os.path.exists(path):
+            with open(path) as fh:
+                current = json.load(fh)
+        current.update(updates)
+        tmp_path = f"{path}.tmp.{os.getpid()}"
+        with open(tmp_path, "w") as fh:
+            json.dump(current, fh, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+    return current
@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+import config
+from harness.async_client import AsyncAPIClient
+
+
+DETAILS_PATH = "/twin/datacenter/v1/details/{site_id}"
+
+
+class TestAsyncEngine:
+    """Test suite for the async request engine fixtures"""
+
+    def test_sweep_every_site_and_entity_type(self, async_datacenter_api, payload_validators):
+        """Test one test can fetch all sites x entity types concurrently"""
+        cases = [(site_id, entity_type) for site_id in config.VALID_SITE_IDS for entity_type in config.ENTITY_TYPES]
+        requests = [(DETAILS_PATH.format(site_id=site_id), {"entityType": entity_type})
+                    for site_id, entity_type in cases]
+
+        responses = async_datacenter_api.get_many(requests)
+
+        assert len(responses) == len(cases)
+        for (site_id, entity_type), response in zip(cases, responses):
+            assert response.ok, f"{site_id}/{entity_type} failed with status {response.status}"
+            data = response.json()
+            payload_validators["details"].assert_valid(data)
+            assert data["siteId"] == site_id
+            assert all(entity["type"] == entity_type for entity in data["entities"])
+
+    def test_concurrency_is_bounded(self, async_datacenter_api):
+        """Test no more than the requested number of calls are in flight at once"""
+        requests = [(DETAILS_PATH.format(site_id=site_id), None) for site_id in config.VALID_SITE_IDS] * 4
+
+        async def sweep(client):
+            responses = await client.get_many(requests)
+            return responses, client.max_in_flight
+
+        responses, max_in_flight = async_datacenter_api.run(sweep, concurrency=2)
+
+        assert all(response.ok for response in responses)
+        assert 1 <= max_in_flight <= 2
+
+    def test_results_keep_request_order(self, async_datacenter_api):
+        """Test responses line up with requests, including failures"""
+        site_ids = [config.VALID_SITE_IDS[0], "INVALID-SITE-999", config.VALID_SITE_IDS[-1]]
+
+        responses = async_datacenter_api.get_many(
+            (DETAILS_PATH.format(site_id=site_id), None) for site_id in site_ids
+        )
+
+        assert [response.status for response in responses] == [200, 404, 200]
+        assert responses[2].json()["siteId"] == site_ids[2]
+        assert all(response.elapsed > 0 for response in responses)
+
+    def test_custom_coroutine_runs_on_engine_loop(self, async_forecast_api):
+        """Test run() awaits arbitrary coroutines built from the client"""
+        locations = [(-100.0, 40.0), (-80.5, 35.25), (2.35, 48.85)]
+
+        async def fetch(client):
+            return await asyncio.gather(*(
+                client.get("/v1/forecast", params={"longitude": lon, "latitude": lat})
+                for lon, lat in locations
+            ))
+
+        responses = async_forecast_api.run(fetch)
+
+        assert [response.status for response in responses] == [200, 200, 200]
+
+    def test_rejects_non_positive_concurrency(self):
+        """Test a zero concurrency limit is refused up front"""
+        with pytest.raises(ValueError, match="concurrency"):
+            AsyncAPIClient(context=None, concurrency=0)
@@ -0,0 +1,101 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from harness.cache import CachedResponse
+from harness.timing import CallTrace, InstrumentedRequestContext, server_time
+
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+class _FixedContext:
+    """Request context stand-in answering every GET with one canned response"""
+
+    def __init__(self, response):
+        self.response = response
+
+    def get(self, url, params=None, **kwargs):
+        return self.response
+
+
+class TestCallTiming:
+    """Test suite for per-request timing instrumentation"""
+
+    @pytest.fixture
+    def traced_context(self, request_context_factory, api_auth_headers):
+        trace = CallTrace()
+        return InstrumentedRequestContext(request_context_factory(headers=api_auth_headers), trace), trace
+
+    def test_server_timing_header(self):
+        """Test Server-Timing durations are summed and converted to seconds"""
+        assert server_time({"server-timing": "db;dur=2.5, app;dur=7.5"}) == pytest.approx(0.010)
+        assert server_time({}) is None
+
+    def test_unread_body_size_comes_from_content_length(self):
+        """Test a call whose body is never read still records its size, and reading it records the real one"""
+        trace = CallTrace()
+        context = InstrumentedRequestContext(
+            _FixedContext(CachedResponse("/m", 401, "Unauthorized", {"content-length": "57"}, b"x" * 40)), trace)
+
+        response = context.get("/twin/datacenter/v1/model")
+        assert response.status == 401
+        assert trace.records[0].bytes == 57
+
+        response.body()
+        assert trace.records[0].bytes == 40
+
+    @pytest.mark.live_api
+    def test_records_size_and_decode_time(self, traced_context, request):
+        """Test a call records status, bytes, decode time and the running test's node ID"""
+        context, trace = traced_context
+        trace.nodeid = request.node.nodeid
+
+        response = context.get("/twin/datacenter/v1/details/Site-001", params={"limit": 5})
+        data = response.json()
+
+        record, = trace.records
+        assert data["siteId"] == "Site-001"
+        assert record.status == 200
+        assert record.bytes == len(response.body())
+        assert record.decode_s > 0
+        assert record.server_s is not None
+        assert record.nodeid == request.node.nodeid
+
+    @pytest.mark.live_api
+    def test_groups_by_endpoint_template(self, traced_context, tmp_path):
+        """Test different site IDs share an endpoint and the trace is written as JSONL"""
+        context, trace = traced_context
+        for site_id in ("Site-001", "Site-002"):
+            context.get(f"/twin/datacenter/v1/details/{site_id}").json()
+
+        path = tmp_path / "trace.jsonl"
+        trace.write_jsonl(path)
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+
+        assert {line["endpoint"] for line in lines} == {"/twin/datacenter/v1/details/{site_id}"}
+        assert {line["url"] for line in lines} == {
+            "/twin/datacenter/v1/details/Site-001", "/twin/datacenter/v1/details/Site-002"
+        }
+        assert len(trace.table(1)) == 2
+
+
+def test_auth_variant_calls_are_traced(tmp_path):
+    """Test --api-trace records the 401 tests' calls made through auth_contexts"""
+    trace_path = tmp_path / "trace.jsonl"
+    env = {name: value for name, value in os.environ.items()
+           if not name.startswith(("API_TEST_", "DATACENTER_API_", "FORECAST_API_", "PYTEST_"))}
+    result = subprocess.run(
+        [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", "-k", "unauthorized or invalid_token",
+         f"--api-trace={trace_path}", os.path.join(TESTS_DIR, "test_datacenter_api.py")],
+        cwd=tmp_path, env=dict(env, API_TEST_PROFILE="local"), capture_output=True, text=True, timeout=300,
+    )
+    assert result.returncode == 0, result.stdout[-2000:]
+
+    with open(trace_path) as fh:
+        records = [json.loads(line) for line in fh]
+    unauthorized = [record for record in records if record["status"] == 401]
+    assert unauthorized
+    assert all(record["bytes"] > 0 for record in unauthorized)
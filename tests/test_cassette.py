@@ -0,0 +1,180 @@
+import os
+import re
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+import config
+from harness.cache import CachedResponse
+from harness.cassette import RECORD, REPLAY, Cassette, CassetteMiss, CassetteRequestContext
+
+
+DETAILS_PATH = "/twin/datacenter/v1/details/{site_id}"
+ONTOLOGY_PATH = "/twin/datacenter/v1/ontology"
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+# The 401 tests (auth_contexts), the paginator walks (details_paginator) and the graph checks
+OFFLINE_SELECTION = "unauthorized or invalid_token or walk or TestRelationshipValidation"
+
+
+class _Offline:
+    """Request context stand-in that fails if replay touches the network"""
+
+    def get(self, url, params=None, **kwargs):
+        raise AssertionError(f"replay made a network request for {url}")
+
+
+@pytest.fixture
+def recorded(request_context_factory, api_auth_headers, tmp_path):
+    """A cassette recorded from every site plus a few repeated bodies"""
+    cassette = Cassette(str(tmp_path), RECORD)
+    context = CassetteRequestContext(request_context_factory(headers=api_auth_headers), cassette, api_auth_headers)
+    responses = {}
+    for site_id in config.VALID_SITE_IDS:
+        url = DETAILS_PATH.format(site_id=site_id)
+        responses[(url, None)] = context.get(url)
+    for params in (None, {"lang": "en"}, {"lang": "de"}):
+        responses[(ONTOLOGY_PATH, tuple((params or {}).items()))] = context.get(ONTOLOGY_PATH, params=params)
+    responses[("/twin/datacenter/v1/details/MISSING", None)] = context.get("/twin/datacenter/v1/details/MISSING")
+    cassette.save()
+    return tmp_path, responses
+
+
+def _closed_port_url():
+    """URL of a local port nothing listens on"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+
+def _run_session(cwd, cassette_mode, **environ):
+    """Run the offline selection of test_datacenter_api.py in a fresh pytest process"""
+    env = {name: value for name, value in os.environ.items()
+           if not name.startswith(("API_TEST_", "DATACENTER_API_", "FORECAST_API_", "PYTEST_"))}
+    env.update(API_TEST_PROFILE="local", DATACENTER_API_TOKEN="offline-datacenter",
+               FORECAST_API_TOKEN="offline-forecast", **environ)
+    return subprocess.run(
+        [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", "-k", OFFLINE_SELECTION,
+         f"--cassette={cassette_mode}", os.path.join(TESTS_DIR, "test_datacenter_api.py")],
+        cwd=cwd, env=env, capture_output=True, text=True, timeout=300,
+    )
+
+
+class TestCassette:
+    """Test suite for the record/replay cassette store"""
+
+    @pytest.mark.live_api
+    def test_replay_serves_recordings_without_network(self, recorded, api_auth_headers):
+        """Test every recorded response, including errors, replays byte for byte offline"""
+        directory, responses = recorded
+        cassette = Cassette(str(directory), REPLAY)
+        context = CassetteRequestContext(_Offline(), cassette, api_auth_headers)
+
+        for (url, params), original in responses.items():
+            replayed = context.get(url, params=dict(params) if params else None)
+            assert (replayed.status, replayed.body()) == (original.status, original.body())
+            assert replayed.from_cache
+        assert cassette.replayed == len(responses)
+        cassette.close()
+
+    @pytest.mark.live_api
+    def test_identical_bodies_are_stored_once_and_compressed(self, recorded):
+        """Test the ontology recorded under three keys is one blob, and the pack is compressed"""
+        directory, responses = recorded
+        cassette = Cassette(str(directory), REPLAY)
+
+        assert len(cassette.entries) == len(responses)
+        assert len(cassette.blobs) == len(responses) - 2
+        raw_bytes = sum(response.size for response in responses.values())
+        assert os.path.getsize(cassette.pack_path) < raw_bytes / 3
+        cassette.close()
+
+    @pytest.mark.live_api
+    def test_replay_miss_and_auth_are_part_of_the_key(self, recorded):
+        """Test unrecorded requests and other credentials are misses, not wrong answers"""
+        directory, _ = recorded
+        cassette = Cassette(str(directory), REPLAY)
+
+        with pytest.raises(CassetteMiss, match="re-record"):
+            cassette.play("/twin/datacenter/v1/model", None, f"Bearer {config.AUTH_TOKEN}")
+        with pytest.raises(CassetteMiss):
+            cassette.play(DETAILS_PATH.format(site_id="Site-001"), None, "Bearer someone-else")
+        assert cassette.misses == 2
+        cassette.close()
+
+    @pytest.mark.live_api
+    def test_stale_recordings_are_flagged(self, recorded, api_auth_headers):
+        """Test recordings older than max_age are listed and counted when replayed"""
+        directory, responses = recorded
+        week_later = lambda: time.time() + 8 * 24 * 3600  # noqa: E731
+        cassette = Cassette(str(directory), REPLAY, max_age=7 * 24 * 3600, clock=week_later)
+
+        assert len(cassette.stale_entries()) == len(responses)
+        cassette.play(ONTOLOGY_PATH, None, api_auth_headers["Authorization"])
+        assert cassette.stale_hits == 1
+        assert Cassette(str(directory), REPLAY, max_age=7 * 24 * 3600).stale_entries() == []
+        cassette.close()
+
+    def test_concurrent_recorders_merge(self, tmp_path):
+        """Test two recorders saving into one directory (as xdist workers do) keep both"""
+        first, second = Cassette(str(tmp_path), RECORD), Cassette(str(tmp_path), RECORD)
+        first.record("/a", None, None, CachedResponse("http://x/a", 200, "OK", {}, b"shared"))
+        second.record("/b", None, None, CachedResponse("http://x/b", 200, "OK", {}, b"shared"))
+        second.record("/c", None, None, CachedResponse("http://x/c", 200, "OK", {}, b"only c"))
+        first.save()
+        second.save()
+
+        replay = Cassette(str(tmp_path), REPLAY)
+        assert [replay.play(url, None, None).body() for url in ("/a", "/b", "/c")] == [b"shared", b"shared", b"only c"]
+        assert len(replay.blobs) == 2
+        replay.close()
+
+    def test_conditional_requests_are_keyed_by_validators(self, tmp_path):
+        """Test a recorded 304 replays only for its validators; other conditional GETs get the full 200"""
+        recorder = Cassette(str(tmp_path), RECORD)
+        recorder.record(ONTOLOGY_PATH, None, None, CachedResponse("http://x/o", 200, "OK", {"etag": '"v1"'}, b"{}"))
+        recorder.record(ONTOLOGY_PATH, None, None, CachedResponse("http://x/o", 304, "Not Modified", {}, b""),
+                        {"if-none-match": '"v1"'})
+        recorder.save()
+
+        cassette = Cassette(str(tmp_path), REPLAY)
+        context = CassetteRequestContext(_Offline(), cassette)
+        assert context.get(ONTOLOGY_PATH).status == 200
+        assert context.get(ONTOLOGY_PATH, headers={"If-None-Match": '"v1"'}).status == 304
+        assert context.get(ONTOLOGY_PATH, headers={"If-None-Match": '"v0"'}).status == 200
+        cassette.close()
+
+    @pytest.mark.live_api
+    def test_replayed_validation_rerun_takes_milliseconds(self, recorded, api_auth_headers, payload_validators):
+        """Test re-validating every recorded site from the cassette is fast"""
+        directory, _ = recorded
+        cassette = Cassette(str(directory), REPLAY)
+        context = CassetteRequestContext(_Offline(), cassette, api_auth_headers)
+
+        started = time.perf_counter()
+        for site_id in config.VALID_SITE_IDS:
+            payload_validators["details"].assert_valid(context.get(DETAILS_PATH.format(site_id=site_id)).json())
+        elapsed = time.perf_counter() - started
+        cassette.close()
+
+        assert elapsed < 0.25, f"Replayed validation took {elapsed * 1000:.1f}ms"
+
+
+class TestOfflineReplay:
+    """Test suite for rerunning recorded tests with no API reachable"""
+
+    def test_replay_against_closed_port(self, tmp_path):
+        """Test auth_contexts, details_paginator and the graph checks replay with the API URL unreachable"""
+        recorded = _run_session(tmp_path, RECORD)
+        assert recorded.returncode == 0, recorded.stdout[-2000:]
+
+        closed = _closed_port_url()
+        replayed = _run_session(tmp_path, REPLAY, DATACENTER_API_URL=closed, FORECAST_API_URL=closed)
+
+        assert replayed.returncode == 0, replayed.stdout[-2000:]
+        assert "ECONNREFUSED" not in replayed.stdout
+        passed = [re.search(r"(\d+) passed", result.stdout).group(1) for result in (recorded, replayed)]
+        assert passed[0] == passed[1] != "0"
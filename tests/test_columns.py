@@ -0,0 +1,120 @@
+import json
+import math
+import time
+
+import pytest
+
+from harness.columns import ForecastColumns, MeasurementColumns
+from harness.standin import FORECAST_HOURS, FORECAST_METRICS, build_forecast, build_site
+
+
+METRIC_NAMES = [metric["name"] for metric in FORECAST_METRICS]
+
+
+def _point(timestamp, **values):
+    point = {"timestamp": timestamp, **dict.fromkeys(METRIC_NAMES, 20.0)}
+    point.update(values)
+    return point
+
+
+class TestForecastColumns:
+    """Test suite for the columnar forecast loader"""
+
+    def test_standin_forecast_is_valid(self):
+        """Test a 10-day hourly forecast decodes into equal-length columns with no problems"""
+        columns = ForecastColumns.from_payload(build_forecast(-122.4194, 37.7749))
+
+        columns.assert_valid()
+        assert len(columns) == FORECAST_HOURS
+        assert all(len(columns[name]) == FORECAST_HOURS for name in METRIC_NAMES)
+        assert columns.nbytes == FORECAST_HOURS * 8 * (len(METRIC_NAMES) + 1)
+
+    def test_reports_order_nan_type_and_range_problems(self):
+        """Test each kind of bad point is counted under its column"""
+        points = [
+            _point("2026-01-01T00:00:00Z"),
+            _point("2026-01-01T02:00:00Z", relativeHumidity=140.0),
+            _point("2026-01-01T01:00:00Z", dryBulbTemperature=math.nan),
+            _point("not a time", wetBulbTemperature="21.5"),
+            _point("2026-01-01T04:00:00Z", dewPointTemperature=True, relativeHumidity=None),
+        ]
+        columns = ForecastColumns(METRIC_NAMES)
+        columns.extend(points)
+
+        assert sorted(columns.problems()) == sorted([
+            "timestamp: 1 missing or unparseable values",
+            "timestamp: 1 points not after the previous point",
+            "dryBulbTemperature: 1 NaN values",
+            "wetBulbTemperature: 1 missing or non-numeric values",
+            "dewPointTemperature: 1 missing or non-numeric values",
+            "relativeHumidity: 1 missing or non-numeric values",
+            "relativeHumidity: 1 values outside [0.0, 100.0]",
+        ])
+
+    def test_reused_columns_validate_many_locations(self):
+        """Test clear() lets one instance validate a grid without growing"""
+        columns = ForecastColumns(METRIC_NAMES)
+        largest = 0
+        for latitude in range(-60, 61, 10):
+            for longitude in range(-180, 180, 30):
+                columns.clear()
+                columns.extend(build_forecast(float(longitude), float(latitude))["data"]["points"])
+                columns.assert_valid()
+                largest = max(largest, columns.nbytes)
+
+        assert largest == FORECAST_HOURS * 8 * (len(METRIC_NAMES) + 1)
+
+    @pytest.mark.benchmark
+    def test_checks_are_faster_than_a_per_point_loop(self):
+        """Test column checks beat isinstance checks over the decoded dicts"""
+        points = json.loads(json.dumps(build_forecast(10.0, 50.0)["data"]["points"])) * 200
+        columns = ForecastColumns(METRIC_NAMES)
+        columns.extend(points)
+
+        def per_point():
+            for point in points:
+                for name in METRIC_NAMES:
+                    value = point[name]
+                    assert isinstance(value, (int, float)) and not isinstance(value, bool)
+                    assert not math.isnan(value)
+
+        def best_of_three(check):
+            elapsed = float("inf")
+            for _ in range(3):
+                started = time.perf_counter()
+                check()
+                elapsed = min(elapsed, time.perf_counter() - started)
+            return elapsed
+
+        assert best_of_three(columns.problems) < best_of_three(per_point)
+
+
+class TestMeasurementColumns:
+    """Test suite for columnar entity state values"""
+
+    def test_standin_state_is_valid(self):
+        """Test every stand-in measurement lands in its measurementType column"""
+        entities = build_site("Site-001")["entities"]
+        columns = MeasurementColumns.from_entities(entities)
+
+        columns.assert_valid()
+        expected = sum(len(entity.get("state") or {}) for entity in entities)
+        assert sum(len(column) for column in columns.values.data.values()) == expected
+
+    def test_reports_unknown_types_and_bad_values(self):
+        """Test unknown measurement types, non-numeric values and range breaches"""
+        columns = MeasurementColumns.from_entities([
+            {"id": "a", "state": {
+                "PowerFactor": {"value": 1.2, "measurementType": "PowerFactor"},
+                "SoC": {"value": "full", "measurementType": "SoC"},
+            }},
+            {"id": "b", "state": {"Torque": {"value": 3.0, "measurementType": "Torque"}}},
+            {"id": "c"},
+        ])
+
+        assert columns.problems() == [
+            "Torque: 1 values of an unknown measurementType",
+            "PowerFactor: 1 values outside [-1.0, 1.0]",
+            "SoC: 1 missing or non-numeric values",
+        ]
+        assert list(columns["Torque"]) == [3.0]
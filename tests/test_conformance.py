@@ -0,0 +1,174 @@
+import time
+
+import pytest
+from playwright.sync_api import APIRequestContext
+
+import config
+from harness.conformance import ConformanceChecker, ModelCatalog
+from harness.standin import build_model
+from harness.streaming import MemberStream, StreamValidator, stream_response
+from harness.synthetic import SyntheticSite
+
+
+def _details(entity=None, relationship=None):
+    """A one-entity, one-relationship details payload, with overrides merged in"""
+    return {
+        "siteId": "Site-001",
+        "entities": [dict({
+            "id": "Site-001:UPSType-1",
+            "type": "UPSType",
+            "attributes": {"name": "UPS 1", "ratedPower": {"value": 200.0, "measurementType": "ActivePower",
+                                                           "unit": "kW"}},
+            "state": {"Voltage": {"value": 230.0, "measurementType": "Voltage", "unit": "V"}},
+        }, **(entity or {}))],
+        "relationships": [dict({"id": "r1", "source": "Site-001:UPSType-1", "target": "Site-001:PDUType-1",
+                                "type": "feeds"}, **(relationship or {}))],
+    }
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    return ModelCatalog.from_payload(build_model())
+
+
+class TestModelCatalog:
+    """Test suite for the lookup tables built from /model"""
+
+    def test_tables_are_frozen(self, catalog):
+        """Test the tables cannot be changed once built"""
+        with pytest.raises(AttributeError):
+            catalog.entity_types.add("NewType")
+        with pytest.raises(TypeError):
+            catalog.measurement_units["NewMeasurement"] = "1"
+        with pytest.raises(AttributeError):
+            catalog.entity_types = frozenset()
+
+    def test_model_and_config_vocabularies_are_joined(self):
+        """Test a type declared only in /model or only in config.py is accepted"""
+        model = build_model()
+        model["entityTypes"].append({"id": "dc:ChillerType", "entityType": "ChillerType"})
+        catalog = ModelCatalog.from_payload(model, entity_types=config.ENTITY_TYPES + ["CRAHType"])
+
+        assert {"ChillerType", "CRAHType", "UPSType"} <= catalog.entity_types
+        assert catalog.measurement_units["ActivePower"] == "kW"
+        assert catalog.attributes["Rack"] == {"name", "siteId"}
+
+    def test_fixture_is_built_from_the_live_model(self, model_catalog):
+        """Test model_catalog covers every config.py vocabulary"""
+        assert set(config.ENTITY_TYPES) <= model_catalog.entity_types
+        assert set(config.RELATIONSHIP_TYPES) <= model_catalog.relationship_types
+        assert set(config.MEASUREMENT_TYPES) <= set(model_catalog.measurement_units)
+
+
+class TestConformanceChecker:
+    """Test suite for checking /details elements against the catalog"""
+
+    def test_conforming_payload(self, catalog):
+        """Test a payload using only declared types, units and attributes has no violations"""
+        checker = ConformanceChecker(catalog)
+
+        assert checker.check_payload(_details()) == []
+        assert checker.counts == {"entities": 1, "relationships": 1}
+
+    @pytest.mark.parametrize("entity, relationship, expected", [
+        ({"type": "ChillerType"}, None,
+         "$.entities[0].type: entity type 'ChillerType' is not declared in /model"),
+        (None, {"type": "cools"},
+         "$.relationships[0].type: relationship type 'cools' is not declared in /model"),
+        ({"attributes": {"name": "UPS 1", "colour": "red"}}, None,
+         "$.entities[0].attributes: UPSType does not declare attribute(s) colour"),
+        ({"state": {"Voltage": {"value": 1.0, "measurementType": "Voltage", "unit": "kV"}}}, None,
+         "$.entities[0].state.Voltage.unit: unit 'kV' for Voltage, /model declares 'V'"),
+        ({"state": {"Voltage": {"value": 1.0, "measurementType": "Current", "unit": "A"}}}, None,
+         "$.entities[0].state.Voltage.measurementType: state key 'Voltage' holds a 'Current'"),
+        ({"state": {"Flow": {"value": 1.0, "measurementType": "Flow"}}}, None,
+         "$.entities[0].state.Flow.measurementType: measurementType 'Flow' is not declared in /model"),
+        ({"attributes": {"ratedPower": {"value": 1.0, "measurementType": "ActivePower", "unit": "W"}}}, None,
+         "$.entities[0].attributes.ratedPower.unit: unit 'W' for ActivePower, /model declares 'kW'"),
+    ], ids=["entity-type", "relationship-type", "attribute", "unit", "state-key", "measurement-type",
+            "attribute-unit"])
+    def test_violations(self, catalog, entity, relationship, expected):
+        """Test each kind of undeclared value is reported at its JSON path"""
+        checker = ConformanceChecker(catalog)
+
+        assert list(map(repr, checker.check_payload(_details(entity, relationship)))) == [expected]
+
+    @pytest.mark.parametrize("entity, relationship, expected", [
+        ({"type": ["Rack"]}, None, "$.entities[0].type: entity type must be a string, got list"),
+        (None, {"type": {"name": "feeds"}}, "$.relationships[0].type: relationship type must be a string, got dict"),
+        ({"state": {"Voltage": {"value": 1.0, "measurementType": "Voltage", "unit": ["V"]}}}, None,
+         "$.entities[0].state.Voltage.unit: unit must be a string, got list"),
+        ({"attributes": {"ratedPower": {"value": 1.0, "measurementType": ["ActivePower"], "unit": "kW"}}}, None,
+         "$.entities[0].attributes.ratedPower.measurementType: measurementType must be a string, got list"),
+        ({"attributes": {"ratedPower": {"value": 1.0, "measurementType": "ActivePower", "unit": ["kW"]}}}, None,
+         "$.entities[0].attributes.ratedPower.unit: unit must be a string, got list"),
+    ], ids=["entity-type", "relationship-type", "state-unit", "attribute-measurement-type", "attribute-unit"])
+    def test_non_string_values_are_violations(self, catalog, entity, relationship, expected):
+        """Test unhashable types and units are reported instead of raising TypeError"""
+        checker = ConformanceChecker(catalog)
+
+        assert list(map(repr, checker.check_payload(_details(entity, relationship)))) == [expected]
+
+    def test_violations_are_counted_past_the_cap(self, catalog):
+        """Test only max_violations messages are kept, but all are counted"""
+        checker = ConformanceChecker(catalog, max_violations=2)
+        for _ in range(5):
+            checker.check_payload(_details({"type": "ChillerType"}))
+
+        assert (checker.total, len(checker.violations)) == (5, 2)
+        assert checker.report().endswith("... and 3 more")
+        with pytest.raises(AssertionError, match="5 conformance violation"):
+            checker.assert_conforms()
+
+    @pytest.mark.parametrize("site_id", config.VALID_SITE_IDS)
+    def test_live_sites_conform(self, datacenter_api_context: APIRequestContext, payload_validators,
+                                model_catalog, site_id):
+        """Test every site's /details is schema-valid and conforms to /model, in one streamed pass"""
+        response = datacenter_api_context.get(f"/twin/datacenter/v1/details/{site_id}")
+        assert response.ok, f"Request failed with status {response.status}"
+        checker = ConformanceChecker(model_catalog)
+
+        StreamValidator.for_details(payload_validators).assert_valid(stream_response(response), checker.add_member)
+
+        checker.assert_conforms()
+        assert checker.counts["entities"] > 0
+
+    def test_synthetic_site_conforms(self, catalog):
+        """Test a generated site uses only declared types, units and attributes"""
+        checker = ConformanceChecker(catalog)
+        for key, value in MemberStream(SyntheticSite("Big-001", 5_000).chunks()):
+            checker.add_member(key, value)
+
+        checker.assert_conforms()
+        assert checker.counts["entities"] == 5_000
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("entity_count", [100_000, 1_000_000])
+def test_conformance_overhead(catalog, entity_count):
+    """Benchmark a streamed pass with conformance checks against the same pass without them
+
+    Generating the body is timed on its own and subtracted from both.
+    """
+    site = SyntheticSite(f"Big-{entity_count}", entity_count)
+    started = time.perf_counter()
+    for _ in site.chunks():
+        pass
+    generate_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for _ in MemberStream(site.chunks()):
+        pass
+    decode_s = time.perf_counter() - started - generate_s
+
+    checker = ConformanceChecker(catalog)
+    started = time.perf_counter()
+    for key, value in MemberStream(site.chunks()):
+        checker.add_member(key, value)
+    checked_s = time.perf_counter() - started - generate_s
+
+    overhead = (checked_s - decode_s) / decode_s
+    print(f"{entity_count:>10} entities  decode {decode_s:6.2f}s  decode+conformance {checked_s:6.2f}s  "
+          f"overhead {overhead:+.0%}")
+    checker.assert_conforms()
+    assert overhead < 0.6, "Conformance checks should cost well under the decode itself"
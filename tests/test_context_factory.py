@@ -0,0 +1,63 @@
+import time
+
+from harness.pool import RequestContextFactory
+
+
+class _SlowWarmup:
+    """Playwright stand-in whose contexts build instantly but answer GETs after ``delay`` seconds"""
+
+    def __init__(self, delay):
+        self.request = self
+        self.delay = delay
+
+    def new_context(self, base_url=None, extra_http_headers=None):
+        return self
+
+    def get(self, url):
+        time.sleep(self.delay)
+        return self
+
+    def dispose(self):
+        pass
+
+
+class TestRequestContextFactory:
+    """Test suite for the memoized request context factory"""
+
+    def test_same_key_returns_same_context(self, request_context_factory, api_auth_headers):
+        """Test identical base URL and headers share one context and count as a reuse"""
+        reused = request_context_factory.reused
+
+        first = request_context_factory(headers=dict(api_auth_headers))
+        second = request_context_factory(headers=dict(api_auth_headers))
+
+        assert first is second
+        assert request_context_factory.reused >= reused + 1
+        assert request_context_factory.saved_seconds > 0
+
+    def test_different_headers_build_new_context(self, request_context_factory):
+        """Test a distinct header set gets its own context"""
+        first = request_context_factory(headers={"Authorization": "Bearer A"})
+        second = request_context_factory(headers={"Authorization": "Bearer B"})
+
+        assert first is not second
+
+    def test_auth_variants_share_factory_contexts(self, auth_contexts, datacenter_api_context, request_context_factory,
+                                                  api_auth_headers):
+        """Test the pooled "valid" context is the one behind datacenter_api_context"""
+        built = request_context_factory.built
+        auth_contexts["valid"]
+        request_context_factory(headers=api_auth_headers)
+        assert request_context_factory.built == built
+        assert auth_contexts["none"].get("/twin/datacenter/v1/model").status == 401
+
+    def test_warmup_is_not_counted_as_saved(self):
+        """Test a reuse saves the context build time, not the warmup request the test repeats anyway"""
+        factory = RequestContextFactory(_SlowWarmup(delay=0.05), "http://stand-in")
+
+        factory(warmup_path="/twin/datacenter/v1/ontology")
+        factory()
+
+        assert factory.warmup_seconds >= 0.05
+        assert factory.saved_seconds < 0.05
+        assert "warming up" in factory.summary()
@@ -1,24 +1,16 @@
 import pytest
 from playwright.sync_api import APIRequestContext
 
-
-@pytest.fixture(scope="session")
-def datacenter_api_context(playwright):
-    """Create API request context for Datacenter API with authentication"""
-    request_context = playwright.request.new_context(
-        base_url="https://localhost:8000",
-        extra_http_headers={
-            "Authorization": "Bearer YOUR_JWT_TOKEN_HERE"
-        }
-    )
-    yield request_context
-    request_context.dispose()
+import config
+from harness.columns import MeasurementColumns
+from harness.graph import SiteGraph
+from harness.streaming import stream_response
 
 
 class TestTwinModelEndpoint:
     """Test suite for /twin/datacenter/v1/model endpoint"""
     
-    def test_get_twin_model_success(self, datacenter_api_context: APIRequestContext):
+    def test_get_twin_model_success(self, datacenter_api_context: APIRequestContext, payload_validators):
         """Test successful retrieval of datacenter twin model"""
         response = datacenter_api_context.get("/twin/datacenter/v1/model")
         
@@ -26,75 +18,33 @@ class TestTwinModelEndpoint:
         assert response.ok, f"Request failed with status {response.status}"
         assert response.status == 200
         
-        # Get response data
-        data = response.json()
-        
-        # Assert required fields exist
-        assert "entityTypes" in data, "Response missing 'entityTypes' key"
-        assert "measurements" in data, "Response missing 'measurements' key"
-        assert "relationships" in data, "Response missing 'relationships' key"
-        
-        # Assert entityTypes is an array
-        assert isinstance(data["entityTypes"], list), "entityTypes should be an array"
-        
-        # Assert measurements is an array
-        assert isinstance(data["measurements"], list), "measurements should be an array"
-        
-        # Assert relationships is an array
-        assert isinstance(data["relationships"], list), "relationships should be an array"
-        
-        # Validate entity types structure (if not empty)
-        if len(data["entityTypes"]) > 0:
-            entity = data["entityTypes"][0]
-            assert "id" in entity, "Entity missing 'id' field"
-            assert "entityType" in entity, "Entity missing 'entityType' field"
-        
-        # Validate measurements structure (if not empty)
-        if len(data["measurements"]) > 0:
-            measurement = data["measurements"][0]
-            assert "value" in measurement, "Measurement missing 'value' field"
-            assert "measurementType" in measurement, "Measurement missing 'measurementType' field"
-        
-        # Validate relationships structure (if not empty)
-        if len(data["relationships"]) > 0:
-            relationship = data["relationships"][0]
-            assert "relationshipType" in relationship, "Relationship missing 'relationshipType' field"
+        # Validate every entity type, measurement and relationship against the model schema
+        payload_validators["model"].assert_valid(response.json())
     
-    def test_get_twin_model_unauthorized(self, playwright):
+    def test_get_twin_model_unauthorized(self, auth_contexts):
         """Test twin model endpoint without authentication"""
-        # Create context without auth header
-        request_context = playwright.request.new_context(
-            base_url="https://localhost:8000"
-        )
+        # Use the pooled context without auth header
+        request_context = auth_contexts["none"]
         
         response = request_context.get("/twin/datacenter/v1/model")
         
         # Should return 401 Unauthorized
         assert response.status == 401, f"Expected 401, got {response.status}"
-        
-        request_context.dispose()
     
-    def test_get_twin_model_invalid_token(self, playwright):
+    def test_get_twin_model_invalid_token(self, auth_contexts):
         """Test twin model endpoint with invalid bearer token"""
-        request_context = playwright.request.new_context(
-            base_url="https://localhost:8000",
-            extra_http_headers={
-                "Authorization": "Bearer INVALID_TOKEN"
-            }
-        )
+        request_context = auth_contexts["invalid"]
         
         response = request_context.get("/twin/datacenter/v1/model")
         
         # Should return 401 Unauthorized
         assert response.status == 401, f"Expected 401, got {response.status}"
-        
-        request_context.dispose()
 
 
 class TestDatacenterDetailsEndpoint:
     """Test suite for /twin/datacenter/v1/details/{site_id} endpoint"""
     
-    def test_get_datacenter_details_success(self, datacenter_api_context: APIRequestContext):
+    def test_get_datacenter_details_success(self, datacenter_api_context: APIRequestContext, payload_validators):
         """Test successful retrieval of datacenter site details"""
         site_id = "Site-001"
         response = datacenter_api_context.get(f"/twin/datacenter/v1/details/{site_id}")
@@ -106,43 +56,14 @@ class TestDatacenterDetailsEndpoint:
         # Get response data
         data = response.json()
         
-        # Assert required fields exist
-        assert "siteId" in data, "Response missing 'siteId' key"
-        assert "entities" in data, "Response missing 'entities' key"
-        assert "relationships" in data, "Response missing 'relationships' key"
-        assert "page" in data, "Response missing 'page' key"
+        # Validate every entity, relationship and the page object against the details schema
+        payload_validators["details"].assert_valid(data)
         
         # Validate siteId matches request
         assert data["siteId"] == site_id, f"Expected siteId '{site_id}', got '{data['siteId']}'"
         
-        # Assert entities is an array
-        assert isinstance(data["entities"], list), "entities should be an array"
-        
-        # Assert relationships is an array
-        assert isinstance(data["relationships"], list), "relationships should be an array"
-        
-        # Validate entity structure (if not empty)
-        if len(data["entities"]) > 0:
-            entity = data["entities"][0]
-            assert "id" in entity, "Entity missing 'id' field"
-            assert "type" in entity, "Entity missing 'type' field"
-            assert "attributes" in entity, "Entity missing 'attributes' field"
-            
-            # Validate attributes structure
-            attributes = entity["attributes"]
-            assert isinstance(attributes, dict), "attributes should be an object"
-        
-        # Validate relationship structure (if not empty)
-        if len(data["relationships"]) > 0:
-            relationship = data["relationships"][0]
-            assert "id" in relationship, "Relationship missing 'id' field"
-            assert "source" in relationship, "Relationship missing 'source' field"
-            assert "target" in relationship, "Relationship missing 'target' field"
-            assert "type" in relationship, "Relationship missing 'type' field"
-        
-        # Validate page structure
-        page = data["page"]
-        assert isinstance(page, dict), "page should be an object"
+        # Check state values per measurementType for NaNs, types and ranges
+        MeasurementColumns.from_entities(data["entities"]).assert_valid()
     
     def test_get_datacenter_details_with_filters(self, datacenter_api_context: APIRequestContext):
         """Test datacenter details with query parameters for filtering"""
@@ -203,6 +124,43 @@ class TestDatacenterDetailsEndpoint:
             # Verify second page has data
             assert "entities" in data2, "Second page missing 'entities' key"
     
+    def test_walk_all_pages(self, datacenter_api_context: APIRequestContext, details_paginator):
+        """Test following nextCursor to the last page returns the whole subgraph"""
+        site_id = "Site-001"
+        paginator = details_paginator(site_id, limit=7)
+        
+        entity_ids = []
+        for page in paginator.pages():
+            assert page["siteId"] == site_id, f"Expected siteId '{site_id}', got '{page['siteId']}'"
+            assert len(page["entities"]) <= 7, "Page exceeds requested limit"
+            entity_ids.extend(e["id"] for e in page["entities"])
+        print(f"Walked {paginator.stats.summary()}")
+        
+        # Paged walk should match the unpaged response
+        full = datacenter_api_context.get(f"/twin/datacenter/v1/details/{site_id}").json()
+        assert len(entity_ids) == len(set(entity_ids)), "Pages returned duplicate entities"
+        assert entity_ids == [e["id"] for e in full["entities"]]
+        assert paginator.stats.pages > 1, "Expected more than one page"
+    
+    def test_walk_entity_type_partitions(self, datacenter_api_context: APIRequestContext, details_paginator):
+        """Test fanning out the walk across entityType partitions"""
+        site_id = "Site-001"
+        paginator = details_paginator(site_id, limit=1)
+        
+        seen_types = {}
+        for page in paginator.pages(entity_types=config.ENTITY_TYPES):
+            for entity in page["entities"]:
+                seen_types.setdefault(entity["type"], set()).add(entity["id"])
+        print(f"Walked {paginator.stats.summary()}")
+        
+        full = datacenter_api_context.get(f"/twin/datacenter/v1/details/{site_id}").json()
+        expected = {}
+        for entity in full["entities"]:
+            expected.setdefault(entity["type"], set()).add(entity["id"])
+        assert seen_types == expected
+        assert paginator.stats.pages_per_sec > 0
+        assert paginator.stats.bytes_per_sec > 0
+    
     def test_get_datacenter_details_not_found(self, datacenter_api_context: APIRequestContext):
         """Test datacenter details with non-existent site ID"""
         site_id = "NON_EXISTENT_SITE"
@@ -224,19 +182,15 @@ class TestDatacenterDetailsEndpoint:
         # Should return 400 Bad Request
         assert response.status == 400, f"Expected 400, got {response.status}"
     
-    def test_get_datacenter_details_unauthorized(self, playwright):
+    def test_get_datacenter_details_unauthorized(self, auth_contexts):
         """Test datacenter details endpoint without authentication"""
-        request_context = playwright.request.new_context(
-            base_url="https://localhost:8000"
-        )
+        request_context = auth_contexts["none"]
         
         site_id = "Site-001"
         response = request_context.get(f"/twin/datacenter/v1/details/{site_id}")
         
         # Should return 401 Unauthorized
         assert response.status == 401, f"Expected 401, got {response.status}"
-        
-        request_context.dispose()
 
 
 class TestOntologyEndpoint:
@@ -264,34 +218,23 @@ class TestOntologyEndpoint:
         for prefix, uri in context.items():
             assert isinstance(uri, str), f"Namespace URI for '{prefix}' should be a string"
     
-    def test_get_ontology_unauthorized(self, playwright):
+    def test_get_ontology_unauthorized(self, auth_contexts):
         """Test ontology endpoint without authentication"""
-        request_context = playwright.request.new_context(
-            base_url="https://localhost:8000"
-        )
+        request_context = auth_contexts["none"]
         
         response = request_context.get("/twin/datacenter/v1/ontology")
         
         # Should return 401 Unauthorized
         assert response.status == 401, f"Expected 401, got {response.status}"
-        
-        request_context.dispose()
     
-    def test_get_ontology_invalid_token(self, playwright):
+    def test_get_ontology_invalid_token(self, auth_contexts):
         """Test ontology endpoint with invalid bearer token"""
-        request_context = playwright.request.new_context(
-            base_url="https://localhost:8000",
-            extra_http_headers={
-                "Authorization": "Bearer INVALID_TOKEN"
-            }
-        )
+        request_context = auth_contexts["invalid"]
         
         response = request_context.get("/twin/datacenter/v1/ontology")
         
         # Should return 401 Unauthorized
         assert response.status == 401, f"Expected 401, got {response.status}"
-        
-        request_context.dispose()
 
 
 class TestEntityValidation:
@@ -306,7 +249,7 @@ class TestEntityValidation:
             data = response.json()
             
             # Find SiteType entity
-            site_entities = [e for e in data["entities"] if e.get("type") == "SiteType"]
+            site_entities = SiteGraph.from_payload(data).entities_of_type("SiteType")
             
             if len(site_entities) > 0:
                 site_entity = site_entities[0]
@@ -377,6 +320,55 @@ class TestRelationshipValidation:
                 assert isinstance(relationship["target"], str), "target should be a string"
                 assert len(relationship["source"]) > 0, "source should not be empty"
                 assert len(relationship["target"]) > 0, "target should not be empty"
+    
+    def test_relationships_resolve_to_entities(self, datacenter_api_context: APIRequestContext):
+        """Test every relationship source and target is an entity of the site"""
+        site_id = "Site-001"
+        response = datacenter_api_context.get(f"/twin/datacenter/v1/details/{site_id}")
+        assert response.ok, f"Request failed with status {response.status}"
+        
+        graph = SiteGraph.from_payload(response.json())
+        
+        assert graph.dangling_references() == []
+    
+    def test_paired_relationships_have_inverses(self, datacenter_api_context: APIRequestContext):
+        """Test feeds/fedBy, controls/controlledBy and protects/protectedBy come in pairs"""
+        site_id = "Site-001"
+        response = datacenter_api_context.get(f"/twin/datacenter/v1/details/{site_id}")
+        assert response.ok, f"Request failed with status {response.status}"
+        
+        graph = SiteGraph.from_payload(response.json())
+        
+        assert graph.missing_inverses() == []
+    
+    def test_power_flow_has_no_cycles(self, details_paginator):
+        """Test feeds/suppliesPowerTo form no loop, indexing pages as they stream in"""
+        paginator = details_paginator("Site-001", limit=10)
+        
+        graph = SiteGraph.from_pages(paginator.pages())
+        
+        assert paginator.stats.pages > 1, "Expected more than one page"
+        assert graph.find_cycle() is None
+        graph.assert_consistent()
+
+
+class TestSiteChanges:
+    """Test suite validating only what changed in each site since the last run"""
+    
+    @pytest.mark.parametrize("site_id", config.VALID_SITE_IDS)
+    def test_changed_subgraph_is_valid(self, datacenter_api_context: APIRequestContext, site_snapshots,
+                                       payload_validators, site_id):
+        """Test new and changed entities and relationships against the schemas"""
+        response = datacenter_api_context.get(f"/twin/datacenter/v1/details/{site_id}")
+        assert response.ok, f"Request failed with status {response.status}"
+        
+        validator = site_snapshots.validator(site_id, payload_validators)
+        validator.assert_valid(stream_response(response, keep_raw=True))
+        
+        # Only a passing run becomes the baseline for the next one
+        diff = site_snapshots.commit(site_id, validator)
+        print("\n".join(diff.lines()))
+        assert validator.validated["entities"] == len(diff["entities"].added) + len(diff["entities"].changed)
 
 
 class TestErrorHandling:
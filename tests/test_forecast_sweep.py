@@ -0,0 +1,104 @@
+import json
+
+import pytest
+
+import config
+from harness.async_client import AsyncResponse
+from harness.standin import build_forecast
+from harness.sweep import check_responses, grid
+
+
+def _response(location, payload=None, status=200):
+    """AsyncResponse for a location, with the stand-in forecast unless a payload is given"""
+    latitude, longitude = location
+    payload = build_forecast(longitude, latitude) if payload is None else payload
+    return AsyncResponse("/v1/forecast", {"latitude": latitude, "longitude": longitude}, status, "",
+                         {}, json.dumps(payload).encode(), 0.001)
+
+
+class TestSweepChecks:
+    """Test suite for the grid helper and the batched response checks"""
+
+    def test_grid_spans_the_box(self):
+        """Test rows x cols points with corners included and coordinates rounded"""
+        points = grid(-10.0, 10.0, 100.0, 130.0, 3, 4)
+
+        assert len(points) == 12
+        assert points[0] == (-10.0, 100.0) and points[-1] == (10.0, 130.0)
+        assert grid(0, 1, 0, 1, 1, 1) == [(0.5, 0.5)]
+
+    def test_every_kind_of_problem_is_reported_per_location(self, payload_validators):
+        """Test echo, timezone, missing metric, point and status problems each name their location"""
+        locations = [(10.0, 20.0), (30.0, 40.0), (50.0, 60.0), (70.0, 80.0), (-5.0, -6.0)]
+        wrong_echo = build_forecast(21.0, 10.0)
+        no_timezone = build_forecast(40.0, 30.0)
+        no_timezone["data"]["resource"]["timezone"] = ""
+        missing_metric = build_forecast(60.0, 50.0)
+        missing_metric["data"]["metrics"] = [m for m in missing_metric["data"]["metrics"]
+                                             if m["name"] != "relativeHumidity"]
+        missing_metric["data"]["points"][3]["dryBulbTemperature"] = 99.0
+        responses = [_response(locations[0], wrong_echo), _response(locations[1], no_timezone),
+                     _response(locations[2], missing_metric), _response(locations[3]),
+                     _response(locations[4], {"error": {"code": "X", "message": "x"}}, status=503)]
+
+        problems = check_responses(locations, responses, payload_validators["forecast"])
+
+        assert problems == [
+            ((10.0, 20.0), "longitude echoed as 21.0, requested 20.0"),
+            ((30.0, 40.0), "empty timezone"),
+            ((50.0, 60.0), "missing metric(s) relativeHumidity"),
+            ((50.0, 60.0), "dryBulbTemperature: 1 values outside [-90.0, 60.0]"),
+            ((-5.0, -6.0), "status 503"),
+        ]
+
+    def test_nan_echo_is_a_mismatch(self, payload_validators):
+        """Test a NaN echoed coordinate is reported even when the other locations match"""
+        locations = [(10.0, 20.0), (30.0, 40.0)]
+        nan_echo = build_forecast(40.0, 30.0)
+        nan_echo["data"]["resource"]["latitude"] = float("nan")
+
+        problems = check_responses(locations, [_response(locations[0]), _response(locations[1], nan_echo)],
+                                   payload_validators["forecast"])
+
+        assert problems == [((30.0, 40.0), "latitude echoed as nan, requested 30.0")]
+
+    def test_schema_violations_skip_the_other_checks(self, payload_validators):
+        """Test a payload that fails the schema is reported once, not as a cascade"""
+        problems = check_responses([(1.0, 2.0)], [_response((1.0, 2.0), {"data": {}})],
+                                   payload_validators["forecast"])
+
+        assert len(problems) == 1
+        assert problems[0][1].startswith("3 schema violation(s), first $.data.resource: missing required field")
+
+
+class TestForecastSweep:
+    """Test suite for sweeping /v1/forecast across many locations"""
+
+    def test_datacenter_locations(self, forecast_sweep):
+        """Test every datacenter location echoes its coordinates and lists the required metrics"""
+        result = forecast_sweep.run(config.FORECAST_LOCATIONS.values())
+
+        result.assert_ok()
+        assert len(result) == len(config.FORECAST_LOCATIONS)
+        assert result.latency()["count"] == len(result)
+
+    def test_invalid_coordinates_are_reported(self, forecast_sweep):
+        """Test out-of-range coordinates show up as problems of their own location only"""
+        result = forecast_sweep.run([(37.7749, -122.4194), (95.0, 0.0), (0.0, 190.0)])
+
+        assert [location for location, _ in result.problems] == [(95.0, 0.0), (0.0, 190.0)]
+        with pytest.raises(AssertionError, match="2 forecast sweep problem"):
+            result.assert_ok()
+
+    @pytest.mark.parametrize("rows, cols", [
+        (10, 10),
+        pytest.param(25, 40, marks=pytest.mark.benchmark),
+    ])
+    def test_grid_sweep(self, forecast_sweep, rows, cols):
+        """Benchmark a lat/long grid sweep: latency distribution and throughput"""
+        result = forecast_sweep.run(grid(-60.0, 70.0, -180.0, 180.0, rows, cols))
+
+        print("\n".join(result.lines()))
+        result.assert_ok()
+        assert len(result) == rows * cols
+        assert result.throughput > 0
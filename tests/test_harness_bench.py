@@ -0,0 +1,105 @@
+import json
+
+import pytest
+
+from harness.bench import BENCH_CASES, STAGES, BenchReport, HarnessBench, StageStats, measure
+from harness.standin import StandInServer
+
+
+@pytest.fixture(scope="module")
+def harness_bench(request, playwright, api_settings, payload_validators, pytestconfig):
+    """HarnessBench against a private stand-in, so payloads and server load are the same every run
+
+    With --bench-api it runs against api_base_url and forecast_base_url instead, which
+    times TLS setup for https APIs but depends on the network and the server's load.
+    """
+    if pytestconfig.getoption("bench_api"):
+        yield HarnessBench(playwright, {
+            "datacenter": (request.getfixturevalue("api_base_url"), api_settings.datacenter_headers),
+            "forecast": (request.getfixturevalue("forecast_base_url"), api_settings.forecast_headers),
+        }, payload_validators)
+        return
+    with StandInServer(tokens=(api_settings.datacenter_token, api_settings.forecast_token)) as server:
+        yield HarnessBench(playwright, {
+            "datacenter": (server.url, api_settings.datacenter_headers),
+            "forecast": (server.url, api_settings.forecast_headers),
+        }, payload_validators)
+
+
+def _stats(*medians_ms):
+    return StageStats([ms / 1000.0 for ms in medians_ms])
+
+
+class TestBenchReport:
+    """Test suite for benchmark statistics and the baseline comparison"""
+
+    def test_measure_discards_warmups(self):
+        """Test warm-up calls run but are not part of the samples"""
+        calls = []
+
+        samples = measure(lambda: calls.append(1), warmup=3, repeat=5)
+
+        assert len(calls) == 8
+        assert len(samples) == 5
+
+    def test_regressions_need_relative_and_absolute_change(self):
+        """Test a stage regresses only past both threshold_pct and min_delta_ms"""
+        report = BenchReport(threshold_pct=10.0, min_delta_ms=0.05)
+        report.add("model", {"decode": _stats(1.0, 1.0, 1.0), "validate": _stats(0.02, 0.02, 0.02),
+                             "request": _stats(2.0, 2.0, 2.0)})
+        baseline = {"model/decode": {"median_ms": 0.5}, "model/validate": {"median_ms": 0.01},
+                    "model/request": {"median_ms": 1.95}}
+
+        assert report.regressions(baseline) == ["model/decode"]
+        rows = report.lines(baseline)
+        assert rows[1].startswith("model/decode") and rows[1].endswith("+100.0% !")
+        assert rows[2].endswith("+100.0%"), "A 0.01ms change is noise, not a regression"
+
+    def test_saved_baseline_round_trips(self, tmp_path):
+        """Test save() writes what lines() compares against"""
+        path = tmp_path / "bench.json"
+        report = BenchReport()
+        report.add("ontology", {"decode": _stats(0.1, 0.2, 0.3)})
+        report.save(str(path))
+
+        baseline = json.loads(path.read_text())
+        assert baseline["ontology/decode"]["median_ms"] == pytest.approx(0.2)
+        assert report.regressions(baseline) == []
+        assert report.lines(baseline)[1].endswith("+0.0%")
+
+    def test_zero_baseline_median(self):
+        """Test a 0ms baseline median is compared in absolute terms instead of dividing by zero"""
+        report = BenchReport()
+        report.add("model", {"decode": _stats(1.0)})
+
+        assert report.lines({"model/decode": {"median_ms": 0.0}})[1].endswith("+1.000ms !")
+
+    def test_merged_worker_rows_are_reported(self):
+        """Test rows merged from xdist workers join this process's results"""
+        worker = BenchReport()
+        worker.add("ontology", {"decode": _stats(0.1)})
+        controller = BenchReport()
+        controller.add("model", {"decode": _stats(0.2)})
+
+        controller.merge(worker.to_dict())
+
+        assert len(controller.to_dict()) == 2
+        assert [row.split()[0] for row in controller.lines()[1:]] == ["ontology/decode", "model/decode"]
+
+    def test_every_stage_is_measured(self, harness_bench, playwright):
+        """Test one short run of a case yields samples for all stages"""
+        short = HarnessBench(playwright, harness_bench.targets, harness_bench.validators, warmup=1, repeat=3)
+        stages = short.run_case(BENCH_CASES[3])
+
+        assert list(stages) == list(STAGES)
+        assert all(len(stats.samples) == 3 for stats in stages.values())
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("case", BENCH_CASES, ids=lambda case: case.name)
+def test_harness_stages(harness_bench, bench_report, case):
+    """Benchmark context setup, transfer, decode and validation for one endpoint"""
+    stages = harness_bench.run_case(case)
+    bench_report.add(case.name, stages)
+
+    print(" ".join(f"{stage}={stats.median_ms:.3f}ms" for stage, stats in stages.items()))
@@ -0,0 +1,42 @@
+import pytest
+
+from harness.endpoints import endpoint_template
+from harness.load import CallRecorder, LoadRunner
+from harness.stats import percentile
+
+
+class TestLoadMode:
+    """Test suite for replaying recorded calls as a load test"""
+
+    def test_endpoint_template_groups_site_ids(self):
+        """Test details calls for different sites share one endpoint template"""
+        assert endpoint_template("/twin/datacenter/v1/details/Site-001") == "/twin/datacenter/v1/details/{site_id}"
+        assert endpoint_template("http://host:8000/twin/datacenter/v1/details/Site-002?limit=5") == \
+            "/twin/datacenter/v1/details/{site_id}"
+        assert endpoint_template("/twin/datacenter/v1/model") == "/twin/datacenter/v1/model"
+
+    def test_percentile_nearest_rank(self):
+        """Test nearest-rank percentiles over sorted samples"""
+        samples = list(range(1, 101))
+
+        assert percentile(samples, 50) == 50
+        assert percentile(samples, 95) == 95
+        assert percentile(samples, 99) == 99
+        assert percentile([7], 99) == 7
+
+    @pytest.mark.live_api
+    def test_replay_counts_requests_and_errors(self, api_base_url, api_auth_headers):
+        """Test a fixed request count is replayed and unexpected statuses count as errors"""
+        recorder = CallRecorder()
+        recorder.record(api_base_url, "/twin/datacenter/v1/model", None, api_auth_headers, 200)
+        recorder.record(api_base_url, "/twin/datacenter/v1/details/Site-001", {"limit": 5}, api_auth_headers, 200)
+        # Recorded as 200 but the stand-in answers 404, so every replay is an error
+        recorder.record(api_base_url, "/twin/datacenter/v1/details/NON_EXISTENT_SITE", None, api_auth_headers, 200)
+
+        report = LoadRunner(recorder.calls, workers=3, requests=30).run().to_dict()
+
+        assert report["requests"] == 30
+        details = report["endpoints"]["GET /twin/datacenter/v1/details/{site_id}"]
+        assert details["count"] == 20
+        assert details["errors"] == 10
+        assert report["endpoints"]["GET /twin/datacenter/v1/model"]["error_rate"] == 0.0
@@ -0,0 +1,69 @@
+import pytest
+from playwright.sync_api import APIRequestContext
+
+import config
+from harness.matrix import expand, full_matrix
+
+
+MATRIX = full_matrix()
+
+pytestmark = pytest.mark.matrix
+
+
+class TestEntityRelationshipMatrix:
+    """Data-driven checks over VALID_SITE_IDS x ENTITY_TYPES x RELATIONSHIP_TYPES x MEASUREMENT_TYPES
+
+    Every case reads the same per-site fetch from site_views, so the matrix
+    costs one request per site.
+    """
+
+    @pytest.mark.parametrize("case", MATRIX, ids=lambda case: case.id)
+    def test_case(self, site_views, payload_validators, case):
+        """Test filtered entities, relationships and measurements for one case"""
+        view = site_views.for_case(case)
+        entity_check = payload_validators["entity"]
+        relationship_check = payload_validators["relationship"]
+        measurement_check = payload_validators["measurement"]
+
+        if case.measurement_type is not None:
+            for entity in view.entities_measuring(case.measurement_type):
+                measurement = entity["state"][case.measurement_type]
+                measurement_check.assert_valid(measurement, (None, entity["id"]))
+                assert measurement["measurementType"] == case.measurement_type, \
+                    f"{entity['id']} state key and measurementType disagree"
+            return
+
+        entities, relationships = view.select(case.entity_type, case.relationship_type)
+        for entity in entities:
+            entity_check.assert_valid(entity, (None, entity["id"]))
+            assert entity["type"] == case.entity_type, f"Unexpected type for {entity['id']}"
+            assert entity["attributes"].get("siteId", case.site_id) == case.site_id
+
+        for relationship in relationships:
+            relationship_check.assert_valid(relationship, (None, relationship["id"]))
+            if case.relationship_type is not None:
+                assert relationship["type"] == case.relationship_type
+            source = view.entity_by_id.get(relationship["source"])
+            assert source is not None and source["type"] == case.entity_type, \
+                f"{relationship['id']} source does not resolve to a {case.entity_type}"
+            assert relationship["target"] in view.entity_by_id, \
+                f"{relationship['id']} target {relationship['target']} does not resolve"
+
+
+class TestClientSideFilteringMatchesServer:
+    """Spot-check the merged cases against real server-side filtering"""
+
+    @pytest.mark.parametrize("case", expand(config.VALID_SITE_IDS[:1], config.ENTITY_TYPES), ids=lambda case: case.id)
+    def test_entity_type_filter(self, datacenter_api_context: APIRequestContext, site_views, case):
+        """Test client-side entityType filtering returns what the API returns"""
+        response = datacenter_api_context.get(
+            f"/twin/datacenter/v1/details/{case.site_id}",
+            params={"entityType": case.entity_type}
+        )
+        assert response.ok, f"Request failed with status {response.status}"
+        data = response.json()
+
+        entities, relationships = site_views.for_case(case).select(case.entity_type)
+
+        assert [e["id"] for e in data["entities"]] == [e["id"] for e in entities]
+        assert [r["id"] for r in data["relationships"]] == [r["id"] for r in relationships]
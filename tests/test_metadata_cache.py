@@ -0,0 +1,123 @@
+import json
+
+import pytest
+
+import config
+from harness.cache import CachingRequestContext, ResponseCache
+from harness.metadata import MODEL_PATH, ONTOLOGY_PATH, MetadataCache
+from harness.standin import ONTOLOGY_CONTEXT, StandInServer
+
+
+@pytest.fixture(scope="module")
+def standin_context(request_context_factory, api_settings):
+    """Request context on a private stand-in, so the cache tests do not depend on the profile's API"""
+    with StandInServer(tokens=(api_settings.datacenter_token,)) as server:
+        yield server.url, request_context_factory(server.url, api_settings.datacenter_headers)
+
+
+@pytest.mark.no_cache
+class TestConditionalRequests:
+    """Test suite for ETag / Last-Modified revalidation by the API itself"""
+
+    @pytest.mark.parametrize("path", [ONTOLOGY_PATH, MODEL_PATH])
+    def test_matching_validators_return_304(self, datacenter_api_context, path):
+        """Test the server answers If-None-Match and If-Modified-Since with an empty 304"""
+        response = datacenter_api_context.get(path)
+        assert response.status == 200
+        etag, last_modified = response.headers.get("etag"), response.headers.get("last-modified")
+        assert etag or last_modified, f"{path} sends neither ETag nor Last-Modified; clients cannot revalidate"
+
+        if etag:
+            revalidated = datacenter_api_context.get(path, headers={"If-None-Match": etag})
+            assert revalidated.status == 304
+            assert revalidated.body() == b""
+            assert revalidated.headers.get("etag") == etag
+        if last_modified:
+            revalidated = datacenter_api_context.get(path, headers={"If-Modified-Since": last_modified})
+            assert revalidated.status == 304
+
+    def test_stale_etag_returns_the_body(self, datacenter_api_context):
+        """Test a validator that no longer matches gets a full 200, even with If-Modified-Since"""
+        response = datacenter_api_context.get(MODEL_PATH, headers={
+            "If-None-Match": '"stale"',
+            "If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT",
+        })
+
+        assert response.status == 200
+        assert response.json()["entityTypes"]
+
+
+class TestMetadataCache:
+    """Test suite for the on-disk metadata cache"""
+
+    def test_second_session_revalidates_without_transfer(self, standin_context, tmp_path):
+        """Test a new cache over the same directory gets 304s and reuses the stored index"""
+        base_url, context = standin_context
+        first = MetadataCache(str(tmp_path), context, base_url)
+        prefixes, model = first.prefixes(), first.model()
+
+        second = MetadataCache(str(tmp_path), context, base_url)
+        assert second.prefixes() == prefixes == ONTOLOGY_CONTEXT
+        assert second.model() == model
+        assert (first.fetched, first.not_modified) == (2, 0)
+        assert (second.fetched, second.not_modified, second.bytes_fetched) == (0, 2, 0)
+        assert second.bytes_saved == first.bytes_fetched > 0
+
+    def test_revalidates_through_a_response_cache(self, standin_context, api_settings, tmp_path):
+        """Test a ResponseCache holding earlier 200s does not answer the conditional GETs"""
+        base_url, context = standin_context
+        cached = CachingRequestContext(context, ResponseCache(1024 * 1024), api_settings.datacenter_headers)
+        first = MetadataCache(str(tmp_path), cached, base_url)
+        first.prefixes(), first.model()
+        assert cached.get(MODEL_PATH).from_cache
+
+        second = MetadataCache(str(tmp_path), cached, base_url)
+        second.prefixes(), second.model()
+
+        assert (second.fetched, second.not_modified) == (0, 2)
+        assert cached._cache.bypassed == 2
+
+    def test_model_index(self, standin_context, tmp_path):
+        """Test the model index is keyed by the config.py vocabularies"""
+        base_url, context = standin_context
+        model = MetadataCache(str(tmp_path), context, base_url).model()
+
+        assert list(model["entityTypes"]) == config.ENTITY_TYPES
+        assert list(model["relationships"]) == config.RELATIONSHIP_TYPES
+        assert list(model["measurements"]) == config.MEASUREMENT_TYPES
+        assert model["relationships"]["feeds"]["inverse"] == "fedBy"
+
+    def test_changed_or_refreshed_entries_are_fetched(self, standin_context, tmp_path):
+        """Test a stored ETag the server no longer has, or --refresh-metadata, fetches and rewrites the file"""
+        base_url, context = standin_context
+        cache = MetadataCache(str(tmp_path), context, base_url)
+        cache.fetch(MODEL_PATH)
+        path = cache.path_for(MODEL_PATH)
+        with open(path) as fh:
+            stored = json.load(fh)
+        stored.update(etag='"old"', last_modified=None, index={})
+        with open(path, "w") as fh:
+            json.dump(stored, fh)
+
+        changed = MetadataCache(str(tmp_path), context, base_url)
+        assert changed.model()["entityTypes"]
+        refreshed = MetadataCache(str(tmp_path), context, base_url, refresh=True)
+        refreshed.model()
+
+        assert changed.fetched == refreshed.fetched == 1
+        assert MetadataCache(str(tmp_path), context, base_url).stored(MODEL_PATH).etag != '"old"'
+
+    def test_revalidated_once_per_session(self, standin_context, tmp_path):
+        """Test repeated lookups in one session make one request"""
+        base_url, context = standin_context
+        cache = MetadataCache(str(tmp_path), context, base_url)
+        for _ in range(3):
+            cache.prefixes()
+
+        assert cache.fetched + cache.not_modified == 1
+
+    def test_fixture_matches_the_live_ontology(self, api_metadata, datacenter_api_context):
+        """Test api_metadata's prefixes are those the API serves now"""
+        live = datacenter_api_context.get(ONTOLOGY_PATH).json()["@context"]
+
+        assert api_metadata.prefixes() == {prefix: uri for prefix, uri in live.items() if isinstance(uri, str)}
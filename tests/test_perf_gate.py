@@ -0,0 +1,140 @@
+import os
+import time
+
+import pytest
+
+from harness.budgets import PerfGate
+
+
+pytest_plugins = ("pytester",)
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Every sample of /model is over a 1ns budget
+GATED_TEST = """
+import pytest
+
+
+@pytest.mark.latency_budget(endpoint="/twin/datacenter/v1/model", p95_ms=0.000001)
+def test_model(datacenter_api_context):
+    assert datacenter_api_context.get("/twin/datacenter/v1/model").ok
+"""
+
+
+class FakeResponse:
+
+    def __init__(self, size):
+        self._body = b"x" * size
+
+    def body(self):
+        return self._body
+
+
+class SlowContext:
+    """Request context stand-in with a fixed delay and body size"""
+
+    def __init__(self, delay_ms, size=10):
+        self.delay_ms = delay_ms
+        self.size = size
+        self.calls = 0
+
+    def get(self, url, params=None, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay_ms / 1000.0)
+        return FakeResponse(self.size)
+
+
+MODEL = "/twin/datacenter/v1/model"
+
+
+class TestPerfGate:
+    """Test suite for latency budgets and baseline regression checks"""
+
+    def run_once(self, gate, context, nodeid="test_model", marker_budgets=()):
+        gate.nodeid = nodeid
+        gate.note(context, MODEL, None, {})
+        gate.note(context, MODEL, None, {})  # duplicate calls are sampled once
+        return gate.check(nodeid, marker_budgets)
+
+    def test_within_budget(self, tmp_path):
+        """Test a fast endpoint within its budget reports no problems"""
+        gate = PerfGate({MODEL: {"p95_ms": 500, "max_bytes": 100}}, str(tmp_path / "b.json"), samples=3)
+        context = SlowContext(delay_ms=1)
+
+        assert self.run_once(gate, context) == []
+        assert context.calls == 3
+
+    def test_marker_overrides_budget(self, tmp_path):
+        """Test a latency_budget marker tightens the config budget"""
+        gate = PerfGate({MODEL: {"p95_ms": 500}}, str(tmp_path / "b.json"), samples=3)
+
+        problems = self.run_once(gate, SlowContext(delay_ms=5, size=200),
+                                 marker_budgets=[{"p95_ms": 1, "max_bytes": 100}])
+
+        assert len(problems) == 2
+        assert "over budget 1ms" in problems[0]
+        assert "200 bytes over budget 100 bytes" in problems[1]
+
+    def test_regression_against_rolling_baseline(self, tmp_path):
+        """Test a slowdown is flagged once enough history exists, and not stored in the baseline"""
+        path = str(tmp_path / "b.json")
+        gate = PerfGate({}, path, samples=3, min_delta_ms=5, min_history=3)
+        for _ in range(3):
+            assert self.run_once(gate, SlowContext(delay_ms=1)) == []
+        gate.save()
+
+        reloaded = PerfGate({}, path, samples=3, min_delta_ms=5, min_history=3)
+        problems = self.run_once(reloaded, SlowContext(delay_ms=30))
+
+        assert len(problems) == 1
+        assert "regressed" in problems[0]
+        assert len(reloaded._baseline[f"test_model::{MODEL}"]) == 3
+
+    def test_zero_baseline_median(self, tmp_path):
+        """Test a 0ms baseline is compared in absolute terms instead of dividing by zero"""
+        path = str(tmp_path / "b.json")
+        gate = PerfGate({}, path, samples=3, min_delta_ms=5, min_history=3)
+        gate._baseline[f"test_model::{MODEL}"] = [0.0, 0.0, 0.0]
+
+        problems = self.run_once(gate, SlowContext(delay_ms=30))
+
+        assert len(problems) == 1
+        assert "against baseline 0.0ms" in problems[0] and "regressed +" in problems[0]
+
+    def test_no_regression_without_history(self, tmp_path):
+        """Test the first runs only build the baseline"""
+        gate = PerfGate({}, str(tmp_path / "b.json"), samples=2, min_history=3)
+
+        assert self.run_once(gate, SlowContext(delay_ms=1)) == []
+        assert self.run_once(gate, SlowContext(delay_ms=30)) == []
+
+
+class TestPerfGateSession:
+    """Test suite for how --perf-gate reports an over-budget test in a pytest run"""
+
+    @pytest.fixture
+    def gated(self, pytester, monkeypatch):
+        """A pytester directory with this suite's conftest and one over-budget test"""
+        for name in list(os.environ):
+            if name.startswith(("API_TEST_", "DATACENTER_API_", "FORECAST_API_", "PYTEST_XDIST_")):
+                monkeypatch.delenv(name)
+        monkeypatch.setenv("API_TEST_PROFILE", "local")
+        monkeypatch.setenv("PYTHONPATH", os.pathsep.join(filter(None, (TESTS_DIR, os.environ.get("PYTHONPATH")))))
+        with open(os.path.join(TESTS_DIR, "conftest.py")) as fh:
+            pytester.makeconftest(fh.read())
+        pytester.makepyfile(test_gated=GATED_TEST)
+        return pytester
+
+    def test_fail_mode_fails_the_test(self, gated):
+        """Test --perf-gate=fail reports the test itself as failed, not passed plus a teardown error"""
+        result = gated.runpytest_subprocess("--perf-gate=fail", "--perf-samples=2", "-p", "no:cacheprovider")
+
+        result.assert_outcomes(failed=1)
+        result.stdout.fnmatch_lines(["*performance gate:*", "*/twin/datacenter/v1/model: p95 *over budget*"])
+
+    def test_warn_mode_passes_with_a_warning(self, gated):
+        """Test --perf-gate=warn passes the test and reports the problems as a PerfRegressionWarning"""
+        result = gated.runpytest_subprocess("--perf-gate=warn", "--perf-samples=2", "-p", "no:cacheprovider")
+
+        result.assert_outcomes(passed=1, warnings=1)
+        result.stdout.fnmatch_lines(["*PerfRegressionWarning: performance gate:*"])
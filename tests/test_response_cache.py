@@ -0,0 +1,87 @@
+import pytest
+
+from harness.cache import CachedResponse, CachingRequestContext, ResponseCache, request_key
+
+
+def make_response(body=b"{}", status=200):
+    return CachedResponse("http://stand-in/", status, "OK", {}, body)
+
+
+class TestResponseCache:
+    """Test suite for the byte-bounded response LRU"""
+
+    def test_hit_and_miss_counts(self):
+        """Test lookups are counted as hits or misses"""
+        cache = ResponseCache(max_bytes=1024)
+        key = request_key("GET", "/twin/datacenter/v1/model", None, "Bearer a")
+
+        assert cache.get(key) is None
+        cache.put(key, make_response(b'{"ok": true}'))
+        assert cache.get(key).json() == {"ok": True}
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_key_covers_params_and_auth(self):
+        """Test params order is normalized and auth header is part of the key"""
+        first = request_key("get", "/details/Site-001", {"limit": 5, "entityType": "PDUType"}, "Bearer a")
+        second = request_key("GET", "/details/Site-001", {"entityType": "PDUType", "limit": "5"}, "Bearer a")
+        other_auth = request_key("GET", "/details/Site-001", {"entityType": "PDUType", "limit": "5"}, "Bearer b")
+
+        assert first == second
+        assert first != other_auth
+
+    def test_evicts_least_recently_used_by_bytes(self):
+        """Test entries are evicted oldest-first once the byte budget is exceeded"""
+        cache = ResponseCache(max_bytes=10)
+        cache.put("a", make_response(b"1234"))
+        cache.put("b", make_response(b"1234"))
+        cache.get("a")
+        cache.put("c", make_response(b"1234"))
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.bytes_used == 8
+        assert cache.evictions == 1
+
+    def test_oversized_response_not_cached(self):
+        """Test a body larger than the whole budget is never stored"""
+        cache = ResponseCache(max_bytes=4)
+        cache.put("a", make_response(b"12345"))
+
+        assert len(cache) == 0
+        assert cache.bytes_used == 0
+
+
+@pytest.mark.live_api
+class TestCachingRequestContext:
+    """Test suite for the caching wrapper around APIRequestContext"""
+
+    @pytest.fixture
+    def cached_context(self, request_context_factory, api_auth_headers):
+        request_context = request_context_factory(headers=api_auth_headers)
+        return CachingRequestContext(request_context, ResponseCache(1024 * 1024), api_auth_headers)
+
+    def test_repeated_get_served_from_cache(self, cached_context):
+        """Test an identical GET is only sent once"""
+        first = cached_context.get("/twin/datacenter/v1/details/Site-001")
+        second = cached_context.get("/twin/datacenter/v1/details/Site-001")
+
+        assert first.ok
+        assert second.body() is first.body()
+        assert (first.from_cache, second.from_cache) == (False, True)
+        assert cached_context._cache.hits == 1
+
+    def test_error_responses_not_cached(self, cached_context):
+        """Test non-2xx responses are passed through but not memoized"""
+        response = cached_context.get("/twin/datacenter/v1/details/NON_EXISTENT_SITE")
+
+        assert response.status == 404
+        assert len(cached_context._cache) == 0
+
+    def test_bypass_skips_cache(self, cached_context):
+        """Test bypass sends the request without touching the cache"""
+        cached_context._cache.bypass = True
+        response = cached_context.get("/twin/datacenter/v1/model")
+
+        assert response.ok
+        assert len(cached_context._cache) == 0
+        assert cached_context._cache.bypassed == 1
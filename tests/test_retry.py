@@ -0,0 +1,153 @@
+import pytest
+from playwright.sync_api import Error as PlaywrightError
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from harness.retry import RetryingRequestContext, RetryPolicy
+from harness.timing import CallTrace, InstrumentedRequestContext
+
+
+class _Response:
+    def __init__(self, status):
+        self.status = status
+        self.headers = {}
+        self.disposed = False
+
+    def dispose(self):
+        self.disposed = True
+
+
+class _Scripted:
+    """Request context stand-in answering from a list of statuses or exceptions"""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = []
+
+    def get(self, url, params=None, **kwargs):
+        self.calls.append((url, kwargs))
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return _Response(outcome)
+
+
+def _policy(**kwargs):
+    delays = []
+    kwargs.setdefault("rng", lambda: 1.0)
+    policy = RetryPolicy(sleep=delays.append, **kwargs)
+    return policy, delays
+
+
+class TestRetryPolicy:
+    """Test suite for timeouts, retries and backoff on the API fixtures"""
+
+    def test_5xx_is_retried_until_success(self):
+        """Test a 503 then 502 then 200 returns the 200 after two retries"""
+        policy, delays = _policy(retries=2)
+        inner = _Scripted(503, 502, 200)
+        context = RetryingRequestContext(inner, policy)
+
+        response = context.get("/twin/datacenter/v1/model")
+
+        assert response.status == 200
+        assert context.last_attempts == 3
+        assert policy.used == 2
+        assert [event.reason for event in policy.events] == ["HTTP 503", "HTTP 502"]
+        assert len(delays) == 2
+
+    @pytest.mark.parametrize("status", [400, 401, 404, 429])
+    def test_4xx_is_never_retried(self, status):
+        """Test client errors come straight back to the test"""
+        policy, delays = _policy()
+        context = RetryingRequestContext(_Scripted(status), policy)
+
+        assert context.get("/twin/datacenter/v1/details/BAD").status == status
+        assert context.last_attempts == 1
+        assert delays == []
+
+    def test_last_5xx_is_returned_when_retries_run_out(self):
+        """Test the final server error reaches the test, earlier ones are disposed"""
+        policy, _ = _policy(retries=1)
+        context = RetryingRequestContext(_Scripted(500, 500, 200), policy)
+
+        assert context.get("/v1/forecast").status == 500
+        assert context.last_attempts == 2
+
+    def test_connection_errors_are_retried_then_raised(self, request_context_factory):
+        """Test a refused connection is retried, then the Playwright error propagates"""
+        policy, delays = _policy(retries=2, default_timeout_ms=2000)
+        context = RetryingRequestContext(request_context_factory(), policy)
+
+        with pytest.raises(PlaywrightError):
+            context.get("http://127.0.0.1:9/twin/datacenter/v1/model")
+
+        assert context.last_attempts == 3
+        assert len(delays) == 2
+
+    def test_other_playwright_errors_are_raised_at_once(self):
+        """Test an error that is not a timeout or connection failure is neither retried nor delayed"""
+        policy, delays = _policy(retries=2)
+        inner = _Scripted(PlaywrightError("Target page, context or browser has been closed"), 200)
+        context = RetryingRequestContext(inner, policy)
+
+        with pytest.raises(PlaywrightError, match="has been closed"):
+            context.get("/twin/datacenter/v1/model")
+
+        assert len(inner.calls) == 1
+        assert context.last_attempts == 1
+        assert (policy.used, delays) == (0, [])
+
+    def test_timeouts_are_retried(self):
+        """Test a Playwright TimeoutError counts as retryable"""
+        policy, _ = _policy(retries=1)
+        context = RetryingRequestContext(_Scripted(PlaywrightTimeoutError("Timeout 10ms exceeded."), 200), policy)
+
+        assert context.get("/twin/datacenter/v1/model").status == 200
+        assert policy.used == 1
+
+    def test_budget_caps_retries_across_calls(self):
+        """Test the session budget stops retrying once spent and counts what it refused"""
+        policy, _ = _policy(retries=3, budget=4)
+        context = RetryingRequestContext(_Scripted(*[503] * 10), policy)
+
+        context.get("/twin/datacenter/v1/model")
+        context.get("/twin/datacenter/v1/model")
+
+        assert policy.used == 4
+        assert policy.exhausted == 1
+        assert "4/4 retries used" in policy.summary()
+
+    def test_backoff_is_jittered_exponential_and_capped(self):
+        """Test each delay lies in [0, min(max, base * 2**attempt)]"""
+        policy, _ = _policy(backoff_ms=100, max_backoff_ms=500)
+
+        assert [policy.backoff(attempt) for attempt in range(5)] == [0.1, 0.2, 0.4, 0.5, 0.5]
+        jittered = RetryPolicy(backoff_ms=100, max_backoff_ms=500)
+        assert all(0.0 <= jittered.backoff(3) <= 0.5 for _ in range(100))
+
+    def test_timeout_follows_the_endpoint(self):
+        """Test the per-endpoint timeout is applied, and an explicit timeout wins"""
+        policy, _ = _policy(timeouts_ms={"/twin/datacenter/v1/details/{site_id}": 60000},
+                            default_timeout_ms=30000)
+        inner = _Scripted(200, 200, 200)
+        context = RetryingRequestContext(inner, policy)
+
+        context.get("/twin/datacenter/v1/details/Site-001")
+        context.get("/twin/datacenter/v1/ontology")
+        context.get("/twin/datacenter/v1/ontology", timeout=5)
+
+        assert [kwargs["timeout"] for _, kwargs in inner.calls] == [60000, 30000, 5]
+
+    def test_retried_calls_are_reported_separately(self):
+        """Test the timing trace keeps retried calls out of the slowest-calls table"""
+        policy, _ = _policy()
+        trace = CallTrace()
+        context = InstrumentedRequestContext(RetryingRequestContext(_Scripted(200, 503, 200), policy), trace)
+
+        context.get("/twin/datacenter/v1/model")
+        context.get("/twin/datacenter/v1/ontology")
+
+        assert [record.attempts for record in trace.records] == [1, 2]
+        assert [record.endpoint for record in trace.slowest(10)] == ["/twin/datacenter/v1/model"]
+        assert [record.endpoint for record in trace.retried()] == ["/twin/datacenter/v1/ontology"]
+        assert "/twin/datacenter/v1/ontology -> 200" in trace.retried_table()[1]
@@ -0,0 +1,62 @@
+import json
+from types import SimpleNamespace
+
+from harness.scheduling import DurationStore
+from harness.workers import merge_json, per_worker_path
+
+
+def items(*nodeids):
+    return [SimpleNamespace(nodeid=nodeid) for nodeid in nodeids]
+
+
+class TestLongestFirstScheduling:
+    """Test suite for duration-based test ordering"""
+
+    def test_orders_by_previous_duration(self, tmp_path):
+        """Test known tests run longest first and unknown tests get the median estimate"""
+        path = tmp_path / "durations.json"
+        path.write_text(json.dumps({"a": 0.1, "b": 3.0, "c": 1.0}))
+        collected = items("a", "b", "new", "c")
+
+        DurationStore(str(path)).order_longest_first(collected)
+
+        assert [item.nodeid for item in collected] == ["b", "new", "c", "a"]
+
+    def test_no_history_keeps_collection_order(self, tmp_path):
+        """Test the first run leaves the order alone"""
+        collected = items("a", "b", "c")
+
+        DurationStore(str(tmp_path / "missing.json")).order_longest_first(collected)
+
+        assert [item.nodeid for item in collected] == ["a", "b", "c"]
+
+    def test_phases_are_summed_and_merged(self, tmp_path):
+        """Test setup/call/teardown durations add up and merge into the existing file"""
+        path = tmp_path / "durations.json"
+        path.write_text(json.dumps({"old": 2.0}))
+        store = DurationStore(str(path))
+        for duration in (0.25, 1.0, 0.25):
+            store.pytest_runtest_logreport(SimpleNamespace(nodeid="t", duration=duration))
+        store.save()
+
+        assert json.loads(path.read_text()) == {"old": 2.0, "t": 1.5}
+
+
+class TestWorkerHelpers:
+    """Test suite for xdist worker helpers"""
+
+    def test_per_worker_path(self):
+        """Test outputs are suffixed only inside xdist workers"""
+        controller = SimpleNamespace()
+        worker = SimpleNamespace(workerinput={"workerid": "gw3"})
+
+        assert per_worker_path(controller, "trace.jsonl") == "trace.jsonl"
+        assert per_worker_path(worker, "out/trace.jsonl") == "out/trace.gw3.jsonl"
+
+    def test_merge_json_keeps_other_keys(self, tmp_path):
+        """Test concurrent writers only replace their own keys"""
+        path = str(tmp_path / "baseline.json")
+        merge_json(path, {"gw0": [1]})
+        merged = merge_json(path, {"gw1": [2]})
+
+        assert merged == {"gw0": [1], "gw1": [2]}
@@ -0,0 +1,82 @@
+import time
+
+import pytest
+
+from harness.schema import ArrayOf, Node, Number, Object, String, Validator
+from harness.standin import build_site
+
+
+class TestSchemaValidator:
+    """Test suite for the compiled payload validators"""
+
+    def test_valid_details_payload(self, payload_validators):
+        """Test the stand-in details payload has no violations"""
+        site = build_site("Site-001")
+        payload = {"siteId": "Site-001", "page": {}, **site}
+
+        assert payload_validators["details"].validate(payload) == []
+
+    def test_reports_every_violation_with_json_path(self, payload_validators):
+        """Test violations beyond the first element are all reported with paths"""
+        payload = {
+            "siteId": "Site-001",
+            "entities": [
+                {"id": "e1", "type": "PDUType", "attributes": {}},
+                {"id": "", "type": "PDUType", "attributes": []},
+                {"type": "PDUType", "attributes": {"ratedPower": {"value": "500", "measurementType": "ActivePower"}}},
+            ],
+            "relationships": [{"id": "r1", "source": "e1", "target": 7, "type": "feeds"}],
+            "page": {"nextCursor": ""},
+        }
+
+        paths = {(v.path, v.message) for v in payload_validators["details"].validate(payload)}
+
+        assert paths == {
+            ("$.entities[1].id", "expected at least 1 characters"),
+            ("$.entities[1].attributes", "expected object, got list"),
+            ("$.entities[2].id", "missing required field"),
+            ("$.entities[2].attributes.ratedPower.value", "expected number, got str"),
+            ("$.relationships[0].target", "expected string, got int"),
+            ("$.page.nextCursor", "expected at least 1 characters"),
+        }
+
+    def test_bool_is_not_a_number(self):
+        """Test booleans are rejected where numbers are expected"""
+        validator = Validator(ArrayOf(Object(required={"value": Number()})))
+
+        violations = validator.validate([{"value": 1}, {"value": 2.5}, {"value": True}])
+
+        assert [v.path for v in violations] == ["$[2].value"]
+
+    def test_assert_valid_message_lists_paths(self):
+        """Test assert_valid fails with a readable violation report"""
+        validator = Validator(Object(required={"name": String(min_length=1)}))
+
+        with pytest.raises(AssertionError, match=r"\$\.name: expected at least 1 characters"):
+            validator.assert_valid({"name": ""})
+
+    def test_node_subclass_must_compile(self):
+        """Test a schema node without compile() cannot be instantiated"""
+        class Incomplete(Node):
+            pass
+
+        with pytest.raises(TypeError, match="compile"):
+            Incomplete()
+
+    def test_validates_100k_entities_under_a_second(self, payload_validators):
+        """Test a 100k-entity details payload validates in under a second"""
+        site = build_site("Site-001")
+        entities = (site["entities"] * (100_000 // len(site["entities"]) + 1))[:100_000]
+        payload = {"siteId": "Site-001", "entities": entities,
+                   "relationships": site["relationships"], "page": {}}
+
+        # Best of three, so a busy machine (e.g. xdist workers) does not skew the result
+        elapsed = float("inf")
+        for _ in range(3):
+            started = time.perf_counter()
+            violations = payload_validators["details"].validate(payload)
+            elapsed = min(elapsed, time.perf_counter() - started)
+        print(f"Validated {len(entities)} entities in {elapsed:.3f}s")
+
+        assert violations == []
+        assert elapsed < 1.0, f"Validation took {elapsed:.3f}s"
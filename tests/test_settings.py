@@ -0,0 +1,86 @@
+import json
+
+import pytest
+
+import config
+from harness.settings import PROFILE_DIR, SettingsError, available_profiles, load_settings
+
+
+REMOTE_ENV = {
+    "DATACENTER_API_URL": "https://datacenter.test",
+    "FORECAST_API_URL": "https://forecast.test",
+    "DATACENTER_API_TOKEN": "dc-token",
+    "FORECAST_API_TOKEN": "fc-token",
+}
+
+
+@pytest.fixture
+def profile_dir(tmp_path):
+    def write(name, values):
+        (tmp_path / f"{name}.json").write_text(json.dumps(values))
+    write("base", {})
+    return tmp_path, write
+
+
+class TestSettings:
+    """Test suite for layered settings resolution and validation"""
+
+    def test_env_beats_profile_beats_config(self, profile_dir):
+        """Test each setting comes from the highest layer that has it"""
+        directory, write = profile_dir
+        write("fast", {"concurrency": 16, "page_size": 50, "datacenter_url": "standin", "forecast_url": "standin"})
+
+        settings = load_settings("fast", environ={"API_TEST_CONCURRENCY": "32"}, profile_dir=str(directory))
+
+        assert (settings.concurrency, settings.page_size, settings.cache_bytes) == (32, 50, config.CACHE_BYTES)
+        assert settings.sources["concurrency"] == "API_TEST_CONCURRENCY"
+        assert settings.sources["page_size"] == "profile fast"
+        assert settings.sources["cache_bytes"] == "config.py"
+
+    def test_dict_settings_merge_key_by_key(self, profile_dir):
+        """Test a profile overriding one endpoint keeps config.py's other endpoints"""
+        directory, write = profile_dir
+        write("slow", {"timeouts_ms": {"/v1/forecast": 99000}, "retry": {"budget": 5}})
+
+        settings = load_settings("slow", environ=REMOTE_ENV, profile_dir=str(directory))
+
+        assert settings.timeout_for("/v1/forecast") == 99000
+        assert settings.timeout_for("/twin/datacenter/v1/model") == config.REQUEST_TIMEOUTS_MS["/twin/datacenter/v1/model"]
+        assert settings.retry == dict(config.RETRY_POLICY, budget=5)
+        assert settings.datacenter_headers == {"Authorization": "Bearer dc-token"}
+
+    def test_all_problems_are_reported_at_once(self, profile_dir):
+        """Test validation lists every bad value, including placeholder tokens against a real URL"""
+        directory, write = profile_dir
+        write("broken", {"page_size": config.MAX_LIMIT + 1, "latency_budgets": {"/v1/forecast": {"p99_ms": 5}}})
+
+        with pytest.raises(SettingsError) as error:
+            load_settings("broken", environ={"API_TEST_CACHE_BYTES": "lots", "DATACENTER_API_URL": "https://x.test"},
+                          profile_dir=str(directory))
+
+        message = str(error.value)
+        for expected in ("API_TEST_CACHE_BYTES", "page_size: at most", "latency_budgets['/v1/forecast']",
+                         "datacenter_token: still the config.py placeholder"):
+            assert expected in message
+
+    def test_unknown_profile_and_setting_names(self, profile_dir):
+        """Test typos in a profile name or a profile key fail instead of being ignored"""
+        directory, write = profile_dir
+        write("typo", {"concurency": 4})
+
+        with pytest.raises(SettingsError, match="available: base, typo"):
+            load_settings("missing", environ={}, profile_dir=str(directory))
+        with pytest.raises(SettingsError, match="unknown settings concurency"):
+            load_settings("typo", environ={}, profile_dir=str(directory))
+
+    @pytest.mark.parametrize("profile", available_profiles())
+    def test_shipped_profiles_are_valid(self, profile):
+        """Test every profile in tests/profiles resolves once URLs and tokens are in the environment"""
+        settings = load_settings(profile, environ=REMOTE_ENV if profile != "local" else {}, profile_dir=PROFILE_DIR)
+
+        assert settings.profile == profile
+
+    def test_fixtures_use_the_session_settings(self, api_settings, api_auth_headers, forecast_auth_headers):
+        """Test the auth fixtures are built from the resolved settings, not literals"""
+        assert api_auth_headers == api_settings.datacenter_headers
+        assert forecast_auth_headers == api_settings.forecast_headers
@@ -0,0 +1,120 @@
+import time
+
+from harness.graph import SiteGraph
+from harness.standin import POWER_CHAIN, build_site
+
+
+def _relationship(rel_id, source, rel_type, target):
+    return {"id": rel_id, "source": source, "target": target, "type": rel_type}
+
+
+def _chain(length):
+    """A feeds/fedBy chain of ``length`` entities, two relationships per link"""
+    entities = [{"id": f"e{i}", "type": "Rack"} for i in range(length)]
+    relationships = []
+    for i in range(length - 1):
+        relationships.append(_relationship(f"r{2 * i}", f"e{i}", "feeds", f"e{i + 1}"))
+        relationships.append(_relationship(f"r{2 * i + 1}", f"e{i + 1}", "fedBy", f"e{i}"))
+    return {"entities": entities, "relationships": relationships}
+
+
+class TestSiteGraph:
+    """Test suite for the indexed site graph"""
+
+    def test_standin_site_is_consistent(self):
+        """Test the stand-in subgraph has no referential, inverse or cycle problems"""
+        graph = SiteGraph.from_payload(build_site("Site-001"))
+
+        graph.assert_consistent()
+        assert graph.relationship_count == len(build_site("Site-001")["relationships"])
+
+    def test_standin_power_chain(self):
+        """Test every stand-in feeds edge goes one step down POWER_CHAIN"""
+        graph = SiteGraph.from_payload(build_site("Site-001"))
+        downstream = dict(zip(POWER_CHAIN, POWER_CHAIN[1:]))
+
+        wrong_targets = [
+            (entity["id"], target, graph[target]["type"])
+            for entity_type in POWER_CHAIN
+            for entity in graph.entities_of_type(entity_type)
+            for target in graph.targets(entity["id"], "feeds")
+            if graph[target]["type"] != downstream.get(entity_type)
+        ]
+        assert graph.entities_of_type("UPSType")
+        assert wrong_targets == [], f"feeds edges off the power chain: {wrong_targets}"
+
+    def test_incremental_pages_match_whole_payload(self):
+        """Test adding pages one at a time gives the same index as one payload"""
+        site = build_site("Site-001")
+        # Relationships often arrive before the entities they point at
+        pages = [{"entities": site["entities"][i * 5:(i + 1) * 5],
+                  "relationships": site["relationships"][i * 15:(i + 1) * 15]}
+                 for i in range(12)]
+        assert sum(len(page["entities"]) for page in pages) == len(site["entities"])
+        assert sum(len(page["relationships"]) for page in pages) == len(site["relationships"])
+
+        paged = SiteGraph.from_pages(pages)
+        whole = SiteGraph.from_payload(site)
+
+        assert paged.ids_by_type == whole.ids_by_type
+        assert sorted(paged.edges()) == sorted(whole.edges())
+
+    def test_reports_dangling_references_and_missing_inverses(self):
+        """Test unknown endpoints and unpaired relationships are each reported"""
+        graph = SiteGraph.from_payload({
+            "entities": [{"id": "a", "type": "UPSType"}, {"id": "b", "type": "PDUType"}],
+            "relationships": [
+                _relationship("r1", "a", "feeds", "b"),
+                _relationship("r2", "a", "protects", "ghost"),
+                _relationship("r3", "ghost", "protectedBy", "a"),
+                _relationship("r4", "b", "controlledBy", "a"),
+            ],
+        })
+
+        assert graph.dangling_references() == [
+            "r2 (protects): unknown target 'ghost'",
+            "r3 (protectedBy): unknown source 'ghost'",
+        ]
+        assert graph.missing_inverses() == [
+            "r1: a feeds b has no b fedBy a",
+            "r4: b controlledBy a has no a controls b",
+        ]
+
+    def test_finds_power_flow_cycle(self):
+        """Test a loop through feeds and suppliesPowerTo is found and spelled out"""
+        graph = SiteGraph.from_payload({"entities": [], "relationships": [
+            _relationship("r1", "meter", "feeds", "ups"),
+            _relationship("r2", "ups", "feeds", "pdu"),
+            _relationship("r3", "pdu", "suppliesPowerTo", "rack"),
+            _relationship("r4", "rack", "feeds", "ups"),
+        ]})
+
+        cycle = graph.find_cycle()
+
+        assert cycle[0] == cycle[-1]
+        assert sorted(cycle[:-1]) == ["pdu", "rack", "ups"]
+        for source, target in zip(cycle, cycle[1:]):
+            assert graph.has_edge(source, "feeds", target) or graph.has_edge(source, "suppliesPowerTo", target)
+
+    def test_duplicate_edges_are_reported(self):
+        """Test the same source/type/target twice is flagged once"""
+        graph = SiteGraph.from_payload({"entities": [], "relationships": [
+            _relationship("r1", "a", "hasLocation", "room"),
+            _relationship("r2", "a", "hasLocation", "room"),
+        ]})
+
+        assert graph.relationship_count == 1
+        assert graph.duplicate_relationships == ["r2"]
+
+    def test_checks_one_million_edges_in_linear_time(self):
+        """Test every check over a 1M-edge site finishes in a few seconds"""
+        graph = SiteGraph.from_payload(_chain(500_001))
+        assert graph.relationship_count == 1_000_000
+
+        started = time.perf_counter()
+        problems = graph.problems()
+        elapsed = time.perf_counter() - started
+        print(f"Checked {graph.relationship_count} edges in {elapsed:.3f}s")
+
+        assert problems == []
+        assert elapsed < 10.0, f"Checks took {elapsed:.3f}s"
@@ -0,0 +1,161 @@
+import copy
+import json
+import time
+
+from harness.schema import MEASUREMENT, SCHEMAS, Number, Object, compile_validators, fingerprint
+from harness.snapshot import ChangeOnlyValidator, SnapshotStore
+from harness.standin import build_site
+from harness.streaming import MemberStream, StreamValidator, byte_chunks
+
+
+def _payload(entities=None, relationships=None):
+    site = build_site("Site-001")
+    return {
+        "siteId": "Site-001",
+        "entities": copy.deepcopy(site["entities"]) if entities is None else entities,
+        "relationships": copy.deepcopy(site["relationships"]) if relationships is None else relationships,
+        "page": {},
+    }
+
+
+def _stream(payload):
+    return MemberStream(byte_chunks(json.dumps(payload).encode(), 4096), keep_raw=True)
+
+
+def _run(store, payload, validators):
+    """Validate a payload against the store's snapshot and commit it like the API test does"""
+    validator = store.validator("Site-001", validators)
+    errors = validator.validate(_stream(payload))
+    if not errors:
+        store.commit("Site-001", validator)
+    return validator, errors
+
+
+class TestSnapshotDiff:
+    """Test suite for content-hash snapshots and change-only validation"""
+
+    def test_first_run_validates_everything_then_nothing(self, tmp_path, payload_validators):
+        """Test an unchanged site needs no element validation on the second run"""
+        path = str(tmp_path / "snapshots.json")
+        payload = _payload()
+        store = SnapshotStore(path)
+
+        first, errors = _run(store, payload, payload_validators)
+        store.save()
+        assert errors == []
+        assert first.validated == {"entities": len(payload["entities"]),
+                                   "relationships": len(payload["relationships"])}
+        assert store.diffs[0].first_run
+
+        second, errors = _run(SnapshotStore(path), payload, payload_validators)
+        assert errors == []
+        assert second.validated == {"entities": 0, "relationships": 0}
+        assert second.diff("Site-001").changes == 0
+
+    def test_diff_lists_added_removed_and_changed(self, tmp_path, payload_validators):
+        """Test the change report names each added, removed and changed id"""
+        store = SnapshotStore(str(tmp_path / "snapshots.json"))
+        _run(store, _payload(), payload_validators)
+        store.save()
+
+        payload = _payload()
+        removed = payload["entities"].pop(5)
+        payload["entities"][0]["attributes"]["name"] = "Renamed site"
+        payload["entities"].append(dict(payload["entities"][1], id="Site-001:Rack-099"))
+        payload["relationships"][0]["target"] = payload["entities"][2]["id"]
+
+        validator, errors = _run(store, payload, payload_validators)
+        diff = validator.diff("Site-001")
+
+        assert errors == []
+        assert diff["entities"].added == ["Site-001:Rack-099"]
+        assert diff["entities"].removed == [removed["id"]]
+        assert diff["entities"].changed == [payload["entities"][0]["id"]]
+        assert diff["relationships"].changed == [payload["relationships"][0]["id"]]
+        assert validator.validated == {"entities": 2, "relationships": 1}
+        assert "    - " + removed["id"] in diff.lines()
+
+    def test_only_changed_elements_are_validated(self, tmp_path, payload_validators):
+        """Test a broken changed entity is reported at its index; a failed run keeps the old snapshot"""
+        store = SnapshotStore(str(tmp_path / "snapshots.json"))
+        _run(store, _payload(), payload_validators)
+        store.save()
+
+        payload = _payload()
+        payload["entities"][7]["attributes"] = []
+        _, errors = _run(store, payload, payload_validators)
+
+        assert [repr(error) for error in errors] == ["$.entities[7].attributes: expected object, got list"]
+        assert len(store.diffs) == 1, "A failing run must not become the new snapshot"
+
+    def test_full_validation_ignores_previous_snapshot(self, tmp_path, payload_validators):
+        """Test --full-validation revalidates every element"""
+        path = str(tmp_path / "snapshots.json")
+        store = SnapshotStore(path)
+        _run(store, _payload(), payload_validators)
+        store.save()
+
+        validator, _ = _run(SnapshotStore(path, ignore_previous=True), _payload(), payload_validators)
+
+        assert validator.validated["entities"] == len(_payload()["entities"])
+
+    def test_snapshots_are_kept_per_base_url(self, tmp_path, payload_validators):
+        """Test a snapshot taken against one API is not reused for another"""
+        path = str(tmp_path / "snapshots.json")
+        store = SnapshotStore(path, base_url="https://api-a.example")
+        _run(store, _payload(), payload_validators)
+        store.save()
+
+        other, _ = _run(SnapshotStore(path, base_url="https://api-b.example"), _payload(), payload_validators)
+        same, _ = _run(SnapshotStore(path, base_url="https://api-a.example"), _payload(), payload_validators)
+
+        assert other.previous is None
+        assert other.validated["entities"] == len(_payload()["entities"])
+        assert same.validated == {"entities": 0, "relationships": 0}
+
+    def test_schema_change_voids_the_snapshot(self, tmp_path, payload_validators):
+        """Test a snapshot validated under other schemas counts as no snapshot"""
+        path = str(tmp_path / "snapshots.json")
+        store = SnapshotStore(path, fingerprint=fingerprint(payload_validators))
+        _run(store, _payload(), payload_validators)
+        store.save()
+
+        changed = compile_validators(dict(SCHEMAS, measurement=Object(
+            required=dict(MEASUREMENT.required, precision=Number()), optional=MEASUREMENT.optional)))
+        assert fingerprint(changed) != fingerprint(payload_validators) == fingerprint(compile_validators())
+        validator, _ = _run(SnapshotStore(path, fingerprint=fingerprint(changed)), _payload(), payload_validators)
+
+        assert validator.previous is None
+        assert validator.validated["entities"] == len(_payload()["entities"])
+
+    def test_validation_work_is_proportional_to_the_change(self, payload_validators):
+        """Test 50 changed entities out of 50k are the only ones validated
+
+        Timings are printed rather than asserted: decoding the stream costs the
+        same either way, so the saving is the per-element validation only.
+        """
+        template = build_site("Site-001")["entities"]
+        entities = [dict(template[i % len(template)], id=f"Site-001:bulk-{i:06d}") for i in range(50_000)]
+        body = json.dumps(_payload(entities=entities)).encode()
+
+        warmup = ChangeOnlyValidator.for_details(payload_validators)
+        warmup.validate(MemberStream(byte_chunks(body), keep_raw=True))
+        previous = warmup.snapshot("Site-001")
+        for item_id in list(previous.hashes["entities"])[:50]:
+            previous.hashes["entities"][item_id] = "stale"
+
+        def best_of_three(run):
+            elapsed = float("inf")
+            for _ in range(3):
+                started = time.perf_counter()
+                run()
+                elapsed = min(elapsed, time.perf_counter() - started)
+            return elapsed
+
+        changed = ChangeOnlyValidator.for_details(payload_validators, previous=previous)
+        change_only = best_of_three(lambda: changed.validate(MemberStream(byte_chunks(body), keep_raw=True)))
+        full = best_of_three(lambda: StreamValidator.for_details(payload_validators).validate(
+            MemberStream(byte_chunks(body))))
+        print(f"change-only {change_only:.3f}s, full {full:.3f}s")
+
+        assert changed.validated["entities"] == 50
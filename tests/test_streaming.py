@@ -0,0 +1,170 @@
+import json
+import time
+import tracemalloc
+
+import pytest
+from playwright.sync_api import APIRequestContext
+
+from harness.graph import SiteGraph
+from harness.standin import build_model, build_site
+from harness.streaming import (
+    MODEL_STREAM_KEYS,
+    MemberStream,
+    StreamDecodeError,
+    StreamValidator,
+    byte_chunks,
+    file_chunks,
+    stream_response,
+)
+
+
+def _collect(stream):
+    """Rebuild the document from streamed members"""
+    document = {}
+    for key, value in stream:
+        if key in stream.arrays:
+            document.setdefault(key, []).append(value)
+        else:
+            document[key] = value
+    for key in stream.arrays:
+        document.setdefault(key, [])
+    return document
+
+
+def _write_details(path, entity_count):
+    """Write a details payload with entity_count entities without building it in memory"""
+    site = build_site("Site-001")
+    template = site["entities"]
+    with open(path, "w") as fh:
+        fh.write('{"siteId": "Site-001", "entities": [')
+        for index in range(entity_count):
+            entity = dict(template[index % len(template)], id=f"Site-001:synthetic-{index:07d}")
+            fh.write(("," if index else "") + json.dumps(entity))
+        fh.write('], "relationships": ' + json.dumps(site["relationships"]) + ', "page": {}}')
+
+
+class TestMemberStream:
+    """Test suite for incremental JSON decoding"""
+
+    @pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+    def test_matches_json_loads_at_any_chunk_size(self, chunk_size):
+        """Test chunk boundaries inside numbers, strings and UTF-8 sequences are handled"""
+        site = build_site("Site-001")
+        payload = {"siteId": "Site-001", "entities": list(site["entities"]),
+                   "relationships": site["relationships"], "page": {"limit": 100, "count": 57}}
+        payload["entities"][0] = dict(payload["entities"][0], attributes={"name": "Salle électrique — [A], {B}"})
+        body = json.dumps(payload, indent=2, ensure_ascii=False).encode()
+
+        stream = MemberStream(byte_chunks(body, chunk_size))
+
+        assert _collect(stream) == payload
+        assert stream.keys == ["siteId", "entities", "relationships", "page"]
+
+    def test_streams_model_arrays(self):
+        """Test the /model arrays are streamed element by element"""
+        body = json.dumps(build_model()).encode()
+
+        stream = MemberStream(byte_chunks(body, 100), MODEL_STREAM_KEYS)
+
+        assert _collect(stream) == build_model()
+        assert stream.arrays == set(MODEL_STREAM_KEYS)
+
+    def test_empty_arrays_and_trailing_number(self):
+        """Test empty streamed arrays are seen and a final number is not cut short"""
+        stream = MemberStream(byte_chunks(b'{"entities": [], "relationships": [ ], "total": 12345}', 3))
+
+        assert list(stream) == [("total", 12345)]
+        assert stream.arrays == {"entities", "relationships"}
+
+    @pytest.mark.parametrize("body", [b'["not", "an", "object"]', b'{"entities": [{"id": 1}', b'{"a": 1 "b": 2}'])
+    def test_malformed_payloads_raise(self, body):
+        """Test non-objects, truncated bodies and missing commas are rejected"""
+        with pytest.raises(StreamDecodeError):
+            list(MemberStream(byte_chunks(body, 4)))
+
+
+class TestStreamValidator:
+    """Test suite for validating streamed payloads"""
+
+    def test_paths_match_whole_payload_validation(self, payload_validators):
+        """Test streamed violations carry the same JSON paths as Validator.validate"""
+        site = build_site("Site-001")
+        payload = {"siteId": "Site-001", "entities": list(site["entities"]),
+                   "relationships": list(site["relationships"]), "page": {"nextCursor": ""}}
+        payload["entities"][3] = {"id": "", "type": "PDUType", "attributes": []}
+        payload["relationships"][5] = dict(payload["relationships"][5], target=7)
+
+        streamed = StreamValidator.for_details(payload_validators).validate(
+            MemberStream(byte_chunks(json.dumps(payload).encode(), 1000))
+        )
+
+        expected = payload_validators["details"].validate(payload)
+        assert sorted(map(repr, streamed)) == sorted(map(repr, expected))
+
+    def test_reports_missing_and_non_array_members(self, payload_validators):
+        """Test absent members and scalars in place of arrays are violations"""
+        validator = StreamValidator.for_details(payload_validators)
+
+        errors = validator.validate(MemberStream([b'{"siteId": "Site-001", "entities": null}']))
+
+        assert sorted(map(repr, errors)) == [
+            "$.entities: expected array, got NoneType",
+            "$.page: missing required field",
+            "$.relationships: missing required field",
+        ]
+
+    def test_stream_live_response_into_graph(self, datacenter_api_context: APIRequestContext, payload_validators):
+        """Test a live /details body feeds the validator and graph index element by element"""
+        response = datacenter_api_context.get("/twin/datacenter/v1/details/Site-001")
+        assert response.ok, f"Request failed with status {response.status}"
+
+        graph = SiteGraph()
+        validator = StreamValidator.for_details(payload_validators)
+
+        validator.assert_valid(stream_response(response, chunk_size=1024), graph.add_member)
+
+        graph.assert_consistent()
+        assert validator.counts["entities"] == len(graph.entity_by_id)
+
+
+@pytest.mark.parametrize("entity_count", [
+    10_000,
+    pytest.param(100_000, marks=pytest.mark.benchmark),
+    pytest.param(1_000_000, marks=pytest.mark.benchmark),
+])
+def test_streaming_memory_against_json_loads(tmp_path, payload_validators, entity_count):
+    """Benchmark time and peak memory of streaming validation against json.loads + validate
+
+    Times are taken without tracemalloc, which slows allocation-heavy code
+    several-fold; peaks come from a second, traced run of each path.
+    """
+    path = tmp_path / "details.json"
+    _write_details(path, entity_count)
+    validator = StreamValidator.for_details(payload_validators)
+
+    def stream():
+        return validator.validate(MemberStream(file_chunks(path)))
+
+    def loads():
+        return payload_validators["details"].validate(json.loads(path.read_bytes()))
+
+    results, seconds, peaks = {}, {}, {}
+    for name, run in (("stream", stream), ("loads", loads)):
+        started = time.perf_counter()
+        results[name] = run()
+        seconds[name] = time.perf_counter() - started
+        tracemalloc.start()
+        try:
+            run()
+            peaks[name] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    print(f"{entity_count:>9} entities, {path.stat().st_size / 1e6:.1f} MB: "
+          f"stream {seconds['stream']:.2f}s peak {peaks['stream'] / 1e6:.1f} MB | "
+          f"json.loads {seconds['loads']:.2f}s peak {peaks['loads'] / 1e6:.1f} MB")
+
+    assert results["stream"] == results["loads"] == []
+    assert validator.counts["entities"] == entity_count
+    assert peaks["stream"] < 2_000_000, "Streaming peak memory should not grow with the payload"
+    assert peaks["stream"] * 10 < peaks["loads"]
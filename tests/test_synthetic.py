@@ -0,0 +1,152 @@
+import json
+import os
+import time
+import tracemalloc
+
+import pytest
+
+import config
+from harness.graph import SiteGraph
+from harness.pagination import DetailsPaginator
+from harness.standin import StandInServer
+from harness.streaming import MemberStream, StreamValidator
+from harness.synthetic import RACK, SyntheticSite
+
+
+def _rack_path(graph, rack_id):
+    """fedBy chain from a rack up to the utility, following the first feed at each level"""
+    path = [rack_id]
+    while True:
+        parents = graph.targets(path[-1], "fedBy")
+        if not parents:
+            return path
+        path.append(parents[0])
+
+
+class TestSyntheticSite:
+    """Test suite for the synthetic large-site generator"""
+
+    @pytest.mark.parametrize("entity_count", [100, 1_000, 54_321])
+    def test_topology_is_consistent(self, entity_count):
+        """Test exact size, config.py vocabularies, paired inverses and an acyclic power path"""
+        site = SyntheticSite("Big-001", entity_count)
+        payload = site.materialize()
+        graph = SiteGraph.from_payload(payload)
+
+        assert len(payload["entities"]) == len(graph.entity_by_id) == entity_count
+        assert {e["type"] for e in payload["entities"]} <= set(config.ENTITY_TYPES)
+        assert {r["type"] for r in payload["relationships"]} <= set(config.RELATIONSHIP_TYPES)
+        assert {m for e in payload["entities"] for m in e.get("state", {})} <= set(config.MEASUREMENT_TYPES)
+        assert graph.find_cycle() is None
+        graph.assert_consistent()
+
+    def test_every_rack_is_fed_from_a_utility_on_two_paths(self):
+        """Test rack -> rack PDU -> PDU -> UPS -> switchgear -> utility, with A and B feeds on different PDUs"""
+        site = SyntheticSite("Big-001", 5_000)
+        graph = SiteGraph.from_payload(site.materialize())
+
+        for rack_id in (rack["id"] for rack in graph.entities_of_type(RACK)):
+            rack_pdus = graph.targets(rack_id, "fedBy")
+            assert len(rack_pdus) == 2
+            pdus = {graph.targets(rack_pdu, "fedBy")[0] for rack_pdu in rack_pdus}
+            assert len(pdus) == 2, f"{rack_id} has both feeds on one PDU"
+            types = [graph.entity_by_id[entity_id]["type"] for entity_id in _rack_path(graph, rack_id)]
+            assert types == ["Rack", "RackPDUType", "PDUType", "UPSType", "SwitchgearType", "UtilityMeterType"]
+
+    def test_seed_changes_values_not_topology(self):
+        """Test a seed reproduces byte for byte, and another seed keeps ids and edges"""
+        first, again, other = (SyntheticSite("Big-001", 2_000, seed=seed) for seed in (1, 1, 2))
+
+        assert b"".join(first.chunks()) == b"".join(again.chunks())
+        assert list(first.relationships()) == list(other.relationships())
+        assert [e["id"] for e in first.entities()] == [e["id"] for e in other.entities()]
+        assert list(first.entities()) != list(other.entities())
+
+    def test_pages_on_disk_cover_the_site(self, tmp_path, payload_validators):
+        """Test written pages chain by nextCursor, validate, and add up to the whole site"""
+        site = SyntheticSite("Big-001", 1_000)
+        paths = site.write_pages(str(tmp_path), page_size=64)
+
+        entities, relationships = [], []
+        for number, path in enumerate(paths, 1):
+            with open(path) as fh:
+                page = json.load(fh)
+            payload_validators["details"].assert_valid(page)
+            assert ("nextCursor" in page["page"]) == (number < len(paths))
+            entities.extend(page["entities"])
+            relationships.extend(page["relationships"])
+        assert len(paths) == 16
+        assert {"entities": entities, "relationships": relationships} == site.materialize()
+
+    def test_served_by_the_standin(self, request_context_factory, api_auth_headers, payload_validators):
+        """Test the stand-in pages a generated site like a real one"""
+        site = SyntheticSite("Big-001", 3_000)
+        with StandInServer(tokens=(api_auth_headers["Authorization"][len("Bearer "):],), sites=[site]) as server:
+            paginator = DetailsPaginator(server.url, api_auth_headers, site.site_id, limit=config.MAX_LIMIT)
+            graph = SiteGraph.from_pages(paginator.pages())
+            context = request_context_factory(server.url, api_auth_headers)
+            filtered = context.get(f"/twin/datacenter/v1/details/{site.site_id}", params={"entityType": "Rack"})
+            payload_validators["details"].assert_valid(filtered.json())
+
+        assert paginator.stats.pages == 30
+        assert len(graph.entity_by_id) == 3_000
+        graph.assert_consistent()
+        assert {e["type"] for e in filtered.json()["entities"]} == {"Rack"}
+
+
+def _rss_bytes():
+    """Resident set size of this process, or None where /proc is not available"""
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return None
+
+
+@pytest.mark.parametrize("entity_count", [
+    1_000,
+    pytest.param(10_000, marks=pytest.mark.benchmark),
+    pytest.param(100_000, marks=pytest.mark.benchmark),
+    pytest.param(1_000_000, marks=pytest.mark.benchmark),
+    pytest.param(10_000_000, marks=pytest.mark.benchmark),
+])
+def test_validator_scaling(payload_validators, entity_count):
+    """Benchmark streaming schema validation and graph checks against site size
+
+    Each size prints one row of the chart. Generating the body is timed on
+    its own and subtracted. The validation peak comes from a second, traced
+    run. The graph index keeps every element alive, which makes tracemalloc
+    very slow, so its memory is the growth in resident size instead. It is
+    only charted up to 1M entities.
+    """
+    site = SyntheticSite(f"Big-{entity_count}", entity_count)
+    validator = StreamValidator.for_details(payload_validators)
+
+    started = time.perf_counter()
+    size = sum(len(chunk) for chunk in site.chunks())
+    generate_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    assert validator.validate(MemberStream(site.chunks())) == []
+    validate_s = time.perf_counter() - started - generate_s
+    tracemalloc.start()
+    try:
+        validator.validate(MemberStream(site.chunks()))
+        validate_peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    graph_cells = "graph       -"
+    if entity_count <= 1_000_000:
+        graph = SiteGraph()
+        rss_before = _rss_bytes()
+        started = time.perf_counter()
+        assert validator.validate(MemberStream(site.chunks()), graph.add_member) + graph.problems() == []
+        assert graph.find_cycle() is None
+        graph_s = time.perf_counter() - started - generate_s
+        rss = "-" if rss_before is None else f"{(_rss_bytes() - rss_before) / 1e6:8.1f} MB"
+        graph_cells = f"graph {graph_s:7.2f}s {rss}"
+
+    print(f"{entity_count:>10} entities {size / 1e6:9.1f} MB  generate {generate_s:7.2f}s  "
+          f"validate {validate_s:7.2f}s {validate_peak / 1e6:6.1f} MB  {graph_cells}")
+    assert validate_peak < 64 * 1024 * 1024, "Streaming validation should not grow with site size"